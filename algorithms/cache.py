@@ -1,13 +1,80 @@
-__all__ = ["Cache", "cache_decorator"]
+__all__ = ["Cache", "cache_decorator", "batched_cache"]
 
 import gc
-from functools import wraps
+from asyncio import ensure_future, shield
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial, wraps
+from inspect import iscoroutinefunction
+from sys import getsizeof
+from threading import Lock
+from time import monotonic, perf_counter
 
-from .recency_tracker import RecencyTracker
+from .disk_tier import read_snapshot, write_snapshot
+from .frequency_sketch import CountMinSketch
+from .instrumentation import Instrumentable
+from .memory_pressure import registry
+from .miss_ratio_curve import MissRatioProfiler
+from .recency_tracker import RecencyTracker, SegmentedRecencyTracker
+from .shared_cache import SharedMemory_Cache
+from .timer_wheel import TimerWheel
 from .tree.splay_tree import SplayTreeWithMaxsize
 
+# Sentinel Object Pattern
+EMPTY = object()
 
-class LRU_Cache:
+INFINITY = float("inf")
+
+# Maximum number of surplus entries discarded per insertion, after the cache is shrunk by resize().
+TRIM_BATCH = 8
+
+# Granularity in seconds at which expired entries are reclaimed. Expiration on read is exact regardless.
+TIMER_WHEEL_RESOLUTION = 1.0
+
+
+def weigh_by_getsizeof(key, value):
+    return getsizeof(value)
+
+
+def iter_items(items):
+    return items.items() if hasattr(items, "items") else items
+
+
+class BulkAccess:
+    """
+        Mixin of cache classes, providing bulk operations on top of the mapping interface. Cache classes override them
+        where a batch can be served cheaper than key by key.
+    """
+
+    __slots__ = []
+
+    def get_many(self, keys):
+        """Look *keys* up. Return dict of hits, and list of missing keys, without raising KeyError."""
+        hits = {}
+        misses = []
+        for key in keys:
+            try:
+                hits[key] = self[key]
+            except KeyError:
+                misses.append(key)
+        return hits, misses
+
+    def set_many(self, items):
+        """Set every entry of *items*, either a mapping or an iterable of (key, value), in order."""
+        for key, value in iter_items(items):
+            self[key] = value
+
+    def touch_many(self, keys):
+        """
+            Mark present *keys* as used, in order, as a hit would, without reading them or counting hits. Absent keys
+            are skipped. Relies on `_storage` mapping of the cache, and its `_touch(key)` of a present key.
+        """
+        storage = self._storage
+        for key in keys:
+            if key in storage:
+                self._touch(key)
+
+
+class LRU_Cache(Instrumentable, BulkAccess):
     """
         Accessing every item is equally fast. The size is limited. When cache is full, further insertion requires that the least recently used item is discarded.
 
@@ -16,6 +83,33 @@ class LRU_Cache:
         Philosophy is to tradeoff time with space.
         Underlying data structure is hash table. (dictionary primitive data type in Python)
 
+        Entries optionally expire after *ttl* seconds, either cache-wide or per entry via `set()`. An expired entry
+        reads as a miss. Expired entries nobody reads again are reclaimed by a hierarchical timer wheel upon insertion,
+        before any live entry is discarded for room.
+
+        Besides entry count, the cache can be bounded by total weight, e.g. bytes. Set *maxweight*, and optionally a
+        *weigher(key, value)* returning the weight of an entry. Default weigher is `sys.getsizeof` of the value.
+        Least recently used entries are discarded until the total weight is within budget again. Entry heavier than
+        the whole budget is rejected with ValueError. *maxsize* can be None in this mode, to bound by weight only.
+
+        Given a *spill* file, entries discarded for room are written to disk rather than dropped, and a miss in memory
+        looks up the disk before giving up. Entries with TTL are never spilled. `save_snapshot()` and
+        `load_snapshot()` persist entries in memory across restarts, in recency order.
+
+        *tracker* is the class tracking recency of entries. RecencyTracker (default) is the fastest on average, while
+        LinkedRecencyTracker bounds every operation to worst-case O(1), avoiding latency spikes of garbage collection
+        on large caches. SampledRecencyTracker approximates LRU by sampling on eviction, making hits cheaper.
+
+        Given *protected_ratio*, the cache is segmented (SLRU). New entries are on probation, and a second reference
+        promotes them to the protected segment, which takes *protected_ratio* of *maxsize*. Entries on probation are
+        discarded first, so that keys referenced only once don't push out keys referenced repeatedly.
+
+        `profile()` attaches a MissRatioProfiler, which watches lookups to estimate the miss ratio at every cache size.
+        Read the estimate from `miss_ratio_curve()`, to right-size the cache from live traffic.
+
+        Cache bounded by *maxsize* registers itself in `memory_pressure.registry`, so that a MemoryPressureMonitor
+        can shrink it via `resize()` under memory pressure, and let it grow back afterwards.
+
         Reference: the *LRU cache mechanism* part in the source code of the `functools` standard library.
 
         Complexity
@@ -27,23 +121,64 @@ class LRU_Cache:
         | delete item | O(1) |
     """
 
-    def __init__(self, maxsize=128):
-        if not isinstance(maxsize, int) or maxsize <= 0:
+    def __init__(self, maxsize=128, ttl=None, timer=monotonic, maxweight=None, weigher=None, spill=None,
+                 protected_ratio=None, tracker=RecencyTracker):
+        if maxsize is None and maxweight is None:
             raise ValueError("Invalid *maxsize* setting")
+        if maxsize is not None and (not isinstance(maxsize, int) or maxsize <= 0):
+            raise ValueError("Invalid *maxsize* setting")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("Invalid *ttl* setting")
+        if maxweight is not None and maxweight <= 0:
+            raise ValueError("Invalid *maxweight* setting")
+        if weigher is not None and maxweight is None:
+            raise ValueError("*weigher* is of no use without *maxweight*")
+        if protected_ratio is not None and (maxsize is None or not 0 < protected_ratio < 1):
+            raise ValueError("Invalid *protected_ratio* setting")
         self._maxsize = maxsize
         self._storage = {}
-        self._recency_tracker = RecencyTracker()
+        if protected_ratio is None:
+            self._recency_tracker = tracker()
+        else:
+            self._recency_tracker = SegmentedRecencyTracker(int(maxsize * protected_ratio), tracker)
         self._hit = 0
         self._miss = 0
+        self._ttl = ttl
+        self._timer = timer
+        # _expiry maps key to its deadline. Only holds keys that expire.
+        self._expiry = {}
+        # Created on demand, since it's of no use to cache without expiring entry.
+        self._timer_wheel = None
+        self._maxweight = maxweight
+        self._weigher = weigher if weigher is not None else weigh_by_getsizeof
+        # _weights maps key to its weight. Only maintained when bounded by weight.
+        self._weights = {}
+        self._weight = 0
+        # SpillFile holding entries discarded from memory.
+        self._spill = spill
+        self._instrumentation = None
+        self._profiler = None
+        if maxsize is not None:
+            registry.register(self)
 
     __slots__ = ["_maxsize", "_storage",
-                 "_recency_tracker", "_hit", "_miss"]
+                 "_recency_tracker", "_hit", "_miss",
+                 "_ttl", "_timer", "_expiry", "_timer_wheel",
+                 "_maxweight", "_weigher", "_weights", "_weight", "_spill",
+                 "_instrumentation", "_profiler", "__weakref__"]
 
     def clear(self):
         self._storage.clear()
         self._recency_tracker.clear()
         self._hit = 0
         self._miss = 0
+        self._expiry.clear()
+        if self._timer_wheel is not None:
+            self._timer_wheel.clear()
+        self._weights.clear()
+        self._weight = 0
+        if self._spill is not None:
+            self._spill.clear()
 
     @property
     def size(self):
@@ -52,44 +187,887 @@ class LRU_Cache:
     def __len__(self):
         return self.size
 
+    @property
+    def weight(self):
+        return self._weight
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def resize(self, maxsize):
+        """
+            Set *maxsize*. Surplus entries after shrinking are discarded lazily, TRIM_BATCH per lookup or insertion at
+            most, so that a memory pressure monitor can call it from another thread.
+        """
+        if not isinstance(maxsize, int) or maxsize <= 0:
+            raise ValueError("Invalid *maxsize* setting")
+        if self._maxsize is None:
+            raise ValueError("Cache bounded by weight only can't be resized")
+        self._maxsize = maxsize
+
     def statistic(self):
         return self._hit, self._miss
 
+    @property
+    def profiler(self):
+        return self._profiler
+
+    def profile(self, rate=0.01, max_samples=8192):
+        """Attach MissRatioProfiler sampling lookups at *rate*, tracking *max_samples* keys at most, and return it."""
+        self._profiler = MissRatioProfiler(rate, max_samples)
+        return self._profiler
+
+    def unprofile(self):
+        self._profiler = None
+
+    def miss_ratio_curve(self, sizes=None):
+        """
+            Return list of (size, estimated miss ratio) from the attached profiler, for every size in *sizes*, or
+            where the curve steps by default.
+        """
+        if self._profiler is None:
+            raise ValueError("Cache is not profiled. Call profile() first")
+        return self._profiler.curve(sizes)
+
     def __getitem__(self, key):
+        if self._profiler is not None:
+            self._profiler.access(key)
         try:
             value = self._storage[key]
+            # Cache without any expiring entry pays a single truth test.
+            if self._expiry and self._expiry.get(key, INFINITY) <= self._timer():
+                del self[key]
+                if self._instrumentation is not None:
+                    self._instrumentation.record_expiration(key)
+                raise KeyError(key)
             self._hit += 1
             self._recency_tracker.update_mru(key)
+            if self._maxsize is not None and len(self._storage) > self._maxsize:
+                self._trim()
             return value
         except KeyError:
+            if self._spill is not None and key in self._spill:
+                return self._unspill(key)
             self._miss += 1
+            if self._maxsize is not None and len(self._storage) > self._maxsize:
+                self._trim()
+            if self._instrumentation is not None:
+                self._instrumentation.record_miss(key)
             raise
 
+    def _trim(self):
+        """Discard TRIM_BATCH least recently used entries at most, while size exceeds *maxsize* after resize()."""
+        for _ in range(min(self.size - self._maxsize, TRIM_BATCH)):
+            self.discard_lru()
+
+    def _unspill(self, key):
+        # Move the entry back to memory, which may spill another one in turn.
+        value = self._spill.pop(key)
+        self._hit += 1
+        self.set(key, value)
+        return value
+
     def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def set(self, key, value, ttl=None):
+        """Set item, which expires after *ttl* seconds. Fall back to the cache-wide *ttl* if not given."""
+        if ttl is None:
+            ttl = self._ttl
+        elif ttl <= 0:
+            raise ValueError("Invalid *ttl* setting")
+
+        if self._maxweight is not None:
+            weight = self._weigher(key, value)
+            if weight < 0:
+                raise ValueError("Negative weight of entry {!r}: {}".format(key, weight))
+            if weight > self._maxweight:
+                # Rejected up front. Otherwise it would flush the whole cache and still not fit in.
+                raise ValueError("Weight of entry {!r} exceeds *maxweight*: {}".format(key, weight))
+
+        if self._expiry:
+            self._reap()
+        if self._spill is not None:
+            # Keep every key in one tier at most.
+            self._spill.discard(key)
+        overwrite = key in self._storage
+
         self._storage[key] = value
         self._recency_tracker.update_mru(key)
+        if self._maxweight is not None:
+            self._weight += weight - self._weights.get(key, 0)
+            self._weights[key] = weight
+        if ttl is not None:
+            if self._timer_wheel is None:
+                self._timer_wheel = TimerWheel(TIMER_WHEEL_RESOLUTION, now=self._timer())
+            deadline = self._timer() + ttl
+            self._expiry[key] = deadline
+            self._timer_wheel.schedule(key, deadline)
+        elif key in self._expiry:
+            del self._expiry[key]
+            self._timer_wheel.cancel(key)
 
-        # TODO: concurrency, multi-threaded
-        if self.size > self._maxsize:
-            self.discard_lru()
-            assert self.size <= self._maxsize
+        # Not thread-safe. Share Sharded_LRU_Cache between threads instead.
+        if self._maxsize is not None and self.size > self._maxsize:
+            # Usually the one entry just inserted. More if the cache has been shrunk by resize().
+            self._trim()
+        if self._maxweight is not None:
+            # The new entry is the most recently used, and fits in the budget alone. So it's never discarded here.
+            while self._weight > self._maxweight:
+                self.discard_lru()
+        if self._instrumentation is not None:
+            self._instrumentation.record_set(overwrite)
+
+    def _reap(self):
+        for key in self._timer_wheel.advance(self._timer()):
+            del self._expiry[key]
+            del self._storage[key]
+            self._recency_tracker.remove(key)
+            self._forget_weight(key)
+            if self._instrumentation is not None:
+                self._instrumentation.record_expiration(key)
+
+    def _forget_weight(self, key):
+        if self._weights:
+            self._weight -= self._weights.pop(key)
 
     def discard_lru(self):
         try:
             key = self._recency_tracker.pop_lru()
-            del self._storage[key]
+            value = self._storage.pop(key)
         except IndexError:
             raise IndexError("Empty cache has nothing to discard")
+        if key in self._expiry:
+            del self._expiry[key]
+            self._timer_wheel.cancel(key)
+        elif self._spill is not None:
+            self._spill.put(key, value)
+        self._forget_weight(key)
+        if self._instrumentation is not None:
+            self._instrumentation.record_eviction(key, value)
 
     def __delitem__(self, key):
+        if self._spill is not None and key in self._spill:
+            self._spill.discard(key)
+            return
         del self._storage[key]
         self._recency_tracker.remove(key)
+        if key in self._expiry:
+            del self._expiry[key]
+            self._timer_wheel.cancel(key)
+        self._forget_weight(key)
+
+    def get_many(self, keys):
+        if self._expiry or self._spill is not None:
+            return super().get_many(keys)
+        # Neither expiration nor disk to consult. Skip exception handling, and reorder the tracker once per batch.
+        storage = self._storage
+        hits = {}
+        misses = []
+        found = []
+        if self._profiler is not None:
+            keys = list(keys)
+            for key in keys:
+                self._profiler.access(key)
+        for key in keys:
+            value = storage.get(key, EMPTY)
+            if value is EMPTY:
+                misses.append(key)
+            else:
+                hits[key] = value
+                found.append(key)
+        self._hit += len(found)
+        self._miss += len(misses)
+        self._recency_tracker.update_mru_many(found)
+        if self._instrumentation is not None:
+            for key in misses:
+                self._instrumentation.record_miss(key)
+        return hits, misses
+
+    def set_many(self, items):
+        if (self._ttl is not None or self._expiry or self._maxweight is not None or self._spill is not None
+                or self._instrumentation is not None):
+            return super().set_many(items)
+        # Plain entries only. Insert the whole batch, then discard overflow at once.
+        storage = self._storage
+        keys = []
+        for key, value in iter_items(items):
+            storage[key] = value
+            keys.append(key)
+        self._recency_tracker.update_mru_many(keys)
+        while self.size > self._maxsize:
+            self.discard_lru()
+
+    def touch_many(self, keys):
+        """Mark present *keys* as most recently used, in order, without reading them or counting hits."""
+        storage = self._storage
+        self._recency_tracker.update_mru_many(key for key in keys if key in storage)
+
+    def save_snapshot(self, file):
+        """Write entries in memory to binary *file*, least recently used first. Expired entries are left out."""
+        now = self._timer()
+
+        def entries():
+            for key in self._recency_tracker:
+                deadline = self._expiry.get(key)
+                if deadline is None:
+                    yield key, self._storage[key], None
+                elif deadline > now:
+                    yield key, self._storage[key], deadline - now
+
+        write_snapshot(file, entries())
+
+    def load_snapshot(self, file):
+        """Set entries read from binary *file* written by `save_snapshot()`, restoring their recency order."""
+        for key, value, ttl in read_snapshot(file):
+            self.set(key, value, ttl=ttl)
+
+
+class Sharded_LRU_Cache(Instrumentable, BulkAccess):
+    """
+        Thread-safe LRU_Cache.
+
+        The keyspace is split into several independent LRU_Cache shards, selected by key hash. Each shard is guarded
+        by its own lock, so threads touching different shards never contend. Shard capacities sum up to *maxsize*.
+
+        Disadvantage: eviction is least recently used within a shard, rather than globally.
+
+        Complexity
+        ----------
+        Same as LRU_Cache, plus lock acquisition.
+    """
+
+    def __init__(self, maxsize=128, shards=16):
+        if not isinstance(maxsize, int) or maxsize <= 0:
+            raise ValueError("Invalid *maxsize* setting")
+        if not isinstance(shards, int) or shards <= 0:
+            raise ValueError("Invalid *shards* setting")
+        # Every shard holds at least one entry.
+        shards = min(shards, maxsize)
+        quotient, remainder = divmod(maxsize, shards)
+        self._maxsize = maxsize
+        self._shards = [LRU_Cache(quotient + (index < remainder)) for index in range(shards)]
+        self._locks = [Lock() for _ in range(shards)]
+        self._instrumentation = None
+
+    __slots__ = ["_maxsize", "_shards", "_locks", "_instrumentation"]
+
+    def instrument(self, on_evict=None, on_miss=None, **kw):
+        # Shards report to one Instrumentation. Its counters may drift slightly under contention.
+        instrumentation = super().instrument(on_evict, on_miss, **kw)
+        for shard in self._shards:
+            shard._instrumentation = instrumentation
+        return instrumentation
+
+    def uninstrument(self):
+        super().uninstrument()
+        for shard in self._shards:
+            shard.uninstrument()
+
+    def _select(self, key):
+        index = hash(key) % len(self._shards)
+        return self._shards[index], self._locks[index]
+
+    def clear(self):
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                shard.clear()
+
+    @property
+    def size(self):
+        return sum(shard.size for shard in self._shards)
+
+    def __len__(self):
+        return self.size
+
+    def statistic(self):
+        hit = miss = 0
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                shard_hit, shard_miss = shard.statistic()
+            hit += shard_hit
+            miss += shard_miss
+        return hit, miss
+
+    def __getitem__(self, key):
+        shard, lock = self._select(key)
+        with lock:
+            return shard[key]
+
+    def __setitem__(self, key, value):
+        shard, lock = self._select(key)
+        with lock:
+            shard[key] = value
+
+    def _partition(self, keys):
+        # Group keys by shard, so that every lock is taken once per batch.
+        batches = [[] for _ in self._shards]
+        for key in keys:
+            batches[hash(key) % len(self._shards)].append(key)
+        return batches
+
+    def get_many(self, keys):
+        hits = {}
+        misses = []
+        for shard, lock, batch in zip(self._shards, self._locks, self._partition(keys)):
+            if batch:
+                with lock:
+                    shard_hits, shard_misses = shard.get_many(batch)
+                hits.update(shard_hits)
+                misses += shard_misses
+        return hits, misses
+
+    def set_many(self, items):
+        batches = [[] for _ in self._shards]
+        for key, value in iter_items(items):
+            batches[hash(key) % len(self._shards)].append((key, value))
+        for shard, lock, batch in zip(self._shards, self._locks, batches):
+            if batch:
+                with lock:
+                    shard.set_many(batch)
+
+    def touch_many(self, keys):
+        for shard, lock, batch in zip(self._shards, self._locks, self._partition(keys)):
+            if batch:
+                with lock:
+                    shard.touch_many(batch)
+
+    def discard_lru(self):
+        # There is no global recency order. Discard from the fullest shard instead.
+        index = max(range(len(self._shards)), key=lambda index: len(self._shards[index]))
+        with self._locks[index]:
+            self._shards[index].discard_lru()
+
+    def __delitem__(self, key):
+        shard, lock = self._select(key)
+        with lock:
+            del shard[key]
+
+
+class Clock_Cache(Instrumentable, BulkAccess):
+    """
+        Approximation of LRU_Cache, also known as second-chance cache.
+
+        Entries live in fixed slots of preallocated arrays. A hit merely sets the slot's reference bit, instead of
+        reordering any recency structure. When the cache is full, a clock hand sweeps over the slots circularly,
+        clearing reference bits as it goes, and evicts the first entry whose bit is already clear.
+
+        Advantage: hit path is as cheap as a dictionary lookup plus a byte store.
+        Disadvantage: evicted entry is not necessarily the least recently used one.
+
+        Reference: F. J. Corbató, "A Paging Experiment with the Multics System", 1968.
+
+        Complexity
+        ----------
+        | Operation | Complexity |
+        ==========================
+        | get item | O(1) |
+        | set item | Amortized O(1) |
+        | delete item | O(1) |
+    """
+
+    def __init__(self, maxsize=128):
+        if not isinstance(maxsize, int) or maxsize <= 0:
+            raise ValueError("Invalid *maxsize* setting")
+        self._maxsize = maxsize
+        # _indexer maps key to the slot holding it.
+        self._indexer = {}
+        self._keys = [EMPTY] * maxsize
+        self._values = [None] * maxsize
+        self._referenced = bytearray(maxsize)
+        # Stack of vacant slots. Popped in ascending order when the cache is filled from empty.
+        self._free = list(range(maxsize - 1, -1, -1))
+        self._hand = 0
+        self._hit = 0
+        self._miss = 0
+        self._instrumentation = None
+
+    __slots__ = ["_maxsize", "_indexer", "_keys", "_values", "_referenced",
+                 "_free", "_hand", "_hit", "_miss", "_instrumentation"]
+
+    def clear(self):
+        self._indexer.clear()
+        self._keys = [EMPTY] * self._maxsize
+        self._values = [None] * self._maxsize
+        self._referenced = bytearray(self._maxsize)
+        self._free = list(range(self._maxsize - 1, -1, -1))
+        self._hand = 0
+        self._hit = 0
+        self._miss = 0
+
+    @property
+    def size(self):
+        return len(self._indexer)
+
+    def __len__(self):
+        return self.size
+
+    def statistic(self):
+        return self._hit, self._miss
+
+    def __getitem__(self, key):
+        try:
+            slot = self._indexer[key]
+        except KeyError:
+            self._miss += 1
+            if self._instrumentation is not None:
+                self._instrumentation.record_miss(key)
+            raise
+        self._hit += 1
+        self._referenced[slot] = 1
+        return self._values[slot]
+
+    def touch_many(self, keys):
+        indexer = self._indexer
+        referenced = self._referenced
+        for key in keys:
+            slot = indexer.get(key)
+            if slot is not None:
+                referenced[slot] = 1
+
+    def __setitem__(self, key, value):
+        slot = self._indexer.get(key)
+        if slot is not None:
+            self._values[slot] = value
+            self._referenced[slot] = 1
+            if self._instrumentation is not None:
+                self._instrumentation.record_set(True)
+            return
+
+        if not self._free:
+            self.discard_lru()
+        slot = self._free.pop()
+        self._keys[slot] = key
+        self._values[slot] = value
+        self._referenced[slot] = 0
+        self._indexer[key] = slot
+        if self._instrumentation is not None:
+            self._instrumentation.record_set(False)
+
+    def discard_lru(self):
+        if not self._indexer:
+            raise IndexError("Empty cache has nothing to discard")
+        keys = self._keys
+        referenced = self._referenced
+        hand = self._hand
+        # Terminate within two rounds, since the first round clears every reference bit.
+        while True:
+            slot = hand
+            hand += 1
+            if hand == self._maxsize:
+                hand = 0
+            if keys[slot] is EMPTY:
+                continue
+            if referenced[slot]:
+                referenced[slot] = 0
+                continue
+            break
+        self._hand = hand
+        if self._instrumentation is not None:
+            self._instrumentation.record_eviction(keys[slot], self._values[slot])
+        self._evict_slot(slot)
+
+    def __delitem__(self, key):
+        self._evict_slot(self._indexer[key])
+
+    def _evict_slot(self, slot):
+        del self._indexer[self._keys[slot]]
+        self._keys[slot] = EMPTY
+        self._values[slot] = None
+        self._referenced[slot] = 0
+        self._free.append(slot)
+
+
+class ARC_Cache(Instrumentable, BulkAccess):
+    """
+        Adaptive Replacement Cache.
+
+        Resident entries are split into T1, used once recently, and T2, used at least twice recently. Ghost lists B1 and
+        B2 remember the keys, but not values, recently discarded from T1 and T2 respectively. A miss on a ghost key
+        shifts the target size of T1, so that the cache balances recency against frequency on the fly. A sequential
+        scan only churns through T1, sparing the frequently used entries in T2.
+
+        Reference: N. Megiddo and D. S. Modha, "ARC: A Self-Tuning, Low Overhead Replacement Cache", 2003.
+
+        Complexity
+        ----------
+        Same as LRU_Cache.
+    """
+
+    def __init__(self, maxsize=128):
+        if not isinstance(maxsize, int) or maxsize <= 0:
+            raise ValueError("Invalid *maxsize* setting")
+        self._maxsize = maxsize
+        self._storage = {}
+        self._t1 = RecencyTracker()
+        self._t2 = RecencyTracker()
+        self._b1 = RecencyTracker()
+        self._b2 = RecencyTracker()
+        # Target size of T1, adapted by misses on ghost keys.
+        self._p = 0
+        self._hit = 0
+        self._miss = 0
+        self._instrumentation = None
+
+    __slots__ = ["_maxsize", "_storage", "_t1", "_t2", "_b1", "_b2", "_p", "_hit", "_miss", "_instrumentation"]
+
+    def clear(self):
+        self._storage.clear()
+        for tracker in (self._t1, self._t2, self._b1, self._b2):
+            tracker.clear()
+        self._p = 0
+        self._hit = 0
+        self._miss = 0
+
+    @property
+    def size(self):
+        return len(self._storage)
+
+    def __len__(self):
+        return self.size
+
+    def statistic(self):
+        return self._hit, self._miss
+
+    def __getitem__(self, key):
+        try:
+            value = self._storage[key]
+        except KeyError:
+            self._miss += 1
+            if self._instrumentation is not None:
+                self._instrumentation.record_miss(key)
+            raise
+        self._hit += 1
+        self._touch(key)
+        return value
+
+    def _touch(self, key):
+        if key in self._t1:
+            self._t1.remove(key)
+        self._t2.update_mru(key)
+
+    def __setitem__(self, key, value):
+        if key in self._storage:
+            self._storage[key] = value
+            self._touch(key)
+            if self._instrumentation is not None:
+                self._instrumentation.record_set(True)
+            return
 
+        maxsize = self._maxsize
+        if key in self._b1:
+            # Discarded from T1 too early. Favour recency by enlarging T1.
+            self._p = min(maxsize, self._p + max(len(self._b2) / len(self._b1), 1))
+            self._b1.remove(key)
+            self._make_room(in_b2=False)
+            self._t2.update_mru(key)
+        elif key in self._b2:
+            # Discarded from T2 too early. Favour frequency by shrinking T1.
+            self._p = max(0, self._p - max(len(self._b1) / len(self._b2), 1))
+            self._b2.remove(key)
+            self._make_room(in_b2=True)
+            self._t2.update_mru(key)
+        else:
+            l1 = len(self._t1) + len(self._b1)
+            if l1 >= maxsize:
+                if len(self._t1) < maxsize:
+                    self._b1.pop_lru()
+                    self._make_room(in_b2=False)
+                else:
+                    self._evict(self._t1.pop_lru())
+            else:
+                if l1 + len(self._t2) + len(self._b2) >= 2 * maxsize:
+                    self._b2.pop_lru()
+                self._make_room(in_b2=False)
+            self._t1.update_mru(key)
+        self._storage[key] = value
+        if self._instrumentation is not None:
+            self._instrumentation.record_set(False)
+
+    def _make_room(self, in_b2):
+        if len(self._storage) >= self._maxsize:
+            self._replace(in_b2)
+
+    def _replace(self, in_b2):
+        t1 = len(self._t1)
+        if t1 and (t1 > self._p or (in_b2 and t1 == self._p) or not self._t2):
+            key = self._t1.pop_lru()
+            self._b1.update_mru(key)
+        else:
+            key = self._t2.pop_lru()
+            self._b2.update_mru(key)
+        self._evict(key)
+
+    def _evict(self, key):
+        value = self._storage.pop(key)
+        if self._instrumentation is not None:
+            self._instrumentation.record_eviction(key, value)
 
+    def discard_lru(self):
+        if not self._storage:
+            raise IndexError("Empty cache has nothing to discard")
+        self._replace(in_b2=False)
+
+    def __delitem__(self, key):
+        del self._storage[key]
+        if key in self._t1:
+            self._t1.remove(key)
+        else:
+            self._t2.remove(key)
+
+
+class TwoQueue_Cache(Instrumentable, BulkAccess):
+    """
+        2Q cache.
+
+        New entries are admitted into A1in, a small FIFO queue. Only entries requested again after falling out of A1in,
+        as remembered by the ghost FIFO queue A1out, are admitted into Am, the main LRU queue. One-off entries, like
+        those of a sequential scan, pass through A1in without disturbing Am.
+
+        Reference: T. Johnson and D. Shasha, "2Q: A Low Overhead High Performance Buffer Management Replacement
+        Algorithm", 1994.
+
+        Complexity
+        ----------
+        Same as LRU_Cache.
+    """
 
-class Clock_Cache:
     def __init__(self, maxsize=128):
-        raise NotImplementedError
+        if not isinstance(maxsize, int) or maxsize <= 0:
+            raise ValueError("Invalid *maxsize* setting")
+        self._maxsize = maxsize
+        # Tuning recommended by the paper: A1in holds 25% of the entries, A1out remembers 50% as many keys.
+        self._a1in_maxsize = max(1, maxsize // 4)
+        self._a1out_maxsize = max(1, maxsize // 2)
+        self._storage = {}
+        # RecencyTracker works as FIFO queue too, when entries are never updated.
+        self._a1in = RecencyTracker()
+        self._a1out = RecencyTracker()
+        self._am = RecencyTracker()
+        self._hit = 0
+        self._miss = 0
+        self._instrumentation = None
+
+    __slots__ = ["_maxsize", "_a1in_maxsize", "_a1out_maxsize", "_storage",
+                 "_a1in", "_a1out", "_am", "_hit", "_miss", "_instrumentation"]
+
+    def clear(self):
+        self._storage.clear()
+        for tracker in (self._a1in, self._a1out, self._am):
+            tracker.clear()
+        self._hit = 0
+        self._miss = 0
+
+    @property
+    def size(self):
+        return len(self._storage)
+
+    def __len__(self):
+        return self.size
+
+    def statistic(self):
+        return self._hit, self._miss
+
+    def __getitem__(self, key):
+        try:
+            value = self._storage[key]
+        except KeyError:
+            self._miss += 1
+            if self._instrumentation is not None:
+                self._instrumentation.record_miss(key)
+            raise
+        self._hit += 1
+        self._touch(key)
+        return value
+
+    def _touch(self, key):
+        # Entry in A1in stays in place. Correlated references shortly after admission don't count.
+        if key in self._am:
+            self._am.update_mru(key)
+
+    def __setitem__(self, key, value):
+        if key in self._storage:
+            self._storage[key] = value
+            if key in self._am:
+                self._am.update_mru(key)
+            if self._instrumentation is not None:
+                self._instrumentation.record_set(True)
+            return
+
+        # Look up A1out before reclaiming, which may push the very key out of A1out.
+        if key in self._a1out:
+            self._a1out.remove(key)
+            tracker = self._am
+        else:
+            tracker = self._a1in
+        if len(self._storage) >= self._maxsize:
+            self._reclaim()
+        tracker.update_mru(key)
+        self._storage[key] = value
+        if self._instrumentation is not None:
+            self._instrumentation.record_set(False)
+
+    def _reclaim(self):
+        if len(self._a1in) > self._a1in_maxsize or not self._am:
+            key = self._a1in.pop_lru()
+            self._a1out.update_mru(key)
+            if len(self._a1out) > self._a1out_maxsize:
+                self._a1out.pop_lru()
+        else:
+            key = self._am.pop_lru()
+        value = self._storage.pop(key)
+        if self._instrumentation is not None:
+            self._instrumentation.record_eviction(key, value)
+
+    def discard_lru(self):
+        if not self._storage:
+            raise IndexError("Empty cache has nothing to discard")
+        self._reclaim()
+
+    def __delitem__(self, key):
+        del self._storage[key]
+        if key in self._am:
+            self._am.remove(key)
+        else:
+            self._a1in.remove(key)
+
+
+class WTinyLFU_Cache(Instrumentable, BulkAccess):
+    """
+        Window TinyLFU cache.
+
+        New entries enter a small LRU window, which absorbs bursts. An entry falling out of the window is a candidate
+        for the main cache, a segmented LRU. It's admitted only if its estimated access frequency beats that of the
+        main cache's eviction victim. Frequency is estimated by a count-min sketch with periodic aging, so the
+        admission filter remembers popularity of keys long gone from the cache in constant space. Scanned entries
+        are seldom frequent enough to be admitted.
+
+        Main cache is split into probation and protected segments. Admitted entries are on probation until hit again,
+        then promoted to the protected segment. Victims are chosen from probation first.
+
+        Reference: G. Einziger, R. Friedman and B. Manes, "TinyLFU: A Highly Efficient Cache Admission Policy", 2017.
+
+        Complexity
+        ----------
+        Same as LRU_Cache, plus O(1) sketch update per access.
+    """
+
+    def __init__(self, maxsize=128):
+        if not isinstance(maxsize, int) or maxsize <= 0:
+            raise ValueError("Invalid *maxsize* setting")
+        self._maxsize = maxsize
+        # Tuning recommended by the paper: window takes 1% of the capacity, protected segment takes 80% of the rest.
+        self._window_maxsize = max(1, maxsize // 100)
+        self._main_maxsize = maxsize - self._window_maxsize
+        self._protected_maxsize = self._main_maxsize * 4 // 5
+        self._storage = {}
+        self._window = RecencyTracker()
+        self._probation = RecencyTracker()
+        self._protected = RecencyTracker()
+        # _segments tracks the tracker in which the entry currently lives.
+        self._segments = {}
+        self._sketch = CountMinSketch(width=maxsize)
+        self._hit = 0
+        self._miss = 0
+        self._instrumentation = None
+
+    __slots__ = ["_maxsize", "_window_maxsize", "_main_maxsize", "_protected_maxsize", "_storage",
+                 "_window", "_probation", "_protected", "_segments", "_sketch", "_hit", "_miss",
+                 "_instrumentation"]
+
+    def clear(self):
+        self._storage.clear()
+        for tracker in (self._window, self._probation, self._protected):
+            tracker.clear()
+        self._segments.clear()
+        self._sketch.clear()
+        self._hit = 0
+        self._miss = 0
+
+    @property
+    def size(self):
+        return len(self._storage)
+
+    def __len__(self):
+        return self.size
+
+    def statistic(self):
+        return self._hit, self._miss
+
+    def __getitem__(self, key):
+        self._sketch.increment(key)
+        try:
+            value = self._storage[key]
+        except KeyError:
+            self._miss += 1
+            if self._instrumentation is not None:
+                self._instrumentation.record_miss(key)
+            raise
+        self._hit += 1
+        self._touch(key)
+        return value
+
+    def _touch(self, key):
+        segment = self._segments[key]
+        if segment is self._probation:
+            self._probation.remove(key)
+            self._protected.update_mru(key)
+            self._segments[key] = self._protected
+            if len(self._protected) > self._protected_maxsize:
+                demoted = self._protected.pop_lru()
+                self._probation.update_mru(demoted)
+                self._segments[demoted] = self._probation
+        else:
+            segment.update_mru(key)
+
+    def __setitem__(self, key, value):
+        if key in self._storage:
+            self._storage[key] = value
+            self._touch(key)
+            if self._instrumentation is not None:
+                self._instrumentation.record_set(True)
+            return
+
+        self._sketch.increment(key)
+        self._storage[key] = value
+        self._window.update_mru(key)
+        self._segments[key] = self._window
+        if len(self._window) > self._window_maxsize:
+            self._admit(self._window.pop_lru())
+        if self._instrumentation is not None:
+            self._instrumentation.record_set(False)
+
+    def _admit(self, candidate):
+        if len(self._probation) + len(self._protected) < self._main_maxsize:
+            self._probation.update_mru(candidate)
+            self._segments[candidate] = self._probation
+            return
+
+        victim_segment = self._probation if self._probation else self._protected
+        if victim_segment and self._sketch.frequency(candidate) > self._sketch.frequency(victim_segment.get_lru()):
+            self._forget(victim_segment.pop_lru())
+            self._probation.update_mru(candidate)
+            self._segments[candidate] = self._probation
+        else:
+            self._forget(candidate)
+
+    def _forget(self, key):
+        value = self._storage.pop(key)
+        del self._segments[key]
+        if self._instrumentation is not None:
+            self._instrumentation.record_eviction(key, value)
+
+    def discard_lru(self):
+        for segment in (self._probation, self._window, self._protected):
+            if segment:
+                self._forget(segment.pop_lru())
+                return
+        raise IndexError("Empty cache has nothing to discard")
+
+    def __delitem__(self, key):
+        del self._storage[key]
+        self._segments.pop(key).remove(key)
 
 
 class ComparableWrapper:
@@ -110,14 +1088,17 @@ class ComparableWrapper:
         return self.key == arg.key
 
 
-class SplayTree_Cache(SplayTreeWithMaxsize):
+class SplayTree_Cache(Instrumentable, SplayTreeWithMaxsize):
     def __init__(self, maxsize=128):
         super().__init__(maxsize)
         self._hit = 0
         self._miss = 0
+        self._instrumentation = None
 
     def insert(self, key, value):
         result = self.find(key)
+        if self._instrumentation is not None:
+            self._instrumentation.record_set(result is not None)
         if result is None:
             super().insert(ComparableWrapper(key, value))
         elif result == value:
@@ -133,11 +1114,16 @@ class SplayTree_Cache(SplayTreeWithMaxsize):
             return self.root.value
         else:
             self._miss += 1
+            if self._instrumentation is not None:
+                self._instrumentation.record_miss(key)
             return None
 
     def delete(self, key):
         super().delete(ComparableWrapper(key, None))
 
+    def statistic(self):
+        return self._hit, self._miss
+
     @property
     def hit(self):
         return self._hit
@@ -155,40 +1141,279 @@ class SplayTree_Cache(SplayTreeWithMaxsize):
 Cache = LRU_Cache
 
 
-def hash_function_arguments(*args, **kw):
-    # When there is only one argument and its type is trivial, we simply return itself as a key.
-    # This is for accelerating lookup speed, which is critical factor in Cache application.
-    # Some of ideas here owe reference and inspiration from Python's built-in
-    # functools module's source code.
-    trivial_type = (int, str, frozenset, type(None))
-    if len(args) == 1 and len(kw) == 0 and isinstance(args[0], trivial_type):
-        return args[0]
+class HashedSeq(list):
+    """
+        Key of a function call, holding its arguments, with hash computed only once. Dictionary lookup hashes the key
+        once per lookup, and a cache may look the same key up several times in one call, e.g. when coalescing misses.
+        Unlike a bare hash value, keys of different arguments are never equal, even when their hash collides.
+    """
+
+    __slots__ = ["hashvalue"]
+
+    def __init__(self, seq):
+        self[:] = seq
+        self.hashvalue = hash(seq)
+
+    def __hash__(self):
+        return self.hashvalue
+
+    def __reduce__(self):
+        # Leave out hashvalue, which is salted per process for str and bytes.
+        return self.__class__, (tuple(self),)
+
 
-    global SENTINEL
-    SENTINEL = object()
-    return hash((*args, SENTINEL, *kw.items()))
+# Separates positional from keyword arguments in keys. Being a class, it pickles by reference, and stays unique.
+class KeywordMark:
+    pass
 
 
-def cache_decorator(maxsize=128):
+# Single argument of these types is its own key, saving the allocation of HashedSeq. Their hash is cheap, or cached.
+FAST_TYPES = {int, str}
+
+
+def build_key(args, kw, typed=False):
+    """
+        Build cache key of a call with positional arguments *args* and keyword arguments *kw*.
+        With *typed*, arguments of different types are cached separately, e.g. f(1) and f(1.0).
+        Keyword arguments given in different order make different keys.
+    """
+    if not kw:
+        if len(args) == 1 and type(args[0]) in FAST_TYPES:
+            return args[0]
+        if typed:
+            return HashedSeq(args + tuple(map(type, args)))
+        return HashedSeq(args)
+
+    key = args + (KeywordMark,)
+    for item in kw.items():
+        key += item
+    if typed:
+        key += tuple(map(type, args))
+        key += tuple(map(type, kw.values()))
+    return HashedSeq(key)
+
+
+def cache_decorator(maxsize=128, ttl=None, policy=None, backend="local", instrument=False, typed=False,
+                    refresh_after=None, refresh_ahead=None, refresh_workers=4):
     """
         Decorator.
-        Arguments to the user function must be hashable.
+        Arguments to the user function must be hashable. With *typed*, arguments of different types are cached
+        separately, e.g. f(1) and f(1.0).
+        Results expire after *ttl* seconds if it's given.
+        *policy* is the cache class to use, e.g. LRU_Cache (default), Clock_Cache, ARC_Cache, TwoQueue_Cache or
+        WTinyLFU_Cache. Any class taking *maxsize* and implementing the mapping interface fits in.
+        *backend* is either "local", caching in process memory, or "shared", caching in a SharedMemory_Cache shared by
+        processes forked after decoration. Arguments and results must be picklable for the latter. Its segment is
+        destroyed at exit, or earlier by calling `wrapper.__cache__.close()` then `wrapper.__cache__.unlink()`.
+        With *instrument*, the cache is instrumented, and the time taken by every call to the user function is
+        recorded in `wrapper.__cache__.instrumentation.load_time`.
+
+        Both plain functions and coroutine functions can be decorated.
+        Concurrent misses on the same key are coalesced (single-flight): only one caller invokes the user function,
+        the others wait for its outcome, be they threads calling a plain function or tasks awaiting a coroutine function.
+
+        Stale-while-revalidate: a result older than *refresh_after* seconds is still returned immediately, while it's
+        recomputed in background, by a pool of *refresh_workers* threads for plain functions, or by an asyncio task
+        for coroutine functions. Given *ttl*, *refresh_ahead* seconds before expiry likewise triggers refresh, so that
+        keys hit often enough never expire, while the others do. A key is refreshed by one call at a time. A failed
+        refresh leaves the stale result in place, to be refreshed again on next hit. Cached entries are then pairs of
+        result and the time it was computed.
     """
+    if backend == "shared":
+        if policy is not None or ttl is not None:
+            raise ValueError("Shared backend supports neither *policy* nor *ttl*")
+        policy = SharedMemory_Cache
+    elif backend != "local":
+        raise ValueError("Invalid *backend* setting")
+    if policy is None:
+        policy = Cache
+    if refresh_after is not None and refresh_after <= 0:
+        raise ValueError("Invalid *refresh_after* setting")
+    if refresh_ahead is not None and (ttl is None or not 0 < refresh_ahead < ttl):
+        raise ValueError("Invalid *refresh_ahead* setting")
+    if not isinstance(refresh_workers, int) or refresh_workers <= 0:
+        raise ValueError("Invalid *refresh_workers* setting")
+
+    # Age beyond which a result is refreshed on hit, or None if never.
+    soft_age = min(refresh_after if refresh_after is not None else INFINITY,
+                   ttl - refresh_ahead if refresh_ahead is not None else INFINITY)
+    if soft_age == INFINITY:
+        soft_age = None
+
     def decorator(user_function):
-        cache = Cache()
+        cache = policy(maxsize) if ttl is None else policy(maxsize, ttl=ttl)
+        instrumentation = cache.instrument() if instrument else None
+        # Maps key to the future of the in-flight call to user function, be it a load on miss or a refresh.
+        pending = {}
 
-        @wraps(user_function)
-        def wrapper(*args, **kw):
+        def make_key(args, kw):
             try:
-                key = hash_function_arguments(*args, **kw)
-                return cache[key]
+                return build_key(args, kw, typed)
             except TypeError:
                 raise ValueError("arguments passed to function {} is unhashable: {}".format(user_function.__name__, (args, kw)))
-            except KeyError:
-                value = user_function(*args, **kw)
-                cache[key] = value
+
+        def store(key, value):
+            cache[key] = value if soft_age is None else (value, monotonic())
+
+        def is_stale(key, loaded):
+            return key not in pending and monotonic() - loaded >= soft_age
+
+        if iscoroutinefunction(user_function):
+            def settle(key, begin, task):
+                del pending[key]
+                if instrumentation is not None:
+                    instrumentation.record_load(perf_counter() - begin)
+                # Retrieving the exception also spares warning of a failed refresh nobody awaits.
+                if not task.cancelled() and task.exception() is None:
+                    try:
+                        store(key, task.result())
+                    except Exception:
+                        # Result can't be stored, e.g. too large for the shared backend. Awaiters still get it.
+                        pass
+
+            def start(key, args, kw):
+                task = pending[key] = ensure_future(user_function(*args, **kw))
+                task.add_done_callback(partial(settle, key, perf_counter()))
+                return task
+
+            @wraps(user_function)
+            async def wrapper(*args, **kw):
+                key = make_key(args, kw)
+                try:
+                    entry = cache[key]
+                except KeyError:
+                    pass
+                else:
+                    if soft_age is None:
+                        return entry
+                    value, loaded = entry
+                    if is_stale(key, loaded):
+                        start(key, args, kw)
+                    return value
+                task = pending.get(key)
+                if task is None:
+                    task = start(key, args, kw)
+                # Shield the shared task, so that one cancelled caller doesn't cancel it for everyone.
+                return await shield(task)
+
+        else:
+            lock = Lock()
+            # Created on first refresh.
+            executor = None
+
+            def load(key, args, kw, future):
+                begin = perf_counter()
+                try:
+                    value = user_function(*args, **kw)
+                except BaseException as error:
+                    with lock:
+                        del pending[key]
+                    future.set_exception(error)
+                    raise
+                finally:
+                    if instrumentation is not None:
+                        instrumentation.record_load(perf_counter() - begin)
+                try:
+                    with lock:
+                        try:
+                            store(key, value)
+                        except Exception:
+                            # E.g. result too large for a slot of the shared backend, or unpicklable. Returned
+                            # uncached rather than leaving waiters blocked forever.
+                            pass
+                        finally:
+                            del pending[key]
+                finally:
+                    future.set_result(value)
                 return value
 
+            def refresh(key, args, kw, future):
+                try:
+                    load(key, args, kw, future)
+                except Exception:
+                    # The stale result stays. Callers waiting on the future receive the exception.
+                    pass
+
+            @wraps(user_function)
+            def wrapper(*args, **kw):
+                nonlocal executor
+                key = make_key(args, kw)
+                with lock:
+                    try:
+                        entry = cache[key]
+                    except KeyError:
+                        pass
+                    else:
+                        if soft_age is None:
+                            return entry
+                        value, loaded = entry
+                        if is_stale(key, loaded):
+                            if executor is None:
+                                executor = ThreadPoolExecutor(refresh_workers, thread_name_prefix="cache-refresh")
+                            future = pending[key] = Future()
+                            executor.submit(refresh, key, args, kw, future)
+                        return value
+                    future = pending.get(key)
+                    is_leader = future is None
+                    if is_leader:
+                        future = pending[key] = Future()
+
+                if not is_leader:
+                    return future.result()
+                return load(key, args, kw, future)
+
+        wrapper.__cache__ = cache
+        return wrapper
+
+    return decorator
+
+
+def batched_cache(maxsize=128, ttl=None, policy=None):
+    """
+        Decorator of a batch loading function, which takes a list of keys, and returns a mapping from keys to their
+        values. Keys absent from the returned mapping are deemed not found, and are not cached.
+        The decorated function takes an iterable of keys, and returns a dict of the found ones, in order of *keys*.
+        The user function is called at most once per call, with the keys missing from cache only, or not at all.
+        Keys must be hashable. *maxsize*, *ttl* and *policy* are as in `cache_decorator`.
+
+        Both plain functions and coroutine functions can be decorated. Concurrent calls with overlapping keys may
+        load the same key more than once.
+    """
+    if policy is None:
+        policy = Cache
+
+    def decorator(user_function):
+        cache = policy(maxsize) if ttl is None else policy(maxsize, ttl=ttl)
+
+        def collect(keys, hits):
+            return {key: hits[key] for key in keys if key in hits}
+
+        if iscoroutinefunction(user_function):
+            @wraps(user_function)
+            async def wrapper(keys):
+                keys = list(keys)
+                hits, misses = cache.get_many(keys)
+                if misses:
+                    loaded = await user_function(list(dict.fromkeys(misses)))
+                    cache.set_many(loaded)
+                    hits.update(loaded)
+                return collect(keys, hits)
+
+        else:
+            lock = Lock()
+
+            @wraps(user_function)
+            def wrapper(keys):
+                keys = list(keys)
+                with lock:
+                    hits, misses = cache.get_many(keys)
+                if misses:
+                    loaded = user_function(list(dict.fromkeys(misses)))
+                    with lock:
+                        cache.set_many(loaded)
+                    hits.update(loaded)
+                return collect(keys, hits)
+
         wrapper.__cache__ = cache
         return wrapper
 
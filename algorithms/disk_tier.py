@@ -0,0 +1,155 @@
+"""
+Disk tier of caches.
+
+SpillFile is an append-only segment file holding entries discarded from memory, with an in-memory index of their
+offsets. Overwritten and removed records become garbage, which is compacted away once it outweighs live records.
+The file is truncated on opening, as the index doesn't survive the process. Use snapshots for warm restart instead.
+
+Snapshot is a compact binary stream of cache entries, written by `write_snapshot` and read back by `read_snapshot`.
+
+Both formats are sequences of records, each being a pickled tuple prefixed with its length.
+
+Complexity
+----------
+| Operation | Complexity |
+--------------------------
+| put | O(1) |
+| get | O(1) |
+| pop | Amortized O(1) |
+"""
+
+__all__ = ["SpillFile", "write_snapshot", "read_snapshot"]
+
+import os
+import pickle
+import struct
+
+RECORD_HEADER = struct.Struct("<I")
+
+SNAPSHOT_MAGIC = b"PYDSA-SNAPSHOT\x01"
+
+# Compaction is not worth it until garbage grows beyond this size in bytes.
+MIN_COMPACTION_GARBAGE = 1 << 20
+
+
+def write_record(file, record):
+    payload = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+    file.write(RECORD_HEADER.pack(len(payload)))
+    file.write(payload)
+    return RECORD_HEADER.size + len(payload)
+
+
+def read_record(file):
+    """Return next record in file, or None at end of file."""
+    header = file.read(RECORD_HEADER.size)
+    if not header:
+        return None
+    if len(header) < RECORD_HEADER.size:
+        raise ValueError("Truncated record")
+    length, = RECORD_HEADER.unpack(header)
+    payload = file.read(length)
+    if len(payload) < length:
+        raise ValueError("Truncated record")
+    return pickle.loads(payload)
+
+
+def write_snapshot(file, entries):
+    """Write iterable of (key, value, ttl) to binary *file*. *ttl* is remaining seconds to live, or None."""
+    file.write(SNAPSHOT_MAGIC)
+    for entry in entries:
+        write_record(file, entry)
+
+
+def read_snapshot(file):
+    """Generate (key, value, ttl) from binary *file* written by `write_snapshot`."""
+    if file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+        raise ValueError("Not a snapshot file")
+    while True:
+        record = read_record(file)
+        if record is None:
+            return
+        yield record
+
+
+class SpillFile:
+    def __init__(self, path, maxbytes=None):
+        if maxbytes is not None and maxbytes <= 0:
+            raise ValueError("Invalid *maxbytes* setting")
+        self._path = path
+        self._maxbytes = maxbytes
+        self._file = open(path, "w+b")
+        # _index maps key to (offset, length) of its record. Insertion order is spill order, oldest first.
+        self._index = {}
+        self._end = 0
+        self._live_bytes = 0
+
+    __slots__ = ["_path", "_maxbytes", "_file", "_index", "_end", "_live_bytes"]
+
+    def close(self):
+        self._file.close()
+
+    def clear(self):
+        self._file.seek(0)
+        self._file.truncate()
+        self._index.clear()
+        self._end = 0
+        self._live_bytes = 0
+
+    @property
+    def size(self):
+        return len(self._index)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def put(self, key, value):
+        self.discard(key)
+        self._file.seek(self._end)
+        length = write_record(self._file, (key, value))
+        self._index[key] = (self._end, length)
+        self._end += length
+        self._live_bytes += length
+        if self._maxbytes is not None:
+            # Drop the oldest spilled entries, as long as the newest one stays.
+            while self._live_bytes > self._maxbytes and len(self._index) > 1:
+                self.discard(next(iter(self._index)))
+
+    def get(self, key):
+        offset, _ = self._index[key]
+        self._file.seek(offset)
+        return read_record(self._file)[1]
+
+    def pop(self, key):
+        value = self.get(key)
+        self.discard(key)
+        return value
+
+    def discard(self, key):
+        try:
+            _, length = self._index.pop(key)
+        except KeyError:
+            return
+        self._live_bytes -= length
+        garbage = self._end - self._live_bytes
+        if garbage > self._live_bytes and garbage > MIN_COMPACTION_GARBAGE:
+            self._compact()
+
+    def _compact(self):
+        # Copy live records into a fresh file, then swap it in.
+        compact_path = self._path + ".compact"
+        index = {}
+        end = 0
+        with open(compact_path, "w+b") as compact_file:
+            for key, (offset, length) in self._index.items():
+                self._file.seek(offset)
+                compact_file.write(self._file.read(length))
+                index[key] = (end, length)
+                end += length
+        self._file.close()
+        os.replace(compact_path, self._path)
+        self._file = open(self._path, "r+b")
+        self._index = index
+        self._end = end
@@ -0,0 +1,76 @@
+"""
+Count-Min Sketch
+
+Estimates access frequency of entries in constant space. Each entry is hashed into one counter per row, and its
+estimated frequency is the minimum among those counters. Estimation never underestimates, while hash collisions
+may overestimate.
+
+Counters are single bytes saturating at 15, since only the relative popularity among recent accesses matters.
+To let stale popularity fade, all counters are halved (aging) once the number of increments reaches a sample size
+proportional to the width.
+
+Reference: G. Einziger, R. Friedman and B. Manes, "TinyLFU: A Highly Efficient Cache Admission Policy", 2017.
+
+Complexity:
+| Operation | Complexity |
+__________________________
+| increment | O(depth) |
+| frequency | O(depth) |
+| aging | O(width * depth), once every O(width) increments |
+"""
+
+__all__ = ["CountMinSketch"]
+
+
+MAX_COUNT = 15
+
+# Odd multipliers scrambling the hash differently for every row.
+SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+
+# Translation table halving every byte, so that aging runs at C speed via `bytearray.translate`.
+HALVE = bytes(count >> 1 for count in range(256))
+
+
+class CountMinSketch:
+    def __init__(self, width=1024, depth=4, sample_factor=10):
+        if not isinstance(width, int) or width <= 0:
+            raise ValueError("Invalid *width* setting")
+        if not isinstance(depth, int) or not 0 < depth <= len(SEEDS):
+            raise ValueError("Invalid *depth* setting")
+        # Round up to power of two, so that modulo reduces to bit masking.
+        width = 1 << (width - 1).bit_length()
+        self._mask = width - 1
+        self._depth = depth
+        self._table = bytearray(width * depth)
+        self._sample_size = sample_factor * width
+        self._additions = 0
+
+    __slots__ = ["_mask", "_depth", "_table", "_sample_size", "_additions"]
+
+    def clear(self):
+        self._table = bytearray(len(self._table))
+        self._additions = 0
+
+    def _indices(self, entry):
+        width = self._mask + 1
+        h = hash(entry)
+        for row in range(self._depth):
+            scrambled = ((h ^ (h >> 17)) * SEEDS[row]) & 0xFFFFFFFFFFFFFFFF
+            yield row * width + ((scrambled >> 32) & self._mask)
+
+    def increment(self, entry):
+        table = self._table
+        for index in self._indices(entry):
+            if table[index] < MAX_COUNT:
+                table[index] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._age()
+
+    def frequency(self, entry):
+        table = self._table
+        return min(table[index] for index in self._indices(entry))
+
+    def _age(self):
+        self._table = self._table.translate(HALVE)
+        self._additions //= 2
@@ -1,12 +1,30 @@
 """
 Heap
 
+Keys are unique, and ordered by themselves. Keys and values are stored in two parallel arrays, instead of one node
+object per item. Keys go to a compact `array.array` buffer if *typecode* is given, e.g. "d" for float keys, or to a
+list otherwise. Keys are taken as the array stores them, e.g. 0.1 becomes 0.10000000149011612 with typecode "f", so
+that two keys rounded to the same stored one are one key. Heap keeps an index mapping each key to its position,
+updated whenever an item moves, so that a key is located in O(1) instead of a linear scan.
+
+Sifts are iterative, and move a hole instead of swapping items at every level.
+
+Every item has up to *arity* children. A higher arity makes the tree shallower, so sift-up, i.e. insert, takes fewer
+steps, while sift-down, i.e. delete, compares more children per level. Push-heavy queues favour 4 or 8.
+
+Module-level `sift_up`, `sift_down` and `heapify` work on bare parallel key and item lists, without any key index,
+for heaps whose keys may repeat or be unhashable, e.g. TopK and merge.
+
 Complexity:
 | Operation | Complexity |
 __________________________
-| insert | O(N) |
-| delete | O(N) |
-| find | O(N) |
+| insert | O(log_d N) for arity d |
+| delete | O(d log_d N) |
+| pop | O(d log_d N) |
+| find | O(1) |
+| update_priority | O(d log_d N) |
+| decrease_key | O(log_d N) |
+| from_iterable | O(N) |
 | clear | O(1) |
 | get top | O(1) |
 | get size | O(1) |
@@ -14,142 +32,275 @@ __________________________
 
 __all__ = ['Heap']
 
+from abc import ABCMeta
+from array import array, typecodes
+from operator import gt, lt
+
 
-from math import floor
-from .tree.abstract_tree import BinaryNode as Node
+def sift_up(keys, items, before, index):
+    """Move entry at *index* of parallel *keys* and *items* up to its place, *before* being the priority order."""
+    key = keys[index]
+    item = items[index]
+    while index > 0:
+        parent = (index - 1) >> 1
+        parent_key = keys[parent]
+        if not before(key, parent_key):
+            break
+        keys[index] = parent_key
+        items[index] = items[parent]
+        index = parent
+    keys[index] = key
+    items[index] = item
 
 
-class InverseNode(Node):
-    """
-        Resembled inverse particle in physics, i.e. it has opposite behaviors with its counterpart.
-    """
+def sift_down(keys, items, before, index):
+    """Move entry at *index* of parallel *keys* and *items* down to its place, *before* being the priority order."""
+    size = len(keys)
+    key = keys[index]
+    item = items[index]
+    child = 2 * index + 1
+    while child < size:
+        right = child + 1
+        if right < size and before(keys[right], keys[child]):
+            child = right
+        child_key = keys[child]
+        if not before(child_key, key):
+            break
+        keys[index] = child_key
+        items[index] = items[child]
+        index = child
+        child = 2 * index + 1
+    keys[index] = key
+    items[index] = item
 
-    def __lt__(self, node):
-        return super().__gt__(node)
 
-    def __gt__(self, node):
-        return super().__lt__(node)
+def heapify(keys, items, before):
+    """Arrange parallel *keys* and *items* into a binary heap in O(N), *before* being the priority order."""
+    for index in reversed(range(len(keys) // 2)):
+        sift_down(keys, items, before, index)
 
 
-class Heap:
-    def __init__(self, priority_order="min"):
-        self._heap = []
+class Heap(metaclass=ABCMeta):
+    def __init__(self, priority_order="min", typecode=None, arity=2):
         if priority_order not in {"min", "max"}:
             raise ValueError("Invalid priority_order option.")
+        if typecode is not None and typecode not in typecodes:
+            raise ValueError("Invalid typecode option.")
+        if not isinstance(arity, int) or arity < 2:
+            raise ValueError("Invalid arity option.")
         self.priority_order = priority_order
+        # _before(a, b) tells whether key a has higher priority than key b.
+        self._before = lt if priority_order == "min" else gt
+        self._typecode = typecode
+        self._arity = arity
+        self._keys = [] if typecode is None else array(typecode)
+        self._values = []
+        # _index maps key to its position in _keys and _values.
+        self._index = {}
+
+    @classmethod
+    def from_iterable(cls, items, *args, **kwargs):
+        """
+            Build heap from iterable of (key, value) pairs in O(N), by heapifying bottom-up. Of duplicate keys, the
+            last value wins, like `insert`. Extra arguments are passed to the constructor.
+        """
+        heap = cls(*args, **kwargs)
+        if heap._typecode is None:
+            index = dict(items)
+        else:
+            index = {heap._normalize(key): value for key, value in items}
+        heap._keys.extend(index)
+        heap._values.extend(index.values())
+        heap._heapify()
+        return heap
+
+    def _heapify(self):
+        keys = self._keys
+        index = self._index
+        for position, key in enumerate(keys):
+            index[key] = position
+        # Items past the parent of the last item are leaves.
+        for position in reversed(range((self.size - 2) // self._arity + 1)):
+            self._sift_down(position)
+
+    def _normalize(self, key):
+        """Return *key* as stored by the key array, which may round it, e.g. to single precision for typecode "f"."""
+        if self._typecode is None:
+            return key
+        return array(self._typecode, (key,))[0]
 
     def insert(self, key, value=None):
-        index = self._find(key)
+        key = self._normalize(key)
+        index = self._index.get(key)
         if index is None:
-            if self.priority_order == "min":
-                node = Node(key, value)
-            elif self.priority_order == "max":
-                node = InverseNode(key, value)
-            self._heap.append(node)
-            new_node_index = self.size - 1
-            self._try_move_up(new_node_index)
+            self._keys.append(key)
+            self._values.append(value)
+            self._sift_up(self.size - 1)
         else:
-            self[index].value = value
+            self._values[index] = value
 
     def delete(self, key):
         index = self._find(key)
         if index is None:
             return None
+        return self._delete_at(index)[1]
 
-        node = self[index]
-        value = node.value
-        if self.size == 1:
-            self._heap = self[:-1]
-            return value
-        else:
-            tail = self[-1]
-            self._swap(node, tail)
-            self._heap = self[:-1]
+    def _delete_at(self, index):
+        """Remove item at *index*, and return it as (key, value)."""
+        keys = self._keys
+        values = self._values
+        key = keys[index]
+        value = values[index]
+        del self._index[key]
+        tail_key = keys.pop()
+        tail_value = values.pop()
+        if index < len(keys):
+            # Fill the hole with the tail item, which may belong above or below it.
+            keys[index] = tail_key
+            values[index] = tail_value
+            if self._sift_up(index) == index:
+                self._sift_down(index)
+        return key, value
 
-            self._try_move_up(index)
-            self._try_move_down(index)
-            return value
+    def pop(self):
+        """Remove item of the highest priority, and return it as (key, value). Raise IndexError if empty."""
+        if self.isEmpty():
+            raise IndexError("pop from empty heap")
+        return self._delete_at(0)
 
     def find(self, key):
         index = self._find(key)
         if index is None:
             return None
-        return self[index].value
+        return self._values[index]
 
-    # TODO: use more clever algorithm to improve performance
-    # When heap used as priority_queue, _find() degrade to top()
     def _find(self, key):
-        for index, node in enumerate(self._heap):
-            if node.key == key:
-                return index
-        return None
+        return self._index.get(self._normalize(key))
 
-    def _try_move_up(self, index):
-        if index == 0:
+    def update_priority(self, key, new_key):
+        """
+            Replace *key* by *new_key*, keeping its value, and restore heap order in whichever direction the item
+            has to move. Raise KeyError if *key* is absent, and ValueError if *new_key* is already present.
+        """
+        key = self._normalize(key)
+        new_key = self._normalize(new_key)
+        index = self._index.get(key)
+        if index is None:
+            raise KeyError(key)
+        if new_key == key:
             return
-        node = self[index]
-        parent_index = floor((index - 1) / 2)
-        parent = self[parent_index]
-        if node < parent:
-            self._swap(node, parent)
-            self._try_move_up(parent_index)
+        if new_key in self._index:
+            raise ValueError("Key {} already exists".format(new_key))
+        del self._index[key]
+        self._keys[index] = new_key
+        if self._sift_up(index) == index:
+            self._sift_down(index)
 
-    def _try_move_down(self, index):
-        node = self[index]
+    def decrease_key(self, key, new_key):
+        """
+            Like `update_priority`, but *new_key* must not rank after *key* in priority order, i.e. the item only
+            moves towards the top. Raise ValueError otherwise.
+        """
+        key = self._normalize(key)
+        new_key = self._normalize(new_key)
+        if key in self._index and self._before(key, new_key):
+            raise ValueError("New key {} has lower priority than {}".format(new_key, key))
+        self.update_priority(key, new_key)
 
-        left_child_index = 2 * index + 1
-        right_child_index = 2 * index + 2
+    def _sift_up(self, index):
+        """Move item at *index* up to its place, and return its new position."""
+        keys = self._keys
+        values = self._values
+        positions = self._index
+        before = self._before
+        arity = self._arity
+        key = keys[index]
+        value = values[index]
+        while index > 0:
+            parent = (index - 1) // arity
+            parent_key = keys[parent]
+            if not before(key, parent_key):
+                break
+            keys[index] = parent_key
+            values[index] = values[parent]
+            positions[parent_key] = index
+            index = parent
+        keys[index] = key
+        values[index] = value
+        positions[key] = index
+        return index
 
-        sentinel = self.size - 1
-
-        if left_child_index > sentinel:
-            return
-        elif node > self[left_child_index]:
-            self._swap(node, self[left_child_index])
-            self._try_move_down(left_child_index)
-        elif right_child_index > sentinel:
-            return
-        elif node > self[right_child_index]:
-            self._swap(node, self[right_child_index])
-            self._try_move_down(right_child_index)
-        else:
-            return
-
-    def _swap(self, node1, node2):
-        node1.key, node2.key = node2.key, node1.key
-        node1.value, node2.value = node2.value, node1.value
+    def _sift_down(self, index):
+        """Move item at *index* down to its place, and return its new position."""
+        keys = self._keys
+        values = self._values
+        positions = self._index
+        before = self._before
+        arity = self._arity
+        size = len(keys)
+        key = keys[index]
+        value = values[index]
+        first = arity * index + 1
+        while first < size:
+            # Pick the child of highest priority, otherwise the other children would end up above it.
+            child = first
+            child_key = keys[first]
+            for sibling in range(first + 1, min(first + arity, size)):
+                if before(keys[sibling], child_key):
+                    child = sibling
+                    child_key = keys[sibling]
+            if not before(child_key, key):
+                break
+            keys[index] = child_key
+            values[index] = values[child]
+            positions[child_key] = index
+            index = child
+            first = arity * index + 1
+        keys[index] = key
+        values[index] = value
+        positions[key] = index
+        return index
 
     def clear(self):
-        self._heap.clear()
+        del self._keys[:]
+        self._values.clear()
+        self._index.clear()
 
     @property
     def top(self):
         if self.isEmpty():
             return None
-        node = self[0]
-        return node.key, node.value
+        return self._keys[0], self._values[0]
+
+    @property
+    def arity(self):
+        return self._arity
 
     @property
     def size(self):
-        return len(self._heap)
+        return len(self._keys)
 
     def __len__(self):
         return self.size
 
+    def __contains__(self, key):
+        return self._normalize(key) in self._index
+
     def isEmpty(self):
         return self.size == 0
 
     def __iter__(self):
-        return iter(self._heap)
+        """Iterate over (key, value) pairs in heap array order."""
+        return zip(self._keys, self._values)
 
     def __str__(self):
-        pass
+        return "Heap({})".format(', '.join("{}: {}".format(key, value) for key, value in self))
 
-    # TODO: Customize __getitem__ to cover more cases.
     def __getitem__(self, n):
+        """Return (key, value) at position *n* of the heap array, or list of them for a slice."""
         if isinstance(n, int):
-            return self._heap[n]
+            return self._keys[n], self._values[n]
         elif isinstance(n, slice):
-            return self._heap[n]
+            return list(zip(self._keys[n], self._values[n]))
         else:
             raise IndexError("Invalid index.")
@@ -0,0 +1,190 @@
+"""
+Cache instrumentation.
+
+Every cache class derives from Instrumentable. Calling `cache.instrument()` attaches an Instrumentation, which
+counts insertions, overwrites, evictions and expirations, samples cache size over time, and invokes optional
+*on_evict(key, value)* and *on_miss(key)* callbacks. `cache_decorator(instrument=True)` additionally records how
+long misses take to load into a LatencyHistogram.
+
+Hits and misses are always counted by the cache itself, see `statistic()`. Instrumentation only hooks into miss,
+insertion and eviction paths, never the hit path. Detached instrumentation costs a single attribute test on those
+paths.
+"""
+
+__all__ = ["Instrumentable", "Instrumentation", "LatencyHistogram"]
+
+from collections import deque
+from math import frexp
+from time import monotonic
+
+
+class LatencyHistogram:
+    """
+        Histogram of durations with logarithmic buckets. Bucket i counts durations in [2^(i-1), 2^i) microseconds,
+        so that relative error is bounded by a factor of 2 from nanoseconds up to hours, in constant space.
+    """
+
+    BUCKETS = 48
+
+    def __init__(self):
+        self._buckets = [0] * self.BUCKETS
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    __slots__ = ["_buckets", "_count", "_total", "_max"]
+
+    def clear(self):
+        self._buckets = [0] * self.BUCKETS
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def record(self, seconds):
+        # Exponent of the microseconds in base 2, i.e. floor(log2(microseconds)) + 1.
+        index = frexp(seconds * 1e6)[1] if seconds > 0 else 0
+        self._buckets[min(max(index, 0), self.BUCKETS - 1)] += 1
+        self._count += 1
+        self._total += seconds
+        if seconds > self._max:
+            self._max = seconds
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def mean(self):
+        return self._total / self._count if self._count else 0.0
+
+    @property
+    def max(self):
+        return self._max
+
+    def percentile(self, fraction):
+        """Return upper bound in seconds of the bucket where the *fraction* quantile falls."""
+        if not 0 <= fraction <= 1:
+            raise ValueError("Invalid *fraction* setting")
+        if not self._count:
+            return 0.0
+        rank = fraction * self._count
+        cumulative = 0
+        for index, count in enumerate(self._buckets):
+            cumulative += count
+            if count and cumulative >= rank:
+                return min((1 << index) / 1e6, self._max)
+        return self._max
+
+    def buckets(self):
+        """Return list of (upper bound in seconds, count) of non-empty buckets."""
+        return [((1 << index) / 1e6, count) for index, count in enumerate(self._buckets) if count]
+
+
+class Instrumentation:
+    def __init__(self, cache, on_evict=None, on_miss=None, timer=monotonic, sample_interval=1.0, samples=1024):
+        if sample_interval < 0:
+            raise ValueError("Invalid *sample_interval* setting")
+        self._cache = cache
+        self.on_evict = on_evict
+        self.on_miss = on_miss
+        self._timer = timer
+        self._sample_interval = sample_interval
+        self._last_sample = float("-inf")
+        # Ring buffer of (time, size), oldest dropped first.
+        self._size_samples = deque(maxlen=samples)
+        self._insertions = 0
+        self._overwrites = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._load_time = LatencyHistogram()
+
+    __slots__ = ["_cache", "on_evict", "on_miss", "_timer", "_sample_interval", "_last_sample", "_size_samples",
+                 "_insertions", "_overwrites", "_evictions", "_expirations", "_load_time"]
+
+    def clear(self):
+        self._last_sample = float("-inf")
+        self._size_samples.clear()
+        self._insertions = 0
+        self._overwrites = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._load_time.clear()
+
+    def record_miss(self, key):
+        if self.on_miss is not None:
+            self.on_miss(key)
+
+    def record_set(self, overwrite):
+        if overwrite:
+            self._overwrites += 1
+        else:
+            self._insertions += 1
+            self._sample_size()
+
+    def record_eviction(self, key, value):
+        self._evictions += 1
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+        self._sample_size()
+
+    def record_expiration(self, key):
+        self._expirations += 1
+
+    def record_load(self, seconds):
+        self._load_time.record(seconds)
+
+    def _sample_size(self):
+        now = self._timer()
+        if now - self._last_sample >= self._sample_interval:
+            self._last_sample = now
+            self._size_samples.append((now, len(self._cache)))
+
+    @property
+    def load_time(self):
+        return self._load_time
+
+    @property
+    def size_samples(self):
+        return list(self._size_samples)
+
+    def report(self):
+        hit, miss = self._cache.statistic()
+        report = {
+            "hit": hit,
+            "miss": miss,
+            "hit_rate": hit / (hit + miss) if hit + miss else 0.0,
+            "size": len(self._cache),
+            "insertions": self._insertions,
+            "overwrites": self._overwrites,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+            "load_count": self._load_time.count,
+            "load_time_mean": self._load_time.mean,
+            "load_time_p99": self._load_time.percentile(0.99),
+        }
+        # Caches profiled by MissRatioProfiler report the estimated curve too.
+        profiler = getattr(self._cache, "profiler", None)
+        if profiler is not None:
+            report["miss_ratio_curve"] = profiler.curve()
+        return report
+
+
+class Instrumentable:
+    """
+        Mixin of cache classes, which initialize `self._instrumentation = None` and report events to it when it's
+        attached.
+    """
+
+    __slots__ = []
+
+    @property
+    def instrumentation(self):
+        return self._instrumentation
+
+    def instrument(self, on_evict=None, on_miss=None, **kw):
+        """Attach Instrumentation to the cache and return it. Keyword arguments are passed to Instrumentation."""
+        self._instrumentation = Instrumentation(self, on_evict, on_miss, **kw)
+        return self._instrumentation
+
+    def uninstrument(self):
+        self._instrumentation = None
@@ -0,0 +1,170 @@
+"""
+Memory-pressure-aware cache shrinking.
+
+Every LRU_Cache bounded by entry count registers itself in `registry` on construction, weakly, so that registration
+never keeps a cache alive. MemoryPressureMonitor samples memory usage of the process periodically. Above the high
+watermark, it shrinks one cache per sample, the largest or the coldest, by lowering its *maxsize*. Below the low
+watermark, it lets shrunk caches grow back step by step, up to their original *maxsize*.
+
+Resizing merely lowers the bound. The cache discards its surplus a few entries per lookup or insertion, from the
+thread using it, so that the monitor thread never races with a cache which isn't thread-safe.
+
+Memory usage is the size of blocks traced by tracemalloc if it's tracing, or resident set size of the process read
+from /proc otherwise. Where neither is available, pass a custom *measure* callable.
+"""
+
+__all__ = ["CacheRegistry", "MemoryPressureMonitor", "process_memory", "registry"]
+
+import tracemalloc
+from mmap import PAGESIZE
+from threading import Event, Lock, Thread
+from weakref import WeakKeyDictionary
+
+
+def process_memory():
+    """Return memory usage of the process in bytes, or None if it can't be measured on this platform."""
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * PAGESIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class CacheRegistry:
+    def __init__(self):
+        # _nominal maps live cache to its original maxsize.
+        self._nominal = WeakKeyDictionary()
+        self._lock = Lock()
+
+    __slots__ = ["_nominal", "_lock"]
+
+    def register(self, cache):
+        with self._lock:
+            self._nominal[cache] = cache.maxsize
+
+    def unregister(self, cache):
+        with self._lock:
+            self._nominal.pop(cache, None)
+
+    def __contains__(self, cache):
+        return cache in self._nominal
+
+    @property
+    def size(self):
+        return len(self._nominal)
+
+    def __len__(self):
+        return self.size
+
+    def items(self):
+        """Return list of (cache, original maxsize) of live caches."""
+        with self._lock:
+            return list(self._nominal.items())
+
+
+registry = CacheRegistry()
+
+
+def hit_ratio(cache):
+    hit, miss = cache.statistic()
+    return hit / (hit + miss) if hit + miss else 0.0
+
+
+class MemoryPressureMonitor:
+    """
+        *high_watermark* and *low_watermark* are in bytes. *step* is the fraction of maxsize taken away from a cache
+        per shrink, and given back per growth. *strategy* is either "largest", shrinking the cache of the most
+        entries, or "coldest", shrinking the cache of the lowest hit ratio.
+    """
+
+    STRATEGIES = {
+        "largest": lambda cache: cache.size,
+        "coldest": lambda cache: -hit_ratio(cache),
+    }
+
+    def __init__(self, high_watermark, low_watermark=None, interval=1.0, step=0.1, strategy="largest",
+                 min_size=1, measure=process_memory, registry=registry):
+        if high_watermark <= 0:
+            raise ValueError("Invalid *high_watermark* setting")
+        if low_watermark is None:
+            low_watermark = 0.9 * high_watermark
+        if not 0 <= low_watermark <= high_watermark:
+            raise ValueError("Invalid *low_watermark* setting")
+        if interval <= 0:
+            raise ValueError("Invalid *interval* setting")
+        if not 0 < step <= 1:
+            raise ValueError("Invalid *step* setting")
+        if strategy not in self.STRATEGIES:
+            raise ValueError("Invalid *strategy* setting")
+        if not isinstance(min_size, int) or min_size <= 0:
+            raise ValueError("Invalid *min_size* setting")
+        self._high_watermark = high_watermark
+        self._low_watermark = low_watermark
+        self._interval = interval
+        self._step = step
+        self._priority = self.STRATEGIES[strategy]
+        self._min_size = min_size
+        self._measure = measure
+        self._registry = registry
+        self._thread = None
+        self._stopped = Event()
+
+    __slots__ = ["_high_watermark", "_low_watermark", "_interval", "_step", "_priority", "_min_size", "_measure",
+                 "_registry", "_thread", "_stopped"]
+
+    def check(self):
+        """
+            Sample memory usage once, and shrink or grow caches accordingly. Return "shrink", "grow", or None if
+            nothing is done.
+        """
+        usage = self._measure()
+        if usage is None:
+            return None
+        if usage > self._high_watermark:
+            return "shrink" if self._shrink() else None
+        if usage < self._low_watermark:
+            return "grow" if self._grow() else None
+        return None
+
+    def _shrink(self):
+        # A cache still above its lowered maxsize hasn't trimmed its surplus yet. Shrinking it again would only
+        # lower the bound further, down to *min_size*, before any memory is freed.
+        candidates = [cache for cache, _ in self._registry.items()
+                      if self._min_size < cache.maxsize and cache.size <= cache.maxsize]
+        if not candidates:
+            return False
+        victim = max(candidates, key=self._priority)
+        # Step from the lowered maxsize, or from the current size if below, otherwise shrinking takes no effect on a
+        # cache not full yet.
+        maxsize = min(victim.maxsize, max(victim.size, self._min_size))
+        victim.resize(max(self._min_size, maxsize - max(1, int(maxsize * self._step))))
+        return True
+
+    def _grow(self):
+        grown = False
+        for cache, nominal in self._registry.items():
+            if cache.maxsize < nominal:
+                cache.resize(min(nominal, cache.maxsize + max(1, int(nominal * self._step))))
+                grown = True
+        return grown
+
+    def start(self):
+        """Check periodically in a daemon thread, until `stop()`."""
+        if self._thread is not None:
+            raise RuntimeError("Monitor is already started")
+        self._stopped.clear()
+        self._thread = Thread(target=self._run, name="memory-pressure-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(self._interval):
+            self.check()
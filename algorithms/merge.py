@@ -0,0 +1,132 @@
+"""
+K-way merge
+
+Lazily merges k sorted iterables into one sorted stream, keeping one pending item per input in a binary heap. Like
+TopK, the heap is a pair of parallel lists sifted by the helpers of the heap module, without any key index, so sort
+keys need not be hashable. Heap keys are pairs of sort key and input rank, so that of equal sort keys, the one of the
+lower input index wins, and the same key from several inputs comes out in input order, i.e. the merge is stable.
+
+In bulk mode, i.e. with *block_size*, inputs are read a block at a time. Items of the input at the top of the heap
+are emitted as long as they beat the runner-up, before its entry sifts down. Runs of consecutive items from one
+input, common when merging time-ordered shards, then cost one heap operation per run instead of per item.
+
+Complexity, for k inputs and N items in total:
+| Operation | Complexity |
+__________________________
+| merge | O(N logk) time, O(k) memory, O(k * block_size) in bulk mode |
+"""
+
+__all__ = ["merge"]
+
+from itertools import islice
+from operator import gt, lt, neg, pos
+
+from .heap import heapify, sift_down
+
+
+def merge(*iterables, key=None, reverse=False, block_size=None):
+    """
+        Return iterator over the items of *iterables*, each sorted by *key*, in ascending order, or descending if
+        *reverse*, like `sorted(chain(*iterables), key=key, reverse=reverse)` but lazily.
+    """
+    if block_size is not None and (not isinstance(block_size, int) or block_size <= 0):
+        raise ValueError("Invalid block_size option.")
+    if block_size is None:
+        return _merge(iterables, key, reverse)
+    return _merge_blocks(iterables, key, reverse, block_size)
+
+
+def _pop_root(keys, sources, before):
+    """Remove the top entry."""
+    tail_key = keys.pop()
+    tail_source = sources.pop()
+    if keys:
+        keys[0] = tail_key
+        sources[0] = tail_source
+        sift_down(keys, sources, before, 0)
+
+
+def _merge(iterables, key, reverse):
+    before = gt if reverse else lt
+    # Rank of input index, which ranks the lower index first in either order.
+    rank = neg if reverse else pos
+    iterators = [iter(iterable) for iterable in iterables]
+    # Pending item of every input. The heap holds (sort key, rank) pairs and input indices only.
+    heads = [None] * len(iterators)
+    keys = []
+    sources = []
+    for index, iterator in enumerate(iterators):
+        for item in iterator:
+            heads[index] = item
+            keys.append((item if key is None else key(item), rank(index)))
+            sources.append(index)
+            break
+    heapify(keys, sources, before)
+
+    while len(keys) > 1:
+        source = sources[0]
+        yield heads[source]
+        for item in iterators[source]:
+            heads[source] = item
+            # Sift the top down once, rather than pop and push.
+            keys[0] = (item if key is None else key(item), rank(source))
+            sift_down(keys, sources, before, 0)
+            break
+        else:
+            _pop_root(keys, sources, before)
+
+    if keys:
+        source = sources[0]
+        yield heads[source]
+        yield from iterators[source]
+
+
+def _merge_blocks(iterables, key, reverse, block_size):
+    before = gt if reverse else lt
+    rank = neg if reverse else pos
+    iterators = [iter(iterable) for iterable in iterables]
+    # Current block of every input, as (items, their sort keys), and position of its next item.
+    blocks = [None] * len(iterators)
+    positions = [0] * len(iterators)
+
+    def read_block(index):
+        block = list(islice(iterators[index], block_size))
+        if not block:
+            return False
+        blocks[index] = (block, block if key is None else list(map(key, block)))
+        positions[index] = 0
+        return True
+
+    keys = []
+    sources = []
+    for index in range(len(iterators)):
+        if read_block(index):
+            keys.append((blocks[index][1][0], rank(index)))
+            sources.append(index)
+    heapify(keys, sources, before)
+
+    while keys:
+        source = sources[0]
+        source_rank = rank(source)
+        # Runner-up is the better child of the root, if any.
+        runner_up_key = None
+        if len(keys) > 1:
+            runner_up_key = keys[2] if len(keys) > 2 and before(keys[2], keys[1]) else keys[1]
+        block, block_keys = blocks[source]
+        position = positions[source]
+        while True:
+            yield block[position]
+            position += 1
+            if position == len(block):
+                if not read_block(source):
+                    blocks[source] = None
+                    _pop_root(keys, sources, before)
+                    break
+                block, block_keys = blocks[source]
+                position = 0
+            next_key = (block_keys[position], source_rank)
+            if runner_up_key is not None and not before(next_key, runner_up_key):
+                positions[source] = position
+                keys[0] = next_key
+                sift_down(keys, sources, before, 0)
+                break
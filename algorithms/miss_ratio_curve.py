@@ -0,0 +1,164 @@
+"""
+Miss Ratio Curve Profiler
+
+Estimates online the miss ratio an LRU cache would get at every size, from the stream of accessed keys.
+
+A key missing from LRU cache of size c iff its reuse distance, i.e. the number of distinct keys accessed since its
+previous access, itself included, exceeds c. Tracking reuse distance of every key costs memory proportional to the
+working set. SHARDS samples keys spatially instead: a key is tracked iff its hash falls below a threshold, so either
+every access of a key is sampled or none is. Reuse distances among sampled keys, scaled by the inverse of the
+sampling rate, estimate the reuse distances of the whole stream.
+
+Memory is bounded by *max_samples* tracked keys. Beyond that, the threshold is lowered to drop the key of the
+highest hash, and later accesses are weighted by the lower rate (fixed-size SHARDS).
+
+The number of sampled accesses deviates from its expectation, especially when a few popular keys are either
+sampled or not. Following SHARDS-adj, the deviation is credited to (or debited from) the smallest distance, which
+removes most of the resulting bias.
+
+Distances are binned to 5 significant bits, i.e. within 1/16 relative error, so the histogram stays small too.
+
+Reference: C. A. Waldspurger, N. Park, A. Garthwaite and I. Ahmad, "Efficient MRC Construction with SHARDS", 2015.
+
+Complexity:
+| Operation | Complexity |
+__________________________
+| access | O(S) worst case, for S sampled keys. Typically a memmove of S pointers |
+| curve | O(B log B) for B histogram bins |
+"""
+
+__all__ = ["MissRatioProfiler"]
+
+from bisect import bisect_left
+from heapq import heappop, heappush
+from itertools import count
+
+# Keys are hashed into [0, MODULUS), and sampled iff their hash is below the threshold.
+MODULUS_BITS = 24
+MODULUS = 1 << MODULUS_BITS
+
+MASK64 = (1 << 64) - 1
+
+SIGNIFICANT_BITS = 5
+
+
+def spread(key):
+    """Return hash of *key* in [0, MODULUS)."""
+    # Built-in hash of small integers is the integer itself. Scramble it by SplitMix64 finalizer, so that sampling
+    # is uniform, and doesn't favour e.g. key 0.
+    z = (hash(key) + 0x9E3779B97F4A7C15) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return (z ^ (z >> 31)) >> (64 - MODULUS_BITS)
+
+
+def round_up(distance):
+    """Round *distance* up to SIGNIFICANT_BITS significant bits."""
+    shift = distance.bit_length() - SIGNIFICANT_BITS
+    if shift <= 0:
+        return distance
+    return -(-distance >> shift) << shift
+
+
+class MissRatioProfiler:
+    def __init__(self, rate=0.01, max_samples=8192):
+        if not 0 < rate <= 1:
+            raise ValueError("Invalid *rate* setting")
+        if not isinstance(max_samples, int) or max_samples <= 0:
+            raise ValueError("Invalid *max_samples* setting")
+        self._threshold = max(1, int(rate * MODULUS))
+        self._max_samples = max_samples
+        # _last maps tracked key to the time of its last access. _times holds these times in ascending order.
+        self._last = {}
+        self._times = []
+        # Max heap of (-hash, key) of tracked keys, to find the one to drop when over *max_samples*.
+        self._heap = []
+        self._clock = count()
+        # _histogram maps binned scaled reuse distance to weighted number of accesses.
+        self._histogram = {}
+        self._cold = 0.0
+        # Weighted number of sampled accesses, and number of all accesses.
+        self._total = 0.0
+        self._accesses = 0
+
+    __slots__ = ["_threshold", "_max_samples", "_last", "_times", "_heap", "_clock", "_histogram", "_cold",
+                 "_total", "_accesses"]
+
+    def clear(self):
+        self._last.clear()
+        self._times.clear()
+        self._heap.clear()
+        self._histogram.clear()
+        self._cold = 0.0
+        self._total = 0.0
+        self._accesses = 0
+
+    @property
+    def rate(self):
+        return self._threshold / MODULUS
+
+    @property
+    def samples(self):
+        return len(self._last)
+
+    def access(self, key):
+        self._accesses += 1
+        h = spread(key)
+        if h >= self._threshold:
+            return
+        weight = MODULUS / self._threshold
+        self._total += weight
+        now = next(self._clock)
+        times = self._times
+        previous = self._last.get(key)
+        if previous is None:
+            self._cold += weight
+            heappush(self._heap, (-h, now, key))
+        else:
+            index = bisect_left(times, previous)
+            # Distinct keys accessed since, the key itself included.
+            distance = len(times) - index
+            del times[index]
+            binned = round_up(int(distance * weight + 0.5))
+            self._histogram[binned] = self._histogram.get(binned, 0.0) + weight
+        self._last[key] = now
+        times.append(now)
+
+        if len(self._last) > self._max_samples:
+            self._lower_threshold()
+
+    def _lower_threshold(self):
+        # Stop tracking keys of the highest hash, at least one of them.
+        self._threshold = -self._heap[0][0]
+        while self._heap and -self._heap[0][0] >= self._threshold:
+            _, _, key = heappop(self._heap)
+            previous = self._last.pop(key)
+            del self._times[bisect_left(self._times, previous)]
+
+    def miss_ratio(self, size):
+        """Return estimated miss ratio of LRU cache of *size*."""
+        return self.curve([size])[0][1]
+
+    def curve(self, sizes=None):
+        """
+            Return list of (size, estimated miss ratio) for every size in *sizes*, in ascending order. Default sizes
+            are the boundaries of histogram bins, i.e. where the curve steps.
+        """
+        if sizes is None:
+            sizes = self._histogram
+        sizes = sorted(sizes)
+        if not self._total:
+            return [(size, 1.0) for size in sizes]
+        bins = sorted(self._histogram.items())
+        # SHARDS-adj: every access weighs 1 in expectation.
+        adjustment = self._accesses - self._total
+        result = []
+        hits = 0.0
+        index = 0
+        for size in sizes:
+            while index < len(bins) and bins[index][0] <= size:
+                hits += bins[index][1]
+                index += 1
+            adjusted_hits = hits + adjustment if size >= 1 else hits
+            result.append((size, min(1.0, max(0.0, 1 - adjusted_hits / self._accesses))))
+        return result
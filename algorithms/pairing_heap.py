@@ -0,0 +1,206 @@
+"""
+Pairing Heap
+
+A heap-ordered multiway tree, stored as leftmost-child and right-sibling links. Insert and meld link two roots in
+O(1). Delete-min links the children of the root in pairs, left to right, then accumulates the pairs right to left
+(two-pass pairing).
+
+Unlike Heap, keys may repeat, and items are addressed by the handle `insert` returns instead of by key. A handle
+stays valid until its item is removed by `pop`, `delete` or `clear`. Decreasing a key cuts the subtree of the item
+and links it back to the root, which makes decrease-key-heavy workloads, e.g. Dijkstra's shortest paths, cheap.
+
+Reference: M. L. Fredman, R. Sedgewick, D. D. Sleator and R. E. Tarjan, "The Pairing Heap: A New Form of
+Self-Adjusting Heap", 1986.
+
+Complexity:
+| Operation | Complexity |
+__________________________
+| insert | O(1) |
+| meld | O(1) |
+| pop | O(logN) amortized |
+| delete | O(logN) amortized |
+| decrease_key | O(2^(2*sqrt(loglogN))) amortized |
+| from_iterable | O(N) |
+| clear | O(1) |
+| get top | O(1) |
+| get size | O(1) |
+"""
+
+__all__ = ["PairingHeap"]
+
+from operator import gt, lt
+
+
+class PairingNode:
+    def __init__(self, key, value=None):
+        self.key = key
+        self.value = value
+        self.child = None
+        self.sibling = None
+        # Parent if leftmost child, left sibling otherwise, None for the root, and the node itself once removed.
+        self.prev = None
+
+    __slots__ = ["key", "value", "child", "sibling", "prev"]
+
+    def __str__(self):
+        return "PairingNode(key={}, value={})".format(self.key, self.value)
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class PairingHeap:
+    def __init__(self, priority_order="min"):
+        if priority_order not in {"min", "max"}:
+            raise ValueError("Invalid priority_order option.")
+        self.priority_order = priority_order
+        # _before(a, b) tells whether key a has higher priority than key b.
+        self._before = lt if priority_order == "min" else gt
+        self._root = None
+        self._size = 0
+
+    __slots__ = ["priority_order", "_before", "_root", "_size"]
+
+    @classmethod
+    def from_iterable(cls, items, *args, **kwargs):
+        """Build heap from iterable of (key, value) pairs in O(N). Extra arguments are passed to the constructor."""
+        heap = cls(*args, **kwargs)
+        for key, value in items:
+            heap.insert(key, value)
+        return heap
+
+    def insert(self, key, value=None):
+        """Insert *key* with *value*, and return handle of the item."""
+        node = PairingNode(key, value)
+        self._root = node if self._root is None else self._link(self._root, node)
+        self._size += 1
+        return node
+
+    def pop(self):
+        """Remove item of the highest priority, and return it as (key, value). Raise IndexError if empty."""
+        root = self._root
+        if root is None:
+            raise IndexError("pop from empty heap")
+        self._root = self._merge_pairs(root.child)
+        self._size -= 1
+        self._detach(root)
+        return root.key, root.value
+
+    def delete(self, handle):
+        """Remove item of *handle*, and return its value."""
+        self._check_handle(handle)
+        if handle is self._root:
+            return self.pop()[1]
+        self._cut(handle)
+        subtree = self._merge_pairs(handle.child)
+        if subtree is not None:
+            self._root = self._link(self._root, subtree)
+        self._size -= 1
+        self._detach(handle)
+        return handle.value
+
+    def decrease_key(self, handle, new_key):
+        """
+            Replace key of item of *handle* by *new_key*, which must not rank after the current key in priority
+            order. Raise ValueError otherwise.
+        """
+        self._check_handle(handle)
+        if self._before(handle.key, new_key):
+            raise ValueError("New key {} has lower priority than {}".format(new_key, handle.key))
+        handle.key = new_key
+        if handle is not self._root:
+            self._cut(handle)
+            self._root = self._link(self._root, handle)
+
+    def meld(self, other):
+        """Move all items of *other* heap into this one in O(1), leaving *other* empty. Handles stay valid."""
+        if other is self:
+            return
+        if other.priority_order != self.priority_order:
+            raise ValueError("Can't meld heaps of different priority orders")
+        if other._root is not None:
+            self._root = other._root if self._root is None else self._link(self._root, other._root)
+            self._size += other._size
+            other._root = None
+            other._size = 0
+
+    def _link(self, a, b):
+        """Link two roots, the one of lower priority becoming leftmost child of the other. Return the new root."""
+        if self._before(b.key, a.key):
+            a, b = b, a
+        b.prev = a
+        b.sibling = a.child
+        if a.child is not None:
+            a.child.prev = b
+        a.child = b
+        return a
+
+    def _merge_pairs(self, first):
+        """Link list of siblings starting at *first* into a single tree by two-pass pairing. Return its root."""
+        pairs = []
+        node = first
+        while node is not None:
+            a = node
+            b = a.sibling
+            if b is None:
+                a.prev = None
+                pairs.append(a)
+                break
+            node = b.sibling
+            a.prev = a.sibling = b.prev = b.sibling = None
+            pairs.append(self._link(a, b))
+        if not pairs:
+            return None
+        root = pairs.pop()
+        while pairs:
+            root = self._link(pairs.pop(), root)
+        return root
+
+    def _cut(self, node):
+        """Detach subtree of non-root *node* from its parent."""
+        prev = node.prev
+        if prev.child is node:
+            prev.child = node.sibling
+        else:
+            prev.sibling = node.sibling
+        if node.sibling is not None:
+            node.sibling.prev = prev
+        node.prev = None
+        node.sibling = None
+
+    @staticmethod
+    def _detach(node):
+        node.child = None
+        node.sibling = None
+        node.prev = node
+
+    @staticmethod
+    def _check_handle(handle):
+        if handle.prev is handle:
+            raise ValueError("Handle of removed item")
+
+    def clear(self):
+        self._root = None
+        self._size = 0
+
+    @property
+    def top(self):
+        if self._root is None:
+            return None
+        return self._root.key, self._root.value
+
+    @property
+    def size(self):
+        return self._size
+
+    def __len__(self):
+        return self.size
+
+    def isEmpty(self):
+        return self.size == 0
+
+    def __str__(self):
+        return "PairingHeap(size={})".format(self.size)
+
+    def __repr__(self):
+        return self.__str__()
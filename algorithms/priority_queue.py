@@ -1,26 +1,335 @@
 """
 PriorityQueue
 
+Backed by any heap class of the Heap interface: `insert`, `pop`, `top`, `size`, `isEmpty` and `clear`, and
+`from_iterable` for bulk construction. Heap is the default. PairingHeap suits decrease-key-heavy workloads. Its
+`enqueue` returns a handle, to be passed to `decrease_key` and `delete` in place of the key. Access by key or
+position, i.e. `find`, `in`, `update_priority`, iteration and indexing, is supported by Heap only, and raises
+TypeError with other backends. PriorityQueue is registered as a virtual subclass of Heap.
+
+BlockingPriorityQueue is thread-safe, and lets consumers wait for an item, and producers wait for room if bounded
+by *maxsize*. AsyncPriorityQueue does the same for asyncio tasks, awaiting `get` and `put`. Neither is thread-safe
+for the other kind of concurrency.
+
 Complexity
 ----------
 | Operation | Complexity |
 --------------------------
-| enqueue | O(logN) |
+| enqueue | O(logN) with Heap, O(1) with PairingHeap |
 | dequeue | O(logN) |
 | head | O(1) |
 """
 
+import asyncio
+from collections import deque
+from queue import Empty, Full
+from threading import Condition, Lock
+from time import monotonic
+
 from .heap import Heap
 
 
-class PriorityQueue(Heap):
+class PriorityQueue:
+    def __init__(self, priority_order="min", backend=Heap, **options):
+        """*options*, e.g. *arity* of Heap, are passed to the constructor of *backend*."""
+        self._heap = backend(priority_order, **options)
+
+    __slots__ = ["_heap"]
+
+    @classmethod
+    def from_iterable(cls, items, priority_order="min", backend=Heap, **options):
+        """Build queue from iterable of (key, value) pairs, in O(N) with either backend."""
+        queue = cls.__new__(cls)
+        queue._heap = backend.from_iterable(items, priority_order, **options)
+        return queue
+
+    @property
+    def backend(self):
+        return type(self._heap)
+
+    @property
+    def priority_order(self):
+        return self._heap.priority_order
+
+    def _keyed_heap(self):
+        """Return the backend heap, if it supports lookup by key. Raise TypeError otherwise."""
+        if not hasattr(self._heap, "find"):
+            raise TypeError("{} backend doesn't support access by key".format(self.backend.__name__))
+        return self._heap
+
     def enqueue(self, key, value=None):
-        self.insert(key, value)
+        return self._heap.insert(key, value)
+
+    def insert(self, key, value=None):
+        """Alias of `enqueue`, as of Heap."""
+        return self.enqueue(key, value)
+
+    def find(self, key):
+        return self._keyed_heap().find(key)
 
     def dequeue(self):
-        key, value = self.top
-        self.delete(key)
-        return key, value
+        try:
+            return self._heap.pop()
+        except IndexError:
+            raise IndexError("dequeue from empty priority queue")
 
     def head(self):
         return self.top
+
+    @property
+    def top(self):
+        return self._heap.top
+
+    def delete(self, item):
+        """Remove *item*, a key with Heap or a handle with PairingHeap, and return its value."""
+        return self._heap.delete(item)
+
+    def decrease_key(self, item, new_key):
+        """Raise priority of *item*, a key with Heap or a handle with PairingHeap, to *new_key*."""
+        self._heap.decrease_key(item, new_key)
+
+    def clear(self):
+        self._heap.clear()
+
+    @property
+    def size(self):
+        return self._heap.size
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        return key in self._keyed_heap()
+
+    def isEmpty(self):
+        return self._heap.isEmpty()
+
+    def update_priority(self, key, new_key):
+        self._keyed_heap().update_priority(key, new_key)
+
+    def __iter__(self):
+        """Iterate over (key, value) pairs in heap array order."""
+        return iter(self._keyed_heap())
+
+    def __getitem__(self, n):
+        return self._keyed_heap()[n]
+
+    def __str__(self):
+        return str(self._heap)
+
+    def __repr__(self):
+        return self.__str__()
+
+
+Heap.register(PriorityQueue)
+
+
+def check_maxsize(maxsize):
+    if maxsize is not None and (not isinstance(maxsize, int) or maxsize <= 0):
+        raise ValueError("Invalid maxsize option.")
+
+
+class BlockingPriorityQueue(PriorityQueue):
+    """
+        `dequeue` blocks until an item is available, and `enqueue` blocks until the queue holds fewer than *maxsize*
+        items. With a *timeout*, they raise queue.Empty and queue.Full respectively once it expires, and at once if
+        *block* is false.
+    """
+
+    def __init__(self, priority_order="min", maxsize=None, backend=Heap, **options):
+        check_maxsize(maxsize)
+        super().__init__(priority_order, backend, **options)
+        self._maxsize = maxsize
+        lock = Lock()
+        self._lock = lock
+        self._not_empty = Condition(lock)
+        self._not_full = Condition(lock)
+
+    __slots__ = ["_maxsize", "_lock", "_not_empty", "_not_full"]
+
+    @classmethod
+    def from_iterable(cls, items, priority_order="min", maxsize=None, backend=Heap, **options):
+        """Build queue from iterable of (key, value) pairs, which may exceed *maxsize*."""
+        queue = cls(priority_order, maxsize, backend, **options)
+        queue._heap = backend.from_iterable(items, priority_order, **options)
+        return queue
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def _full(self):
+        return self._maxsize is not None and self._heap.size >= self._maxsize
+
+    def enqueue(self, key, value=None, block=True, timeout=None):
+        with self._not_full:
+            if self._full():
+                if not block:
+                    raise Full
+                if timeout is None:
+                    while self._full():
+                        self._not_full.wait()
+                else:
+                    deadline = monotonic() + timeout
+                    while self._full():
+                        remaining = deadline - monotonic()
+                        if remaining <= 0:
+                            raise Full
+                        self._not_full.wait(remaining)
+            handle = self._heap.insert(key, value)
+            self._not_empty.notify()
+            return handle
+
+    def dequeue(self, block=True, timeout=None):
+        with self._not_empty:
+            if self._heap.isEmpty():
+                if not block:
+                    raise Empty
+                if timeout is None:
+                    while self._heap.isEmpty():
+                        self._not_empty.wait()
+                else:
+                    deadline = monotonic() + timeout
+                    while self._heap.isEmpty():
+                        remaining = deadline - monotonic()
+                        if remaining <= 0:
+                            raise Empty
+                        self._not_empty.wait(remaining)
+            item = self._heap.pop()
+            self._not_full.notify()
+            return item
+
+    @property
+    def top(self):
+        with self._lock:
+            return self._heap.top
+
+    def delete(self, item):
+        with self._lock:
+            value = self._heap.delete(item)
+            self._not_full.notify()
+            return value
+
+    def decrease_key(self, item, new_key):
+        with self._lock:
+            self._heap.decrease_key(item, new_key)
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
+            self._not_full.notify_all()
+
+    def find(self, key):
+        with self._lock:
+            return self._keyed_heap().find(key)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._keyed_heap()
+
+    def update_priority(self, key, new_key):
+        with self._lock:
+            self._keyed_heap().update_priority(key, new_key)
+
+    def __iter__(self):
+        """Iterate over a snapshot of (key, value) pairs in heap array order."""
+        with self._lock:
+            return iter(list(self._keyed_heap()))
+
+    def __getitem__(self, n):
+        with self._lock:
+            return self._keyed_heap()[n]
+
+    def __str__(self):
+        with self._lock:
+            return str(self._heap)
+
+
+class AsyncPriorityQueue(PriorityQueue):
+    """
+        Awaiting `get` suspends until an item is available, and awaiting `put` suspends until the queue holds fewer
+        than *maxsize* items. `enqueue` and `dequeue` never wait, and raise asyncio.QueueFull and asyncio.QueueEmpty
+        instead.
+    """
+
+    def __init__(self, priority_order="min", maxsize=None, backend=Heap, **options):
+        check_maxsize(maxsize)
+        super().__init__(priority_order, backend, **options)
+        self._maxsize = maxsize
+        # Futures of suspended consumers and producers, woken one at a time in FIFO order.
+        self._getters = deque()
+        self._putters = deque()
+
+    __slots__ = ["_maxsize", "_getters", "_putters"]
+
+    @classmethod
+    def from_iterable(cls, items, priority_order="min", maxsize=None, backend=Heap, **options):
+        """Build queue from iterable of (key, value) pairs, which may exceed *maxsize*."""
+        queue = cls(priority_order, maxsize, backend, **options)
+        queue._heap = backend.from_iterable(items, priority_order, **options)
+        return queue
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def _full(self):
+        return self._maxsize is not None and self._heap.size >= self._maxsize
+
+    @staticmethod
+    def _wakeup_next(waiters):
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    async def _wait(self, waiters, ready):
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await waiter
+        except BaseException:
+            waiter.cancel()
+            try:
+                waiters.remove(waiter)
+            except ValueError:
+                pass
+            # Pass the wakeup on, if this waiter got it just before being cancelled.
+            if ready() and not waiter.cancelled():
+                self._wakeup_next(waiters)
+            raise
+
+    def enqueue(self, key, value=None):
+        if self._full():
+            raise asyncio.QueueFull
+        handle = self._heap.insert(key, value)
+        self._wakeup_next(self._getters)
+        return handle
+
+    def dequeue(self):
+        if self._heap.isEmpty():
+            raise asyncio.QueueEmpty
+        item = self._heap.pop()
+        self._wakeup_next(self._putters)
+        return item
+
+    async def put(self, key, value=None):
+        while self._full():
+            await self._wait(self._putters, lambda: not self._full())
+        return self.enqueue(key, value)
+
+    async def get(self):
+        while self._heap.isEmpty():
+            await self._wait(self._getters, lambda: not self._heap.isEmpty())
+        return self.dequeue()
+
+    def delete(self, item):
+        value = self._heap.delete(item)
+        self._wakeup_next(self._putters)
+        return value
+
+    def clear(self):
+        self._heap.clear()
+        while self._putters and not self._full():
+            self._wakeup_next(self._putters)
@@ -1,6 +1,7 @@
-__all__ = ["RecencyTracker"]
+__all__ = ["RecencyTracker", "LinkedRecencyTracker", "SampledRecencyTracker", "SegmentedRecencyTracker"]
 
 import gc
+from random import random
 
 # Sentinel Object Pattern
 DELETED = object()
@@ -16,6 +17,7 @@ class RecencyTracker:
     -----------
     | get(pop)_lru | amortized O() |
     | update_mru | amortized O(1) |
+    | update_mru_many | amortized O(k) for k entries |
     | remove | O(1) |
 
     Space complexity:
@@ -43,8 +45,22 @@ class RecencyTracker:
     def size(self):
         return len(self._indexer)
 
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, entry):
+        return entry in self._indexer
+
+    def __iter__(self):
+        """Iterate entries from the least recently used to the most recently used."""
+        for index in range(self._offset, len(self._storage)):
+            entry = self._storage[index]
+            if entry is not DELETED:
+                yield entry
+
     def pop_lru(self):
-        for index, entry in enumerate(self._storage, self._offset):
+        for index in range(self._offset, len(self._storage)):
+            entry = self._storage[index]
             # traverse from the position marked by _offset to the right, until the first non-garbage element is found.
             if entry is not DELETED:
                 # Found the least recenlty used entry.
@@ -57,7 +73,8 @@ class RecencyTracker:
         raise IndexError("pop lru from empty recency tracker")
 
     def get_lru(self):
-        for index, entry in enumerate(self._storage, self._offset):
+        for index in range(self._offset, len(self._storage)):
+            entry = self._storage[index]
             # traverse from the position marked by _offset to the right, until the first non-garbage element is found.
             if entry is not DELETED:
                 # Found the least recenlty used entry.
@@ -77,6 +94,20 @@ class RecencyTracker:
         if self._gc_check():
             self._garbage_collect()
 
+    def update_mru_many(self, entries):
+        """Update every entry in turn, the last one ending up most recently used. Collect garbage once per batch."""
+        storage = self._storage
+        indexer = self._indexer
+        for entry in entries:
+            index = indexer.get(entry)
+            if index is not None:
+                storage[index] = DELETED
+            indexer[entry] = len(storage)
+            storage.append(entry)
+
+        if self._gc_check():
+            self._garbage_collect()
+
     def remove(self, entry):
         try:
             index = self._indexer[entry]
@@ -95,18 +126,18 @@ class RecencyTracker:
         """
         too_much_hole = len(self._storage) - \
             self._offset > 2 * len(self._indexer)
-        offset_too_long = len(self._storage) > 2 * self._offset
+        offset_too_long = 2 * self._offset > len(self._storage)
         return too_much_hole or offset_too_long
 
     def _garbage_collect(self):
         too_much_hole = len(self._storage) - \
             self._offset > 2 * len(self._indexer)
-        offset_too_long = len(self._storage) > 2 * self._offset
+        offset_too_long = 2 * self._offset > len(self._storage)
 
         if too_much_hole:
             # Squashing
             self._storage = [entry for entry in self._storage if entry is not DELETED]
-            self._indexer = dict(enumerate(self._storage))
+            self._indexer = {entry: index for index, entry in enumerate(self._storage)}
             self._offset = 0
         elif offset_too_long:
             # Shrinking
@@ -114,3 +145,295 @@ class RecencyTracker:
             for entry in self._indexer:
                 self._indexer[entry] -= self._offset
             self._offset = 0
+
+
+class LinkedRecencyTracker:
+    """
+    Drop-in replacement of RecencyTracker with worst-case O(1) operations, for latency sensitive large caches.
+
+    Entries are nodes of a circular doubly linked list, laid out in parallel arrays of entries and links rather
+    than as node objects. Slot 0 is the sentinel, whose next is the least recently used entry, and whose previous is
+    the most recently used one. Slots of removed entries are reused via a free list. So there is no tombstone to skip
+    over, and nothing to compact, ever.
+
+    The remaining pauses are those of the dict indexing entries, which CPython occasionally rebuilds on insertion,
+    just like the dict of the cache itself.
+
+    Complexity:
+    -----------
+    | get(pop)_lru | O(1) |
+    | update_mru | O(1), plus amortized array and dict growth |
+    | remove | O(1) |
+    """
+
+    def __init__(self):
+        self._entries = [DELETED]
+        self._prev = [0]
+        self._next = [0]
+        self._free = []
+        # _indexer maps entry to its slot.
+        self._indexer = {}
+
+    __slots__ = ['_entries', '_prev', '_next', '_free', '_indexer']
+
+    def clear(self):
+        self._entries = [DELETED]
+        self._prev = [0]
+        self._next = [0]
+        self._free = []
+        self._indexer.clear()
+
+    @property
+    def size(self):
+        return len(self._indexer)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, entry):
+        return entry in self._indexer
+
+    def __iter__(self):
+        """Iterate entries from the least recently used to the most recently used."""
+        slot = self._next[0]
+        while slot:
+            yield self._entries[slot]
+            slot = self._next[slot]
+
+    def _unlink(self, slot):
+        prev_of, next_of = self._prev, self._next
+        before, after = prev_of[slot], next_of[slot]
+        next_of[before] = after
+        prev_of[after] = before
+
+    def pop_lru(self):
+        slot = self._next[0]
+        if not slot:
+            raise IndexError("pop lru from empty recency tracker")
+        self._unlink(slot)
+        entry = self._entries[slot]
+        # Drop the reference, lest the slot keeps the entry alive.
+        self._entries[slot] = DELETED
+        self._free.append(slot)
+        del self._indexer[entry]
+        return entry
+
+    def get_lru(self):
+        slot = self._next[0]
+        if not slot:
+            raise IndexError("get lru from empty recency tracker")
+        return self._entries[slot]
+
+    def update_mru(self, entry):
+        slot = self._indexer.get(entry)
+        if slot is not None:
+            self._unlink(slot)
+        else:
+            if self._free:
+                slot = self._free.pop()
+                self._entries[slot] = entry
+            else:
+                slot = len(self._entries)
+                self._entries.append(entry)
+                self._prev.append(0)
+                self._next.append(0)
+            self._indexer[entry] = slot
+        # Link before the sentinel, i.e. at the most recently used end.
+        prev_of, next_of = self._prev, self._next
+        last = prev_of[0]
+        next_of[last] = slot
+        prev_of[slot] = last
+        next_of[slot] = 0
+        prev_of[0] = slot
+
+    def update_mru_many(self, entries):
+        for entry in entries:
+            self.update_mru(entry)
+
+    def remove(self, entry):
+        try:
+            slot = self._indexer.pop(entry)
+        except KeyError:
+            raise ValueError("entry not in tracker")
+        self._unlink(slot)
+        self._entries[slot] = DELETED
+        self._free.append(slot)
+
+
+class SampledRecencyTracker:
+    """
+    Approximate drop-in replacement of RecencyTracker, in the style of Redis.
+
+    Updating an entry merely stamps it with a coarse clock, which only ticks when a new entry comes in. So a hit costs
+    a single dictionary store, with no reordering. The least recently used entry is approximated instead: *samples*
+    random entries, plus the best candidates kept from previous rounds in a pool of *pool_size*, are compared, and
+    the one of the oldest stamp is taken. Larger samples approximate LRU more closely, at higher eviction cost.
+
+    Reference: Redis documentation, "Key eviction", section "Approximated LRU algorithm".
+
+    Complexity:
+    -----------
+    | get(pop)_lru | O((S + P) log(S + P)) for S samples and pool of P |
+    | update_mru | O(1) |
+    | remove | O(1) |
+    """
+
+    def __init__(self, samples=5, pool_size=16):
+        if not isinstance(samples, int) or samples <= 0:
+            raise ValueError("Invalid *samples* setting")
+        if not isinstance(pool_size, int) or pool_size < 0:
+            raise ValueError("Invalid *pool_size* setting")
+        self._samples = samples
+        self._pool_size = pool_size
+        # _stamps maps entry to the clock of its last update.
+        self._stamps = {}
+        # _entries holds all the entries in arbitrary order, for random sampling. _slots tracks their position.
+        self._entries = []
+        self._slots = {}
+        self._clock = 0
+        self._pool = []
+
+    __slots__ = ['_samples', '_pool_size', '_stamps', '_entries', '_slots', '_clock', '_pool']
+
+    def clear(self):
+        self._stamps.clear()
+        self._entries.clear()
+        self._slots.clear()
+        self._pool = []
+
+    @property
+    def size(self):
+        return len(self._stamps)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, entry):
+        return entry in self._stamps
+
+    def __iter__(self):
+        """Iterate entries from the least recently used to the most recently used, up to the clock resolution."""
+        return iter(sorted(self._entries, key=self._stamps.__getitem__))
+
+    def get_lru(self):
+        entries = self._entries
+        if not entries:
+            raise IndexError("get lru from empty recency tracker")
+        stamps = self._stamps
+        # Candidates of the pool may have been updated or removed since. Stamps are looked up afresh.
+        candidates = {entry for entry in self._pool if entry in stamps}
+        length = len(entries)
+        if length <= self._samples:
+            # Exact LRU, up to the clock resolution.
+            candidates.update(entries)
+        else:
+            for _ in range(self._samples):
+                candidates.add(entries[int(random() * length)])
+        ranked = sorted(candidates, key=stamps.__getitem__)
+        self._pool = ranked[:self._pool_size]
+        return ranked[0]
+
+    def pop_lru(self):
+        entry = self.get_lru()
+        self.remove(entry)
+        return entry
+
+    def update_mru(self, entry):
+        if entry not in self._stamps:
+            self._slots[entry] = len(self._entries)
+            self._entries.append(entry)
+            # Tick, so that a new entry is younger than every other one, even those updated since the last tick.
+            self._clock += 1
+        self._stamps[entry] = self._clock
+
+    def update_mru_many(self, entries):
+        for entry in entries:
+            self.update_mru(entry)
+
+    def remove(self, entry):
+        try:
+            del self._stamps[entry]
+        except KeyError:
+            raise ValueError("entry not in tracker")
+        # Move the last entry into the vacated slot.
+        slot = self._slots.pop(entry)
+        last = self._entries.pop()
+        if slot < len(self._entries):
+            self._entries[slot] = last
+            self._slots[last] = slot
+
+
+class SegmentedRecencyTracker:
+    """
+    Segmented LRU (SLRU) drop-in replacement of RecencyTracker. Segments are instances of *tracker*.
+
+    Entries are tracked in two segments. A new entry enters the probation segment. Updating an entry already in
+    probation promotes it to the protected segment, holding at most *protected_maxsize* entries. Overflow of the
+    protected segment is demoted back to the most recently used end of probation. The least recently used entry is
+    taken from probation first, so that entries referenced only once never push out those referenced repeatedly.
+
+    Reference: R. Karedla, J. S. Love and B. G. Wherry, "Caching Strategies to Improve Disk System Performance", 1994.
+
+    Complexity:
+    -----------
+    Same as RecencyTracker.
+    """
+
+    def __init__(self, protected_maxsize, tracker=RecencyTracker):
+        if not isinstance(protected_maxsize, int) or protected_maxsize < 0:
+            raise ValueError("Invalid *protected_maxsize* setting")
+        self._probation = tracker()
+        self._protected = tracker()
+        self._protected_maxsize = protected_maxsize
+
+    __slots__ = ['_probation', '_protected', '_protected_maxsize']
+
+    def clear(self):
+        self._probation.clear()
+        self._protected.clear()
+
+    @property
+    def size(self):
+        return len(self._probation) + len(self._protected)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, entry):
+        return entry in self._probation or entry in self._protected
+
+    def __iter__(self):
+        """Iterate entries in eviction order, i.e. probation, then protected, each from least recently used."""
+        yield from self._probation
+        yield from self._protected
+
+    def pop_lru(self):
+        if self._probation:
+            return self._probation.pop_lru()
+        return self._protected.pop_lru()
+
+    def get_lru(self):
+        if self._probation:
+            return self._probation.get_lru()
+        return self._protected.get_lru()
+
+    def update_mru(self, entry):
+        if entry in self._protected:
+            self._protected.update_mru(entry)
+        elif entry in self._probation:
+            self._probation.remove(entry)
+            self._protected.update_mru(entry)
+            if len(self._protected) > self._protected_maxsize:
+                self._probation.update_mru(self._protected.pop_lru())
+        else:
+            self._probation.update_mru(entry)
+
+    def update_mru_many(self, entries):
+        for entry in entries:
+            self.update_mru(entry)
+
+    def remove(self, entry):
+        if entry in self._probation:
+            self._probation.remove(entry)
+        else:
+            self._protected.remove(entry)
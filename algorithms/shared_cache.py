@@ -0,0 +1,289 @@
+"""
+SharedMemory_Cache
+
+Cache living in a `multiprocessing.shared_memory` segment, so that worker processes on one host share a single copy
+of the cached data and a single hit rate.
+
+The segment is a fixed-slot hash table. Keys and values are pickled into slots of fixed capacity. The table is set
+associative: a key hashes to a bucket of a few slots (ways), and is stored in one of them. When the bucket is full,
+a per-bucket clock hand picks the victim among its ways, giving a second chance to recently referenced ones (CLOCK).
+The table has *maxsize* rounded up to a multiple of *ways* slots, so that every bucket has the same number of ways.
+The size is nevertheless bounded by *maxsize*: when the cache is full, inserting into a bucket with a free slot
+evicts an entry elsewhere, picked by a global clock hand, like `discard_lru`.
+Every operation is guarded by a cross-process lock.
+
+Create the cache before forking workers, so they inherit both the mapping and the lock. The cache can also be
+passed as argument to `multiprocessing.Process` under the spawn start method, which reattaches to the segment.
+The creating process destroys the segment once the cache is garbage collected, or at exit at the latest, unless
+`unlink` was called before.
+
+Key equality is decided on pickled bytes, so e.g. 1 and 1.0 are different keys, unlike dictionary.
+
+Hit and miss counters live in the segment, while instrumentation is per process, and observes only the operations
+of the process where it's attached.
+
+Complexity
+----------
+| Operation | Complexity |
+--------------------------
+| get item | O(W) |
+| set item | O(W) |
+| delete item | O(W) |
+
+where W denotes number of ways per bucket, plus pickling cost.
+"""
+
+__all__ = ["SharedMemory_Cache"]
+
+import os
+import pickle
+import struct
+import weakref
+from hashlib import blake2b
+from multiprocessing import Lock
+from multiprocessing.shared_memory import SharedMemory
+
+from .instrumentation import Instrumentable
+
+# hit, miss, size, discard hand
+HEADER = struct.Struct("<QQQQ")
+# occupied, referenced, key length, value length, fingerprint
+SLOT_HEADER = struct.Struct("<BBIIQ")
+
+
+def fingerprint(key_bytes):
+    # Built-in hash() of str and bytes is salted per process, hence unusable across processes.
+    return int.from_bytes(blake2b(key_bytes, digest_size=8).digest(), "little")
+
+
+def release(shm, owner):
+    shm.close()
+    # Forked workers inherit the finalizer, but only the creating process may destroy the segment.
+    if os.getpid() == owner:
+        shm.unlink()
+
+
+class SharedMemory_Cache(Instrumentable):
+    def __init__(self, maxsize=128, slot_size=1024, ways=8, name=None, lock=None):
+        if not isinstance(maxsize, int) or maxsize <= 0:
+            raise ValueError("Invalid *maxsize* setting")
+        if not isinstance(slot_size, int) or slot_size <= 0:
+            raise ValueError("Invalid *slot_size* setting")
+        if not isinstance(ways, int) or not 0 < ways < 256:
+            raise ValueError("Invalid *ways* setting")
+        ways = min(ways, maxsize)
+        self._maxsize = maxsize
+        self._buckets = -(-maxsize // ways)
+        self._ways = ways
+        self._slot_size = slot_size
+        self._stride = SLOT_HEADER.size + slot_size
+        # Clock hand of every bucket takes one byte, following the header.
+        self._slots_offset = HEADER.size + self._buckets
+        nbytes = self._slots_offset + self._buckets * ways * self._stride
+        self._shm = SharedMemory(name=name, create=True, size=nbytes)
+        # Segment is not guaranteed zero-filled on every platform.
+        self._shm.buf[:nbytes] = bytes(nbytes)
+        self._lock = lock if lock is not None else Lock()
+        self._instrumentation = None
+        self._finalizer = weakref.finalize(self, release, self._shm, os.getpid())
+
+    __slots__ = ["_maxsize", "_buckets", "_ways", "_slot_size", "_stride", "_slots_offset", "_shm", "_lock",
+                 "_instrumentation", "_finalizer", "__weakref__"]
+
+    def __getstate__(self):
+        return (self._maxsize, self._buckets, self._ways, self._slot_size, self._shm.name, self._lock)
+
+    def __setstate__(self, state):
+        self._maxsize, self._buckets, self._ways, self._slot_size, name, self._lock = state
+        self._stride = SLOT_HEADER.size + self._slot_size
+        self._slots_offset = HEADER.size + self._buckets
+        self._shm = SharedMemory(name=name)
+        self._instrumentation = None
+        self._finalizer = None
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def close(self):
+        """Detach from the segment in this process."""
+        self._shm.close()
+
+    def unlink(self):
+        """Destroy the segment. Call once, from the process which created the cache."""
+        if self._finalizer is not None:
+            self._finalizer.detach()
+        self._shm.unlink()
+
+    def clear(self):
+        with self._lock:
+            buf = self._shm.buf
+            buf[:len(buf)] = bytes(len(buf))
+
+    @property
+    def size(self):
+        return HEADER.unpack_from(self._shm.buf, 0)[2]
+
+    def __len__(self):
+        return self.size
+
+    def statistic(self):
+        hit, miss, _, _ = HEADER.unpack_from(self._shm.buf, 0)
+        return hit, miss
+
+    def _count(self, hit=0, miss=0, size=0):
+        buf = self._shm.buf
+        old_hit, old_miss, old_size, hand = HEADER.unpack_from(buf, 0)
+        HEADER.pack_into(buf, 0, old_hit + hit, old_miss + miss, old_size + size, hand)
+
+    def _slot_offset(self, bucket, way):
+        return self._slots_offset + (bucket * self._ways + way) * self._stride
+
+    def _locate(self, key_bytes, digest):
+        """Return offset of the slot holding the key, or None."""
+        buf = self._shm.buf
+        bucket = digest % self._buckets
+        for way in range(self._ways):
+            offset = self._slot_offset(bucket, way)
+            occupied, _, key_length, _, slot_digest = SLOT_HEADER.unpack_from(buf, offset)
+            if occupied and slot_digest == digest and key_length == len(key_bytes):
+                start = offset + SLOT_HEADER.size
+                if buf[start:start + key_length] == key_bytes:
+                    return offset
+        return None
+
+    def _read_entry(self, offset):
+        buf = self._shm.buf
+        _, _, key_length, value_length, _ = SLOT_HEADER.unpack_from(buf, offset)
+        start = offset + SLOT_HEADER.size
+        key = pickle.loads(bytes(buf[start:start + key_length]))
+        start += key_length
+        return key, pickle.loads(bytes(buf[start:start + value_length]))
+
+    def __getitem__(self, key):
+        key_bytes = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        digest = fingerprint(key_bytes)
+        with self._lock:
+            offset = self._locate(key_bytes, digest)
+            if offset is None:
+                self._count(miss=1)
+            else:
+                buf = self._shm.buf
+                _, _, key_length, value_length, _ = SLOT_HEADER.unpack_from(buf, offset)
+                # Set the reference bit.
+                buf[offset + 1] = 1
+                start = offset + SLOT_HEADER.size + key_length
+                value_bytes = bytes(buf[start:start + value_length])
+                self._count(hit=1)
+        if offset is None:
+            # Report outside of the lock, lest the hook blocks other processes.
+            if self._instrumentation is not None:
+                self._instrumentation.record_miss(key)
+            raise KeyError(key)
+        return pickle.loads(value_bytes)
+
+    def __setitem__(self, key, value):
+        key_bytes = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        value_bytes = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(key_bytes) + len(value_bytes) > self._slot_size:
+            raise ValueError("Pickled entry of {} bytes exceeds *slot_size*".format(len(key_bytes) + len(value_bytes)))
+        digest = fingerprint(key_bytes)
+        bucket = digest % self._buckets
+
+        victims = []
+        with self._lock:
+            offset = self._locate(key_bytes, digest)
+            overwrite = offset is not None
+            if not overwrite:
+                offset, victim = self._vacate(bucket)
+                if victim is not None:
+                    victims.append(victim)
+                # The table may have more slots than *maxsize*. The vacated slot is free, hence never picked.
+                if self.size >= self._maxsize:
+                    victim = self._discard()
+                    if victim is not None:
+                        victims.append(victim)
+                self._count(size=1)
+            buf = self._shm.buf
+            # An overwrite counts as a reference, like in Clock_Cache.
+            SLOT_HEADER.pack_into(buf, offset, 1, overwrite, len(key_bytes), len(value_bytes), digest)
+            start = offset + SLOT_HEADER.size
+            buf[start:start + len(key_bytes)] = key_bytes
+            start += len(key_bytes)
+            buf[start:start + len(value_bytes)] = value_bytes
+        if self._instrumentation is not None:
+            for victim in victims:
+                self._instrumentation.record_eviction(*victim)
+            self._instrumentation.record_set(overwrite)
+
+    def _vacate(self, bucket):
+        """
+            Return offset of a free slot in the bucket, evicting by CLOCK if the bucket is full, along with the evicted
+            (key, value) if instrumented, or None.
+        """
+        buf = self._shm.buf
+        for way in range(self._ways):
+            offset = self._slot_offset(bucket, way)
+            if not buf[offset]:
+                return offset, None
+
+        hand_offset = HEADER.size + bucket
+        way = buf[hand_offset]
+        # Terminate within two rounds, since the first round clears every reference bit.
+        while True:
+            offset = self._slot_offset(bucket, way)
+            way = (way + 1) % self._ways
+            if buf[offset + 1]:
+                buf[offset + 1] = 0
+                continue
+            break
+        buf[hand_offset] = way
+        victim = self._read_entry(offset) if self._instrumentation is not None else None
+        buf[offset] = 0
+        self._count(size=-1)
+        return offset, victim
+
+    def discard_lru(self):
+        with self._lock:
+            if not self.size:
+                raise IndexError("Empty cache has nothing to discard")
+            victim = self._discard()
+        if victim is not None:
+            self._instrumentation.record_eviction(*victim)
+
+    def _discard(self):
+        """
+            Evict an entry of a non-empty cache by the global clock hand, and return the evicted (key, value) if
+            instrumented, or None. The lock must be held.
+        """
+        victim = None
+        buf = self._shm.buf
+        hit, miss, size, hand = HEADER.unpack_from(buf, 0)
+        slots = self._buckets * self._ways
+        while True:
+            offset = self._slots_offset + hand * self._stride
+            hand = (hand + 1) % slots
+            if not buf[offset]:
+                continue
+            if buf[offset + 1]:
+                buf[offset + 1] = 0
+                continue
+            break
+        if self._instrumentation is not None:
+            victim = self._read_entry(offset)
+        buf[offset] = 0
+        HEADER.pack_into(buf, 0, hit, miss, size - 1, hand)
+        return victim
+
+    def __delitem__(self, key):
+        key_bytes = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            offset = self._locate(key_bytes, fingerprint(key_bytes))
+            if offset is None:
+                raise KeyError(key)
+            self._shm.buf[offset] = 0
+            self._count(size=-1)
@@ -0,0 +1,175 @@
+"""
+Hierarchical Timer Wheel
+
+Tracks deadlines of entries, and reports the entries whose deadline has passed as time advances.
+
+Time is quantized into ticks of *resolution* seconds. Each level of the wheel is a ring of slots. A slot of level L
+spans 64^L ticks. An entry is filed into the lowest level whose span covers its remaining time. Whenever the
+lowest level wraps around, the due slot of the level above is cascaded, i.e. its entries are refiled into lower
+levels. Each entry is cascaded at most once per level. Idle ticks are skipped, jumping straight to the next occupied
+slot of the lowest level or the next cascade of an occupied slot.
+
+Reference: G. Varghese and T. Lauck, "Hashed and Hierarchical Timing Wheels", 1987.
+
+Complexity:
+| Operation | Complexity |
+__________________________
+| schedule | O(1) |
+| cancel | O(1) |
+| advance | Amortized O(1) per occupied tick and per expired entry |
+"""
+
+__all__ = ["TimerWheel"]
+
+
+SLOT_BITS = 6
+SLOTS = 1 << SLOT_BITS
+SLOT_MASK = SLOTS - 1
+
+
+class TimerWheel:
+    def __init__(self, resolution=1.0, levels=4, now=0.0):
+        if resolution <= 0:
+            raise ValueError("Invalid *resolution* setting")
+        if not isinstance(levels, int) or levels <= 0:
+            raise ValueError("Invalid *levels* setting")
+        self._resolution = resolution
+        self._levels = levels
+        # Every slot maps entry to its deadline tick.
+        self._wheels = [[{} for _ in range(SLOTS)] for _ in range(levels)]
+        # _location tracks the slot where the entry is filed.
+        self._location = {}
+        # Last tick already processed.
+        self._tick = self._to_tick(now)
+
+    __slots__ = ["_resolution", "_levels", "_wheels", "_location", "_tick"]
+
+    def _to_tick(self, moment):
+        return int(moment // self._resolution)
+
+    def _to_deadline_tick(self, deadline):
+        # Round up, so that an entry never expires before its deadline, only up to one tick after it.
+        return -int(-deadline // self._resolution)
+
+    def clear(self):
+        for wheel in self._wheels:
+            for slot in wheel:
+                slot.clear()
+        self._location.clear()
+
+    @property
+    def size(self):
+        return len(self._location)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, entry):
+        return entry in self._location
+
+    def schedule(self, entry, deadline):
+        """File *entry* to expire at time *deadline*. Reschedule if it's already filed."""
+        if entry in self._location:
+            self.cancel(entry)
+        self._file(entry, self._to_deadline_tick(deadline))
+
+    def _file(self, entry, deadline_tick):
+        # Tick to be processed next. An overdue entry expires on it.
+        base = self._tick + 1
+        due_tick = max(deadline_tick, base)
+        level = 0
+        while level < self._levels - 1 and due_tick - base >= 1 << (SLOT_BITS * (level + 1)):
+            level += 1
+        if due_tick - base >= 1 << (SLOT_BITS * (level + 1)):
+            # Beyond the span of the whole wheel. Park it at the farthest slot of the top level, to be refiled later.
+            due_tick = base + (1 << (SLOT_BITS * (level + 1))) - 1
+        slot = (due_tick >> (SLOT_BITS * level)) & SLOT_MASK
+        self._wheels[level][slot][entry] = deadline_tick
+        self._location[entry] = (level, slot)
+
+    def cancel(self, entry):
+        try:
+            level, slot = self._location.pop(entry)
+        except KeyError:
+            raise KeyError("entry not in timer wheel")
+        del self._wheels[level][slot][entry]
+
+    def advance(self, now):
+        """Move the wheel forward to time *now*. Return list of entries expired meanwhile, which are unfiled."""
+        target = self._to_tick(now)
+        if target <= self._tick:
+            return []
+        if not self._location:
+            self._tick = target
+            return []
+        if target - self._tick >= 1 << (SLOT_BITS * self._levels):
+            return self._rebuild(target)
+
+        expired = []
+        while self._tick < target:
+            tick = self._next_event(target)
+            # Ticks skipped in between had nothing to do.
+            self._tick = tick - 1
+            # Cascade higher levels first, since they may refile entries into lower levels due at this very tick.
+            for level in range(self._levels - 1, 0, -1):
+                if tick & ((1 << (SLOT_BITS * level)) - 1) == 0:
+                    self._cascade(level, (tick >> (SLOT_BITS * level)) & SLOT_MASK)
+            self._tick = tick
+            slot = self._wheels[0][tick & SLOT_MASK]
+            if slot:
+                self._wheels[0][tick & SLOT_MASK] = {}
+                for entry, deadline_tick in slot.items():
+                    if deadline_tick <= tick:
+                        del self._location[entry]
+                        expired.append(entry)
+                    else:
+                        # Parked beyond the span of a single level wheel.
+                        self._file(entry, deadline_tick)
+            if not self._location:
+                self._tick = target
+                break
+        return expired
+
+    def _next_event(self, target):
+        """Return the first tick after the current one, and up to *target*, due to expire or cascade any entry."""
+        tick = self._tick
+        wheel = self._wheels[0]
+        # Every entry of the lowest level is due within a rotation.
+        event = target
+        for candidate in range(tick + 1, min(tick + SLOTS, target) + 1):
+            if wheel[candidate & SLOT_MASK]:
+                event = candidate
+                break
+        if ((tick >> SLOT_BITS) + 1) << SLOT_BITS >= event:
+            return event
+        # A cascade may come first. A slot of level L cascades when the wheel reaches a multiple of 64^L ticks
+        # whose index at level L is the slot's.
+        for level in range(1, self._levels):
+            shift = SLOT_BITS * level
+            rotation = tick >> shift
+            for index, slot in enumerate(self._wheels[level]):
+                if slot:
+                    distance = (index - rotation) & SLOT_MASK or SLOTS
+                    event = min(event, (rotation + distance) << shift)
+        return event
+
+    def _cascade(self, level, index):
+        slot = self._wheels[level][index]
+        if not slot:
+            return
+        self._wheels[level][index] = {}
+        for entry, deadline_tick in slot.items():
+            self._file(entry, deadline_tick)
+
+    def _rebuild(self, target):
+        # Time leaped over the span of the whole wheel. Refile everything at once instead of ticking through.
+        entries = [(entry, self._wheels[level][slot][entry]) for entry, (level, slot) in self._location.items()]
+        self.clear()
+        self._tick = target
+        expired = []
+        for entry, deadline_tick in entries:
+            if deadline_tick <= target:
+                expired.append(entry)
+            else:
+                self._file(entry, deadline_tick)
+        return expired
@@ -0,0 +1,136 @@
+"""
+TopK
+
+Streaming selector of the k items of the largest keys, or of the smallest with priority_order="min". Memory is O(k)
+whatever the length of the stream.
+
+Kept items form a heap of parallel key and item lists, sifted by the helpers of the heap module, rooted at the worst
+kept key. Once k items are kept, an item qualifies iff its key beats the root, so most items of a long stream are
+rejected by a single comparison. A qualifying item replaces the root, and sifts down.
+
+Unlike Heap, keys may repeat, hence no key index. An item whose key equals the threshold doesn't qualify.
+
+Partial selectors of several workers merge into one, as long as each is fed a disjoint part of the stream.
+
+Complexity:
+| Operation | Complexity |
+__________________________
+| add | O(1) if rejected, O(logk) otherwise |
+| update | O(N logk) worst case, O(N) for N items of a random stream |
+| merge | O(k logk) |
+| result | O(k logk) |
+| get threshold | O(1) |
+| get size | O(1) |
+"""
+
+__all__ = ["TopK"]
+
+from operator import gt, lt
+
+from .heap import sift_down, sift_up
+
+
+class TopK:
+    def __init__(self, k, key=None, priority_order="max"):
+        if not isinstance(k, int) or k <= 0:
+            raise ValueError("Invalid k option.")
+        if priority_order not in {"min", "max"}:
+            raise ValueError("Invalid priority_order option.")
+        self._k = k
+        self._key = key
+        self.priority_order = priority_order
+        # _worse(a, b) tells whether key a ranks after key b. The root holds the worst kept key.
+        self._worse = lt if priority_order == "max" else gt
+        self._keys = []
+        self._items = []
+
+    __slots__ = ["_k", "_key", "priority_order", "_worse", "_keys", "_items"]
+
+    @property
+    def k(self):
+        return self._k
+
+    @property
+    def threshold(self):
+        """Key an item has to beat to qualify, or None while fewer than k items are kept."""
+        if len(self._keys) < self._k:
+            return None
+        return self._keys[0]
+
+    def add(self, item):
+        key = item if self._key is None else self._key(item)
+        self._offer(key, item)
+
+    def update(self, items):
+        """Add every item of iterable *items*."""
+        keyfunc = self._key
+        worse = self._worse
+        keys = self._keys
+        iterator = iter(items)
+        if len(keys) < self._k:
+            for item in iterator:
+                self._push(item if keyfunc is None else keyfunc(item), item)
+                if len(keys) == self._k:
+                    break
+        # Full from here on. Inline the rejection, which is by far the most common path.
+        if keyfunc is None:
+            for item in iterator:
+                if worse(keys[0], item):
+                    self._replace_root(item, item)
+        else:
+            for item in iterator:
+                key = keyfunc(item)
+                if worse(keys[0], key):
+                    self._replace_root(key, item)
+
+    def merge(self, other):
+        """Add kept items of *other* selector, and return self. Keys aren't computed again."""
+        if other.priority_order != self.priority_order:
+            raise ValueError("Can't merge selectors of different priority orders")
+        for key, item in zip(list(other._keys), list(other._items)):
+            self._offer(key, item)
+        return self
+
+    def _offer(self, key, item):
+        if len(self._keys) < self._k:
+            self._push(key, item)
+        elif self._worse(self._keys[0], key):
+            self._replace_root(key, item)
+
+    def _push(self, key, item):
+        self._keys.append(key)
+        self._items.append(item)
+        sift_up(self._keys, self._items, self._worse, len(self._keys) - 1)
+
+    def _replace_root(self, key, item):
+        self._keys[0] = key
+        self._items[0] = item
+        sift_down(self._keys, self._items, self._worse, 0)
+
+    def result(self):
+        """Return list of kept items, best first."""
+        order = sorted(range(len(self._keys)), key=self._keys.__getitem__, reverse=self.priority_order == "max")
+        return [self._items[index] for index in order]
+
+    def clear(self):
+        self._keys.clear()
+        self._items.clear()
+
+    @property
+    def size(self):
+        return len(self._keys)
+
+    def __len__(self):
+        return self.size
+
+    def isEmpty(self):
+        return self.size == 0
+
+    def __iter__(self):
+        return iter(self.result())
+
+    def __str__(self):
+        return "TopK(k={}, {})".format(self._k, self.result())
+
+    def __repr__(self):
+        return self.__str__()
@@ -17,7 +17,7 @@
 
 __all__ = ["SplayTree", "SplayTreeWithMaxsize"]
 
-from .abstract_tree import BinaryTree, BinaryNode as Node
+from .binary_tree import BinaryTree, BinaryNode as Node
 from enum import Enum
 
 
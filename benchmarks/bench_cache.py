@@ -0,0 +1,103 @@
+"""
+Throughput benchmark of cache implementations.
+
+Usage: python -m benchmarks.bench_cache
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from random import Random, randrange, seed
+from time import perf_counter
+
+from algorithms.cache import Clock_Cache, LRU_Cache, Sharded_LRU_Cache, build_key
+from algorithms.recency_tracker import (LinkedRecencyTracker, RecencyTracker,
+                                        SampledRecencyTracker)
+
+from .trace_replay import replay, zipf_trace
+
+
+def hit_path_throughput(cache_class, maxsize, times):
+    """Return lookups per second on a cache where every lookup hits. *cache_class* is any callable taking maxsize."""
+    cache = cache_class(maxsize)
+    for key in range(maxsize):
+        cache[key] = key
+    keys = [randrange(maxsize) for _ in range(times)]
+
+    begin = perf_counter()
+    for key in keys:
+        cache[key]
+    end = perf_counter()
+    return times / (end - begin)
+
+
+def key_building_cost(args, kw, typed, times):
+    """Return nanoseconds taken by building one cache key of call with *args* and *kw*."""
+    begin = perf_counter()
+    for _ in range(times):
+        build_key(args, kw, typed)
+    end = perf_counter()
+    return (end - begin) / times * 1e9
+
+
+def contention_throughput(shards, workers, times, maxsize=4096, extent=8192):
+    """Return operations per second of a thread pool sharing one Sharded_LRU_Cache."""
+    cache = Sharded_LRU_Cache(maxsize, shards)
+
+    def work(worker_seed):
+        rng = Random(worker_seed)
+        for _ in range(times):
+            key = rng.randrange(extent)
+            try:
+                cache[key]
+            except KeyError:
+                cache[key] = key
+
+    begin = perf_counter()
+    with ThreadPoolExecutor(workers) as executor:
+        list(executor.map(work, range(workers)))
+    end = perf_counter()
+    return workers * times / (end - begin)
+
+
+def main():
+    seed(0)
+    times = 1000000
+    print("Hit path throughput (lookups/sec)")
+    for maxsize in (128, 4096, 65536):
+        for cache_class in (LRU_Cache, Clock_Cache):
+            throughput = hit_path_throughput(cache_class, maxsize, times)
+            print("{:>12} maxsize={:<6} {:>12,.0f}".format(
+                cache_class.__name__, maxsize, throughput))
+
+    print("Exact vs approximate LRU_Cache trackers: hit path throughput (lookups/sec), Zipf hit ratio")
+    keys = list(zipf_trace(times, 100000, 0.9))
+    for tracker in (RecencyTracker, LinkedRecencyTracker, SampledRecencyTracker):
+        cache_class = partial(LRU_Cache, tracker=tracker)
+        for maxsize in (4096, 65536):
+            throughput = hit_path_throughput(cache_class, maxsize, times)
+            hits, accesses = replay(keys, cache_class(maxsize))
+            print("{:>22} maxsize={:<6} {:>12,.0f} {:>8.2%}".format(
+                tracker.__name__, maxsize, throughput, hits / accesses))
+
+    print("Key building cost (ns/call)")
+    signatures = [
+        ("f(1)", (1,), {}),
+        ("f(1.5)", (1.5,), {}),
+        ("f(1, 'a', None)", (1, "a", None), {}),
+        ("f(1, b=2, c=3)", (1,), {"b": 2, "c": 3}),
+    ]
+    for name, args, kw in signatures:
+        for typed in (False, True):
+            cost = key_building_cost(args, kw, typed, times)
+            print("{:>20} typed={:<5} {:>8,.0f}".format(name, str(typed), cost))
+
+    print("Contended get-or-set throughput under thread pool (ops/sec)")
+    for workers in (1, 4, 16):
+        for shards in (1, 16):
+            throughput = contention_throughput(shards, workers, times // workers)
+            print("{:>12} workers={:<3} shards={:<3} {:>12,.0f}".format(
+                Sharded_LRU_Cache.__name__, workers, shards, throughput))
+
+
+if __name__ == '__main__':
+    main()
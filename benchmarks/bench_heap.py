@@ -0,0 +1,70 @@
+"""
+Throughput benchmark of heap arities.
+
+Pushes a queue full, then alternates pops and pushes as a steady-state scheduler would, for every arity and queue
+size. Higher arities favour push-heavy mixes, lower arities pop-heavy ones.
+
+Usage: python -m benchmarks.bench_heap
+"""
+
+from random import Random
+from time import perf_counter
+
+from algorithms.priority_queue import PriorityQueue
+
+ARITIES = [2, 3, 4, 8, 16]
+SIZES = [1000, 100000]
+
+
+def push_throughput(arity, size, seed=0):
+    """Return pushes per second of *size* random keys into an empty queue."""
+    rng = Random(seed)
+    keys = rng.sample(range(size * 10), size)
+    queue = PriorityQueue(arity=arity)
+
+    begin = perf_counter()
+    for key in keys:
+        queue.enqueue(key)
+    end = perf_counter()
+    return size / (end - begin)
+
+
+def pop_throughput(arity, size, seed=0):
+    """Return pops per second of draining a queue of *size* random keys."""
+    rng = Random(seed)
+    queue = PriorityQueue.from_iterable(((key, None) for key in rng.sample(range(size * 10), size)), arity=arity)
+
+    begin = perf_counter()
+    while not queue.isEmpty():
+        queue.dequeue()
+    end = perf_counter()
+    return size / (end - begin)
+
+
+def steady_throughput(arity, size, times, seed=0):
+    """Return pop-push pairs per second on a queue holding *size* keys, every pushed key later than the popped."""
+    rng = Random(seed)
+    queue = PriorityQueue.from_iterable(((key, None) for key in rng.sample(range(size * 10), size)), arity=arity)
+    delays = [rng.randrange(1, size * 10) for _ in range(times)]
+
+    begin = perf_counter()
+    for delay in delays:
+        key, _ = queue.dequeue()
+        while key + delay in queue:
+            delay += 1
+        queue.enqueue(key + delay)
+    end = perf_counter()
+    return times / (end - begin)
+
+
+def main():
+    print("{:>6} {:>8} {:>14} {:>14} {:>14}".format("arity", "size", "push/sec", "pop/sec", "pop+push/sec"))
+    for size in SIZES:
+        for arity in ARITIES:
+            print("{:>6} {:>8} {:>14,.0f} {:>14,.0f} {:>14,.0f}".format(
+                arity, size, push_throughput(arity, size), pop_throughput(arity, size),
+                steady_throughput(arity, size, min(size, 100000))))
+
+
+if __name__ == '__main__':
+    main()
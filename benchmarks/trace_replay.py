@@ -0,0 +1,204 @@
+"""
+Trace-replay simulator of cache implementations.
+
+Replays key traces against every cache class at several sizes, and reports hit ratio, throughput and peak memory.
+Every access is a get-or-set: a miss inserts the key.
+
+Traces are read from files, either text with one key per line, or compact binary of little-endian unsigned 64-bit
+integer keys (extension .bin). Without any file, synthetic Zipf, scan and loop traces are replayed.
+
+Traces are streamed, never loaded in memory whole: every replay reads the file again, or generates the synthetic
+trace again. Throughput hence includes reading or generating keys, which costs the same for every cache class.
+
+Usage: python -m benchmarks.trace_replay [--sizes 100,1000] [--length 100000] [TRACE ...]
+"""
+
+import argparse
+import os
+import struct
+import tracemalloc
+from functools import partial
+from itertools import accumulate, chain, cycle, islice
+from random import Random
+from time import perf_counter
+
+from algorithms.cache import (ARC_Cache, Clock_Cache, LRU_Cache,
+                              Sharded_LRU_Cache, TwoQueue_Cache,
+                              WTinyLFU_Cache)
+
+# SplayTree_Cache doesn't implement the mapping interface, hence left out.
+CACHE_CLASSES = [LRU_Cache, Sharded_LRU_Cache, Clock_Cache, ARC_Cache, TwoQueue_Cache, WTinyLFU_Cache]
+
+BINARY_KEY = struct.Struct("<Q")
+
+# Number of keys read or generated at once.
+CHUNK_SIZE = 8192
+
+
+def read_text_trace(path):
+    """Generate keys of text trace file, one per line. Blank lines are skipped."""
+    with open(path) as file:
+        for line in file:
+            key = line.strip()
+            if key:
+                yield key
+
+
+def read_binary_trace(path):
+    """Generate integer keys of binary trace file."""
+    with open(path, "rb") as file:
+        while True:
+            chunk = file.read(BINARY_KEY.size * CHUNK_SIZE)
+            if len(chunk) % BINARY_KEY.size:
+                raise ValueError("Truncated binary trace")
+            if not chunk:
+                return
+            for key, in BINARY_KEY.iter_unpack(chunk):
+                yield key
+
+
+def write_binary_trace(path, keys):
+    """Write iterable of non-negative integer keys to binary trace file."""
+    keys = iter(keys)
+    with open(path, "wb") as file:
+        for chunk in iter(lambda: list(islice(keys, CHUNK_SIZE)), []):
+            file.write(struct.pack("<{}Q".format(len(chunk)), *chunk))
+
+
+def read_trace(path):
+    return read_binary_trace(path) if os.path.splitext(path)[1] == ".bin" else read_text_trace(path)
+
+
+def zipf_trace(length, universe, alpha=1.0, seed=0):
+    """Generate *length* keys in range(universe), key k being drawn with probability proportional to 1/(k+1)^alpha."""
+    rng = Random(seed)
+    cum_weights = list(accumulate(1 / (rank + 1) ** alpha for rank in range(universe)))
+    population = range(universe)
+    while length > 0:
+        count = min(length, CHUNK_SIZE)
+        yield from rng.choices(population, cum_weights=cum_weights, k=count)
+        length -= count
+
+
+def scan_trace(length, start=0):
+    """Generate *length* distinct keys in sequence, none of them ever reused."""
+    return iter(range(start, start + length))
+
+
+def loop_trace(length, loop):
+    """Generate *length* keys cycling over range(loop)."""
+    return islice(cycle(range(loop)), length)
+
+
+def scan_mixed_trace(length, universe, scan_length, alpha=1.0, seed=0):
+    """Zipf trace interrupted by a one-off scan of *scan_length* keys every *universe* accesses."""
+    zipf = zipf_trace(length, universe, alpha, seed)
+    scan = scan_trace(length, universe)
+    produced = 0
+    while produced < length:
+        for key in islice(zipf, min(universe, length - produced)):
+            yield key
+            produced += 1
+        for key in islice(scan, min(scan_length, length - produced)):
+            yield key
+            produced += 1
+
+
+def replay(keys, cache):
+    """Replay *keys* as get-or-set accesses against *cache*. Return (hits, accesses)."""
+    hits = accesses = 0
+    for key in keys:
+        accesses += 1
+        try:
+            cache[key]
+            hits += 1
+        except KeyError:
+            cache[key] = key
+    return hits, accesses
+
+
+class NullCache:
+    """Cache which never holds anything. Replaying against it measures memory taken by the trace itself."""
+
+    def __init__(self, maxsize=None):
+        pass
+
+    def __getitem__(self, key):
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        pass
+
+
+def traced_peak(open_trace, make_cache):
+    """Return peak memory in bytes allocated while replaying the trace against a cache made by *make_cache*."""
+    keys = open_trace()
+    # Draw the first key before tracing, so that setting the trace up, e.g. weights of zipf_trace, isn't counted.
+    first = list(islice(keys, 1))
+    tracemalloc.start()
+    try:
+        replay(chain(first, keys), make_cache())
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(open_trace, cache_class, maxsize):
+    """
+        Return dict of hit ratio, ops per sec and peak memory in bytes of *cache_class* of *maxsize* replaying the
+        trace. *open_trace* is a callable returning a new iterator of its keys. The trace is replayed again for
+        memory, since tracing slows the replay down, and once more against NullCache, whose peak, i.e. the chunk of
+        keys read or generated at a time, is deducted.
+    """
+    cache = cache_class(maxsize)
+    begin = perf_counter()
+    hits, accesses = replay(open_trace(), cache)
+    end = perf_counter()
+
+    peak = traced_peak(open_trace, partial(cache_class, maxsize)) - traced_peak(open_trace, NullCache)
+
+    return {
+        "hit_ratio": hits / accesses if accesses else 0.0,
+        "ops_per_sec": accesses / (end - begin) if end > begin else float("inf"),
+        "peak_memory": max(peak, 0),
+    }
+
+
+def synthetic_traces(length):
+    """Return list of (name, callable returning a new iterator of the trace keys)."""
+    universe = 10000
+    return [
+        ("zipf(1.0)", partial(zipf_trace, length, universe, 1.0)),
+        ("zipf(0.7)", partial(zipf_trace, length, universe, 0.7)),
+        ("zipf+scan", partial(scan_mixed_trace, length, universe, universe // 2)),
+        ("loop(2000)", partial(loop_trace, length, 2000)),
+        ("scan", partial(scan_trace, length)),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay key traces against cache implementations.")
+    parser.add_argument("traces", nargs="*", help="trace files, text or binary (.bin)")
+    parser.add_argument("--sizes", default="100,1000,5000", help="comma separated cache sizes")
+    parser.add_argument("--length", type=int, default=100000, help="length of synthetic traces")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    if args.traces:
+        traces = [(os.path.basename(path), partial(read_trace, path)) for path in args.traces]
+    else:
+        traces = synthetic_traces(args.length)
+
+    print("{:<12} {:>7} {:>18} {:>9} {:>12} {:>12}".format(
+        "trace", "maxsize", "cache", "hit ratio", "ops/sec", "peak KiB"))
+    for trace_name, open_trace in traces:
+        for maxsize in sizes:
+            for cache_class in CACHE_CLASSES:
+                result = measure(open_trace, cache_class, maxsize)
+                print("{:<12} {:>7} {:>18} {:>9.2%} {:>12,.0f} {:>12,.0f}".format(
+                    trace_name, maxsize, cache_class.__name__, result["hit_ratio"], result["ops_per_sec"],
+                    result["peak_memory"] / 1024))
+
+
+if __name__ == '__main__':
+    main()
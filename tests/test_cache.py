@@ -1,9 +1,21 @@
 import unittest
+import asyncio
+import io
+import os
+import pickle
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from random import randint
-from time import time
+from threading import Barrier
+from time import sleep, time
 
-from algorithms.cache import (Clock_Cache, LRU_Cache, SplayTree_Cache,
-                              cache_decorator)
+from algorithms.cache import (ARC_Cache, Clock_Cache, LRU_Cache,
+                              Sharded_LRU_Cache, SplayTree_Cache,
+                              TwoQueue_Cache, WTinyLFU_Cache, batched_cache,
+                              build_key, cache_decorator)
+from algorithms.disk_tier import SpillFile
+from algorithms.recency_tracker import (LinkedRecencyTracker,
+                                        SampledRecencyTracker)
 
 
 class TestLRUCache(unittest.TestCase):
@@ -49,10 +61,505 @@ class TestLRUCache(unittest.TestCase):
             self.cache[9]
 
 
-@unittest.skip("Not Implemented")
 class TestClockCache(TestLRUCache):
     def setUp(self):
-        self.cache = Clock_Cache()
+        self.cache = Clock_Cache(maxsize=9)
+
+    def test_second_chance(self):
+        self.trivial_case()
+        # Referenced entry survives one sweep of the clock hand.
+        self.cache[6]
+        self.cache[10] = 1000
+        self.assertEqual(self.cache[6], 600)
+        with self.assertRaises(KeyError):
+            self.cache[9]
+
+    def test_reuse_deleted_slot(self):
+        self.trivial_case()
+        del self.cache[4]
+        self.cache[10] = 1000
+        self.assertEqual(self.cache.size, 9)
+        self.assertEqual(self.cache[6], 600)
+        self.assertEqual(self.cache[10], 1000)
+
+    def test_statistic(self):
+        self.cache[1] = 100
+        self.cache[1]
+        with self.assertRaises(KeyError):
+            self.cache[2]
+        self.assertEqual(self.cache.statistic(), (1, 1))
+
+    def test_discard_from_empty_cache(self):
+        with self.assertRaises(IndexError):
+            self.cache.discard_lru()
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCacheExpiration(unittest.TestCase):
+    def setUp(self):
+        self.timer = FakeTimer()
+        self.cache = LRU_Cache(maxsize=4, ttl=10, timer=self.timer)
+
+    def tearDown(self):
+        del self.cache
+
+    def test_cache_wide_ttl(self):
+        self.cache[1] = 100
+        self.timer.now = 9
+        self.assertEqual(self.cache[1], 100)
+        self.timer.now = 10
+        with self.assertRaises(KeyError):
+            self.cache[1]
+        self.assertEqual(self.cache.size, 0)
+        self.assertEqual(self.cache.statistic(), (1, 1))
+
+    def test_per_entry_ttl(self):
+        self.cache.set(1, 100, ttl=2)
+        self.cache[2] = 200
+        self.timer.now = 3
+        with self.assertRaises(KeyError):
+            self.cache[1]
+        self.assertEqual(self.cache[2], 200)
+
+    def test_fractional_ttl(self):
+        self.cache = LRU_Cache(maxsize=8, ttl=10.9, timer=self.timer)
+        self.cache["x"] = 1
+        self.timer.now = 10
+        self.cache["y"] = 2
+        self.assertEqual(self.cache["x"], 1)
+        self.timer.now = 10.5
+        self.cache.set("a", 1, ttl=0.4)
+        self.timer.now = 10.85
+        self.cache["b"] = 2
+        self.assertEqual(self.cache["a"], 1)
+        self.timer.now = 11
+        self.cache["c"] = 3
+        # Both are reaped once due, leaving "y", "b" and "c".
+        self.assertEqual(self.cache.size, 3)
+
+    def test_overwrite_renews_deadline(self):
+        self.cache[1] = 100
+        self.timer.now = 8
+        self.cache[1] = 101
+        self.timer.now = 12
+        self.assertEqual(self.cache[1], 101)
+
+    def test_no_ttl(self):
+        self.cache = LRU_Cache(maxsize=4, timer=self.timer)
+        self.cache[1] = 100
+        self.cache.set(2, 200, ttl=5)
+        self.cache[2] = 201
+        self.timer.now = 1000
+        self.assertEqual(self.cache[1], 100)
+        self.assertEqual(self.cache[2], 201)
+
+    def test_reap_before_discarding_live_entry(self):
+        for key in range(4):
+            self.cache.set(key, key, ttl=60 if key == 0 else 5)
+        self.timer.now = 6
+        self.cache[4] = 4
+        # Expired cold entries are reclaimed, instead of the least recently used live entry.
+        self.assertEqual(self.cache.size, 2)
+        self.assertEqual(self.cache[0], 0)
+
+    def test_invalid_ttl(self):
+        with self.assertRaises(ValueError):
+            LRU_Cache(ttl=0)
+        with self.assertRaises(ValueError):
+            self.cache.set(1, 100, ttl=-1)
+
+    def test_delete(self):
+        self.cache[1] = 100
+        del self.cache[1]
+        self.cache[2] = 200
+        self.cache.discard_lru()
+        self.timer.now = 20
+        # Reaping doesn't trip over entries already gone.
+        self.cache[3] = 300
+        self.assertEqual(self.cache.size, 1)
+
+
+class TestLRUCacheWeight(unittest.TestCase):
+    def setUp(self):
+        self.cache = LRU_Cache(maxsize=None, maxweight=10, weigher=lambda key, value: len(value))
+
+    def tearDown(self):
+        del self.cache
+
+    def test_weight(self):
+        self.cache["a"] = "xxx"
+        self.cache["b"] = "xxxx"
+        self.assertEqual(self.cache.weight, 7)
+        self.cache["a"] = "x"
+        self.assertEqual(self.cache.weight, 5)
+        del self.cache["b"]
+        self.assertEqual(self.cache.weight, 1)
+        self.cache.clear()
+        self.assertEqual(self.cache.weight, 0)
+
+    def test_discard_until_within_budget(self):
+        self.cache["a"] = "xxx"
+        self.cache["b"] = "xxx"
+        self.cache["c"] = "xxx"
+        self.cache["a"]
+        self.cache["d"] = "xxxxxx"
+        # Both "b" and "c" are discarded to make room, while recently used "a" survives.
+        self.assertEqual(self.cache.weight, 9)
+        self.assertEqual(self.cache["a"], "xxx")
+        with self.assertRaises(KeyError):
+            self.cache["b"]
+        with self.assertRaises(KeyError):
+            self.cache["c"]
+
+    def test_reject_oversized_entry(self):
+        self.cache["a"] = "xxx"
+        with self.assertRaises(ValueError):
+            self.cache["b"] = "x" * 11
+        self.assertEqual(self.cache["a"], "xxx")
+        self.assertEqual(self.cache.weight, 3)
+
+    def test_maxsize_applies_as_well(self):
+        self.cache = LRU_Cache(maxsize=2, maxweight=10, weigher=lambda key, value: len(value))
+        self.cache["a"] = "x"
+        self.cache["b"] = "x"
+        self.cache["c"] = "x"
+        self.assertEqual(self.cache.size, 2)
+        self.assertEqual(self.cache.weight, 2)
+
+    def test_default_weigher(self):
+        self.cache = LRU_Cache(maxweight=10 ** 6)
+        self.cache["a"] = "xxx"
+        self.assertGreater(self.cache.weight, 0)
+
+    def test_invalid_setting(self):
+        with self.assertRaises(ValueError):
+            LRU_Cache(maxsize=None)
+        with self.assertRaises(ValueError):
+            LRU_Cache(maxweight=0)
+        with self.assertRaises(ValueError):
+            LRU_Cache(weigher=len)
+
+
+class TestLRUCacheDiskTier(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.spill = SpillFile(os.path.join(self.directory.name, "spill"))
+        self.cache = LRU_Cache(maxsize=2, spill=self.spill)
+
+    def tearDown(self):
+        self.spill.close()
+        self.directory.cleanup()
+
+    def test_spill(self):
+        for key in range(4):
+            self.cache[key] = key * 100
+        self.assertEqual(self.cache.size, 2)
+        self.assertEqual(len(self.spill), 2)
+        # Found on disk, and moved back to memory.
+        self.assertEqual(self.cache[0], 0)
+        self.assertNotIn(0, self.spill)
+        self.assertIn(2, self.spill)
+        self.assertEqual(self.cache.statistic(), (1, 0))
+        with self.assertRaises(KeyError):
+            self.cache[4]
+
+    def test_overwrite_spilled(self):
+        for key in range(3):
+            self.cache[key] = key
+        self.cache[0] = "new"
+        self.assertEqual(self.cache[0], "new")
+        self.assertEqual(len(self.spill) + self.cache.size, 3)
+
+    def test_delete_spilled(self):
+        for key in range(3):
+            self.cache[key] = key
+        del self.cache[0]
+        with self.assertRaises(KeyError):
+            self.cache[0]
+
+    def test_expiring_entry_not_spilled(self):
+        self.cache.set(0, 0, ttl=60)
+        self.cache[1] = 1
+        self.cache[2] = 2
+        self.assertNotIn(0, self.spill)
+
+
+class TestLRUCacheSnapshot(unittest.TestCase):
+    def test_round_trip(self):
+        timer = FakeTimer()
+        cache = LRU_Cache(maxsize=4, timer=timer)
+        for key in range(4):
+            cache[key] = key * 100
+        cache[0]
+        cache.set(4, 400, ttl=10)
+        cache.set(5, 500, ttl=1)
+        timer.now = 2
+
+        file = io.BytesIO()
+        cache.save_snapshot(file)
+        file.seek(0)
+        restored = LRU_Cache(maxsize=4, timer=timer)
+        restored.load_snapshot(file)
+
+        self.assertEqual(restored.size, 3)
+        self.assertEqual(restored[4], 400)
+        self.assertEqual(list(restored._recency_tracker), [3, 0, 4])
+        timer.now = 10
+        with self.assertRaises(KeyError):
+            restored[4]
+
+
+class TestShardedLRUCache(TestLRUCache):
+    def setUp(self):
+        self.cache = Sharded_LRU_Cache(maxsize=9, shards=3)
+
+    def test_maxsize(self):
+        self.trivial_case()
+        self.assertEqual(self.cache.size, 9)
+        for key in range(10, 100):
+            self.cache[key] = key * 100
+            self.assertLessEqual(self.cache.size, 9)
+
+    def test_statistic(self):
+        self.cache[1] = 100
+        self.cache[1]
+        with self.assertRaises(KeyError):
+            self.cache[2]
+        self.assertEqual(self.cache.statistic(), (1, 1))
+
+    def test_concurrent_access(self):
+        self.cache = Sharded_LRU_Cache(maxsize=64, shards=8)
+
+        def work(offset):
+            for key in range(offset, offset + 1000):
+                self.cache[key % 200] = key % 200
+                try:
+                    self.assertEqual(self.cache[key % 150], key % 150)
+                except KeyError:
+                    pass
+
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(work, range(0, 8000, 1000)))
+        self.assertLessEqual(self.cache.size, 64)
+        hit, miss = self.cache.statistic()
+        self.assertEqual(hit + miss, 8000)
+
+
+class TestBulkAccess(unittest.TestCase):
+    cache_class = LRU_Cache
+
+    def test_get_many(self):
+        cache = self.cache_class(8)
+        cache.set_many({1: 10, 2: 20, 3: 30})
+        hits, misses = cache.get_many([1, 4, 3, 5])
+        self.assertEqual(hits, {1: 10, 3: 30})
+        self.assertEqual(misses, [4, 5])
+        self.assertEqual(cache.statistic(), (2, 2))
+
+    def test_set_many_overflow(self):
+        cache = self.cache_class(4)
+        cache.set_many((key, key * 10) for key in range(10))
+        self.assertEqual(len(cache), 4)
+        hits, _ = cache.get_many(range(10))
+        for key, value in hits.items():
+            self.assertEqual(value, key * 10)
+
+    def test_touch_many(self):
+        cache = self.cache_class(8)
+        cache.set_many({1: 10, 2: 20, 3: 30})
+        cache.touch_many([3, 1, 9])
+        self.assertEqual(cache.statistic(), (0, 0))
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.get_many([1, 2, 3, 9]), ({1: 10, 2: 20, 3: 30}, [9]))
+
+
+class TestShardedBulkAccess(TestBulkAccess):
+    cache_class = Sharded_LRU_Cache
+
+
+class TestClockBulkAccess(TestBulkAccess):
+    cache_class = Clock_Cache
+
+
+class TestARCBulkAccess(TestBulkAccess):
+    cache_class = ARC_Cache
+
+
+class TestTwoQueueBulkAccess(TestBulkAccess):
+    cache_class = TwoQueue_Cache
+
+
+class TestWTinyLFUBulkAccess(TestBulkAccess):
+    cache_class = WTinyLFU_Cache
+
+
+class TestLRUCacheBulkAccess(unittest.TestCase):
+    def test_recency_order(self):
+        cache = LRU_Cache(4)
+        cache.set_many([(1, 1), (2, 2), (3, 3), (4, 4)])
+        cache.get_many([1, 2])
+        cache[5] = 5
+        cache[6] = 6
+        self.assertEqual(cache.get_many([1, 2, 3, 4])[1], [3, 4])
+
+    def test_touch_many(self):
+        cache = LRU_Cache(3)
+        cache.set_many({1: 1, 2: 2, 3: 3})
+        cache.touch_many([1, 9])
+        cache[4] = 4
+        self.assertEqual(cache.get_many([1, 2])[1], [2])
+        self.assertEqual(cache.statistic(), (1, 1))
+
+    def test_expiring(self):
+        timer = FakeTimer()
+        cache = LRU_Cache(8, ttl=1, timer=timer)
+        cache.set_many({1: 1, 2: 2})
+        timer.now = 2
+        self.assertEqual(cache.get_many([1, 2]), ({}, [1, 2]))
+
+    def test_weighted(self):
+        cache = LRU_Cache(None, maxweight=3, weigher=lambda key, value: value)
+        cache.set_many([(1, 1), (2, 2), (3, 1)])
+        self.assertEqual(cache.weight, 3)
+
+
+class TestBatchedCache(unittest.TestCase):
+    def test_batched(self):
+        calls = []
+
+        @batched_cache(8)
+        def load(keys):
+            calls.append(keys)
+            return {key: key * 10 for key in keys if key != 0}
+
+        self.assertEqual(load([1, 2, 0]), {1: 10, 2: 20})
+        self.assertEqual(load([2, 3, 3, 1]), {2: 20, 3: 30, 1: 10})
+        self.assertEqual(load([1, 2]), {1: 10, 2: 20})
+        self.assertEqual(calls, [[1, 2, 0], [3]])
+
+    def test_coroutine_function(self):
+        calls = []
+
+        @batched_cache(8)
+        async def load(keys):
+            calls.append(keys)
+            return {key: key * 10 for key in keys}
+
+        async def main():
+            return await load([1, 2]), await load([2, 3])
+
+        self.assertEqual(asyncio.run(main()), ({1: 10, 2: 20}, {2: 20, 3: 30}))
+        self.assertEqual(calls, [[1, 2], [3]])
+
+
+class EvictionPolicyCacheMixin:
+    """Loosens the tests of TestLRUCache which expect the exact eviction order of LRU."""
+
+    def create_cache(self, maxsize):
+        return self.cache.__class__(maxsize=maxsize)
+
+    def test_maxsize(self):
+        self.trivial_case()
+        self.assertEqual(self.cache.size, 9)
+        for key in range(10, 100):
+            self.cache[key] = key * 100
+            self.assertLessEqual(self.cache.size, 9)
+
+    def test_statistic(self):
+        self.cache[1] = 100
+        self.cache[1]
+        with self.assertRaises(KeyError):
+            self.cache[2]
+        self.assertEqual(self.cache.statistic(), (1, 1))
+
+    def test_discard(self):
+        self.trivial_case()
+        for size in range(8, -1, -1):
+            self.cache.discard_lru()
+            self.assertEqual(self.cache.size, size)
+        with self.assertRaises(IndexError):
+            self.cache.discard_lru()
+
+
+class ScanResistantCacheMixin(EvictionPolicyCacheMixin):
+    def test_scan_resistance(self):
+        self.cache = self.create_cache(100)
+        hot_keys = range(50)
+        for round in range(5):
+            for key in hot_keys:
+                try:
+                    self.cache[key]
+                except KeyError:
+                    self.cache[key] = key
+                # Interleaved one-off keys keep the cache under replacement pressure.
+                self.cache[-1 - key - 50 * round] = key
+        for key in range(1000, 2000):
+            self.cache[key] = key
+        survivors = 0
+        for key in hot_keys:
+            try:
+                self.cache[key]
+                survivors += 1
+            except KeyError:
+                pass
+        self.assertGreater(survivors, 40)
+
+
+class TestLinkedLRUCache(TestLRUCache):
+    def setUp(self):
+        self.cache = LRU_Cache(maxsize=9, tracker=LinkedRecencyTracker)
+
+
+class TestSampledLRUCache(EvictionPolicyCacheMixin, TestLRUCache):
+    def setUp(self):
+        self.cache = self.create_cache(9)
+
+    def create_cache(self, maxsize):
+        return LRU_Cache(maxsize=maxsize, tracker=SampledRecencyTracker)
+
+
+class TestSegmentedLRUCache(ScanResistantCacheMixin, TestLRUCache):
+    def setUp(self):
+        self.cache = self.create_cache(9)
+
+    def create_cache(self, maxsize):
+        return LRU_Cache(maxsize=maxsize, protected_ratio=0.8)
+
+    def test_promotion(self):
+        self.trivial_case()
+        # Referenced twice, hence protected. The others are discarded first.
+        self.cache[6]
+        for key in range(10, 18):
+            self.cache[key] = key
+        self.assertEqual(self.cache[6], 600)
+
+    def test_invalid_setting(self):
+        with self.assertRaises(ValueError):
+            LRU_Cache(maxsize=8, protected_ratio=1)
+        with self.assertRaises(ValueError):
+            LRU_Cache(maxsize=None, maxweight=8, protected_ratio=0.5)
+
+
+class TestARCCache(ScanResistantCacheMixin, TestLRUCache):
+    def setUp(self):
+        self.cache = ARC_Cache(maxsize=9)
+
+
+class TestTwoQueueCache(ScanResistantCacheMixin, TestLRUCache):
+    def setUp(self):
+        self.cache = TwoQueue_Cache(maxsize=9)
+
+
+class TestWTinyLFUCache(ScanResistantCacheMixin, TestLRUCache):
+    def setUp(self):
+        self.cache = WTinyLFU_Cache(maxsize=9)
 
 
 class TestSplayTreeCache(TestLRUCache):
@@ -90,10 +597,24 @@ class TestLRUCacheDecorator(unittest.TestCase):
     # def setUp(self):
     #     self.decorator = cache_decorator(maxsize=cache_size)
 
+    policy = None
+
     def test_wrapping_is_functional(self):
-        wrapped_function = cache_decorator(128)(max)
+        wrapped_function = cache_decorator(128, policy=self.policy)(max)
         self.assertEqual(wrapped_function(1, 2), 2)
 
+    def test_caching(self):
+        calls = []
+
+        @cache_decorator(2, policy=self.policy)
+        def double(n):
+            calls.append(n)
+            return n * 2
+
+        self.assertEqual(double(1), 2)
+        self.assertEqual(double(1), 2)
+        self.assertEqual(calls, [1])
+
     @unittest.skip("Time spending. And the test result is unstable.")
     def test_cache_performance(self):
         cache_size = 10
@@ -117,9 +638,266 @@ class TestLRUCacheDecorator(unittest.TestCase):
         # print("Original: {}\nNew: {}".format(original, new))
 
 
-@unittest.skip("Not implemented")
+class TestSingleFlight(unittest.TestCase):
+    def test_coroutine_function(self):
+        calls = []
+
+        @cache_decorator(maxsize=8)
+        async def fetch(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return key * 2
+
+        async def main():
+            return await asyncio.gather(*(fetch(1) for _ in range(10)))
+
+        self.assertEqual(asyncio.run(main()), [2] * 10)
+        self.assertEqual(calls, [1])
+        self.assertEqual(asyncio.run(fetch(1)), 2)
+        self.assertEqual(calls, [1])
+
+    def test_coroutine_function_exception(self):
+        calls = []
+
+        @cache_decorator(maxsize=8)
+        async def fail(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            raise RuntimeError(key)
+
+        async def main():
+            return await asyncio.gather(*(fail(1) for _ in range(5)), return_exceptions=True)
+
+        results = asyncio.run(main())
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(calls, [1])
+        # Failure is not cached.
+        with self.assertRaises(RuntimeError):
+            asyncio.run(fail(1))
+        self.assertEqual(calls, [1, 1])
+
+    def test_threaded_callers(self):
+        calls = []
+        workers = 8
+        barrier = Barrier(workers)
+
+        @cache_decorator(maxsize=8)
+        def fetch(key):
+            calls.append(key)
+            sleep(0.05)
+            return key * 2
+
+        def work(key):
+            barrier.wait()
+            return fetch(key)
+
+        with ThreadPoolExecutor(workers) as executor:
+            results = list(executor.map(work, [1] * workers))
+        self.assertEqual(results, [2] * workers)
+        self.assertEqual(calls, [1])
+
+    def test_threaded_callers_exception(self):
+        workers = 4
+        barrier = Barrier(workers)
+
+        @cache_decorator(maxsize=8)
+        def fail(key):
+            sleep(0.05)
+            raise RuntimeError(key)
+
+        def work(key):
+            barrier.wait()
+            try:
+                fail(key)
+            except RuntimeError as error:
+                return error
+
+        with ThreadPoolExecutor(workers) as executor:
+            results = list(executor.map(work, [1] * workers))
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    def test_ttl(self):
+        calls = []
+
+        @cache_decorator(maxsize=8, ttl=0.05)
+        def fetch(key):
+            calls.append(key)
+            return key * 2
+
+        fetch(1)
+        fetch(1)
+        self.assertEqual(calls, [1])
+        sleep(0.06)
+        fetch(1)
+        self.assertEqual(calls, [1, 1])
+
+    def test_unhashable_arguments(self):
+        wrapped_function = cache_decorator(8)(len)
+        with self.assertRaises(ValueError):
+            wrapped_function([1, 2])
+
+
+class TestRefresh(unittest.TestCase):
+    def wait_for_refresh(self, wrapper, key):
+        # The refresh stores a fresh pair of result and time.
+        begin = time()
+        stale = wrapper.__cache__[key]
+        while wrapper.__cache__[key] is stale and time() - begin < 1:
+            sleep(0.005)
+
+    def test_stale_while_revalidate(self):
+        calls = []
+
+        @cache_decorator(8, refresh_after=0.05)
+        def fetch(key):
+            calls.append(key)
+            return len(calls)
+
+        self.assertEqual(fetch(1), 1)
+        self.assertEqual(fetch(1), 1)
+        sleep(0.06)
+        self.assertEqual(fetch(1), 1)
+        self.wait_for_refresh(fetch, 1)
+        self.assertEqual(fetch(1), 2)
+        self.assertEqual(calls, [1, 1])
+
+    def test_deduplicated(self):
+        release = Barrier(2)
+        calls = []
+
+        @cache_decorator(8, refresh_after=0.01)
+        def fetch(key):
+            calls.append(key)
+            if len(calls) > 1:
+                release.wait()
+            return len(calls)
+
+        fetch(1)
+        sleep(0.02)
+        for _ in range(10):
+            self.assertEqual(fetch(1), 1)
+        release.wait()
+        self.wait_for_refresh(fetch, 1)
+        self.assertEqual(calls, [1, 1])
+        self.assertEqual(fetch(1), 2)
+
+    def test_failed_refresh(self):
+        calls = []
+
+        @cache_decorator(8, refresh_after=0.01)
+        def fetch(key):
+            calls.append(key)
+            if len(calls) == 2:
+                raise RuntimeError
+            return len(calls)
+
+        fetch(1)
+        sleep(0.02)
+        self.assertEqual(fetch(1), 1)
+        sleep(0.02)
+        self.assertEqual(fetch(1), 1)
+        self.wait_for_refresh(fetch, 1)
+        self.assertEqual(fetch(1), 3)
+
+    def test_refresh_ahead(self):
+        calls = []
+
+        @cache_decorator(8, ttl=0.2, refresh_ahead=0.15)
+        def fetch(key):
+            calls.append(key)
+            return len(calls)
+
+        fetch(1)
+        sleep(0.06)
+        self.assertEqual(fetch(1), 1)
+        self.wait_for_refresh(fetch, 1)
+        self.assertEqual(fetch(1), 2)
+
+    def test_coroutine_function(self):
+        calls = []
+
+        @cache_decorator(8, refresh_after=0.05)
+        async def fetch(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        async def main():
+            first = await fetch(1)
+            await asyncio.sleep(0.06)
+            stale = await asyncio.gather(*(fetch(1) for _ in range(5)))
+            await asyncio.sleep(0.03)
+            return first, stale, await fetch(1)
+
+        self.assertEqual(asyncio.run(main()), (1, [1] * 5, 2))
+        self.assertEqual(calls, [1, 1])
+
+    def test_invalid_setting(self):
+        with self.assertRaises(ValueError):
+            cache_decorator(8, refresh_after=0)
+        with self.assertRaises(ValueError):
+            cache_decorator(8, refresh_ahead=1)
+        with self.assertRaises(ValueError):
+            cache_decorator(8, ttl=1, refresh_ahead=1)
+
+
+class Colliding:
+    def __hash__(self):
+        return 0
+
+
+class TestBuildKey(unittest.TestCase):
+    def test_hash_collision(self):
+        first, second = Colliding(), Colliding()
+        self.assertEqual(hash(build_key((first,), {})), hash(build_key((second,), {})))
+        self.assertNotEqual(build_key((first,), {}), build_key((second,), {}))
+
+        wrapped_function = cache_decorator(8)(id)
+        self.assertEqual(wrapped_function(first), id(first))
+        self.assertEqual(wrapped_function(second), id(second))
+
+    def test_keyword_arguments(self):
+        self.assertEqual(build_key((1,), {"a": 2}), build_key((1,), {"a": 2}))
+        self.assertNotEqual(build_key((1,), {"a": 2}), build_key((1, "a", 2), {}))
+        self.assertNotEqual(build_key((1,), {"a": 2}), build_key((1,), {"a": 3}))
+
+    def test_typed(self):
+        self.assertNotEqual(build_key((1.0,), {}, typed=True), build_key((1,), {}, typed=True))
+        self.assertNotEqual(build_key((1, 2.0), {}, typed=True), build_key((1, 2), {}, typed=True))
+        self.assertNotEqual(build_key((), {"a": 1.0}, typed=True), build_key((), {"a": 1}, typed=True))
+
+        calls = []
+
+        @cache_decorator(8, typed=True)
+        def identity(value):
+            calls.append(value)
+            return value
+
+        identity(1)
+        identity(1.0)
+        identity(1)
+        self.assertEqual(calls, [1, 1.0])
+
+    def test_pickle_round_trip(self):
+        key = build_key((1, "a"), {"b": None})
+        self.assertEqual(pickle.loads(pickle.dumps(key)), key)
+        self.assertEqual(hash(pickle.loads(pickle.dumps(key))), hash(key))
+
+
 class TestClockCacheDecorator(TestLRUCacheDecorator):
-    pass
+    policy = Clock_Cache
+
+
+class TestARCCacheDecorator(TestLRUCacheDecorator):
+    policy = ARC_Cache
+
+
+class TestTwoQueueCacheDecorator(TestLRUCacheDecorator):
+    policy = TwoQueue_Cache
+
+
+class TestWTinyLFUCacheDecorator(TestLRUCacheDecorator):
+    policy = WTinyLFU_Cache
 
 
 class TestSplayTreeCacheDecorator(TestLRUCacheDecorator):
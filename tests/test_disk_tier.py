@@ -0,0 +1,78 @@
+import io
+import os
+import tempfile
+import unittest
+
+from algorithms import disk_tier
+from algorithms.disk_tier import SpillFile, read_snapshot, write_snapshot
+
+
+class TestSpillFile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "spill")
+        self.spill = SpillFile(self.path)
+
+    def tearDown(self):
+        self.spill.close()
+        self.directory.cleanup()
+
+    def test_put_get(self):
+        self.spill.put(1, "a")
+        self.spill.put((2, "b"), [1, 2])
+        self.assertIn(1, self.spill)
+        self.assertEqual(self.spill.get((2, "b")), [1, 2])
+        self.assertEqual(self.spill.get(1), "a")
+        self.assertEqual(len(self.spill), 2)
+
+    def test_overwrite(self):
+        self.spill.put(1, "a")
+        self.spill.put(1, "b")
+        self.assertEqual(self.spill.get(1), "b")
+        self.assertEqual(len(self.spill), 1)
+
+    def test_pop(self):
+        self.spill.put(1, "a")
+        self.assertEqual(self.spill.pop(1), "a")
+        self.assertNotIn(1, self.spill)
+        with self.assertRaises(KeyError):
+            self.spill.pop(1)
+
+    def test_maxbytes(self):
+        self.spill = SpillFile(self.path, maxbytes=100)
+        for key in range(10):
+            self.spill.put(key, "x" * 20)
+        self.assertLess(len(self.spill), 10)
+        self.assertIn(9, self.spill)
+        self.assertNotIn(0, self.spill)
+
+    def test_compaction(self):
+        original = disk_tier.MIN_COMPACTION_GARBAGE
+        disk_tier.MIN_COMPACTION_GARBAGE = 0
+        try:
+            for key in range(10):
+                self.spill.put(key, key)
+            for key in range(8):
+                self.spill.discard(key)
+            self.assertLess(os.path.getsize(self.path), 10 * 20)
+            self.assertEqual(self.spill.get(8), 8)
+            self.assertEqual(self.spill.get(9), 9)
+        finally:
+            disk_tier.MIN_COMPACTION_GARBAGE = original
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_round_trip(self):
+        entries = [(1, "a", None), ("b", [2], 1.5)]
+        file = io.BytesIO()
+        write_snapshot(file, entries)
+        file.seek(0)
+        self.assertEqual(list(read_snapshot(file)), entries)
+
+    def test_invalid_file(self):
+        with self.assertRaises(ValueError):
+            list(read_snapshot(io.BytesIO(b"garbage")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from hypothesis import given
+from hypothesis.strategies import integers, lists
+
+from algorithms.frequency_sketch import CountMinSketch
+
+
+class TestCountMinSketch(unittest.TestCase):
+    def setUp(self):
+        self.sketch = CountMinSketch(width=64)
+
+    def setup_example(self):
+        self.sketch = CountMinSketch(width=64)
+
+    def tearDown(self):
+        del self.sketch
+
+    @given(lists(integers(0, 20), max_size=100))
+    def test_never_underestimate(self, entries):
+        for entry in entries:
+            self.sketch.increment(entry)
+        for entry in set(entries):
+            self.assertGreaterEqual(self.sketch.frequency(entry), min(entries.count(entry), 15))
+
+    def test_saturation(self):
+        for _ in range(100):
+            self.sketch.increment("a")
+        self.assertLessEqual(self.sketch.frequency("a"), 15)
+
+    def test_aging(self):
+        sketch = CountMinSketch(width=4, sample_factor=2)
+        for _ in range(7):
+            sketch.increment("a")
+        self.assertEqual(sketch.frequency("a"), 7)
+        # Reaching sample size halves every counter.
+        sketch.increment("a")
+        self.assertEqual(sketch.frequency("a"), 4)
+
+    def test_clear(self):
+        self.sketch.increment("a")
+        self.sketch.clear()
+        self.assertEqual(self.sketch.frequency("a"), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
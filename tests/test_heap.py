@@ -1,6 +1,15 @@
+import asyncio
 import unittest
+from queue import Empty, Full
+from threading import Thread
+
+from hypothesis import given
+from hypothesis.strategies import integers, lists, sampled_from, tuples
 
 from algorithms.heap import Heap
+from algorithms.pairing_heap import PairingHeap
+from algorithms.priority_queue import (AsyncPriorityQueue,
+                                       BlockingPriorityQueue, PriorityQueue)
 
 class TestHeap(unittest.TestCase):
     def setUp(self):
@@ -55,6 +64,259 @@ class TestHeap(unittest.TestCase):
         self.h.delete(2)
         self.assertIsNone(self.h.top)
 
+    def test_update_priority(self):
+        for key in range(5):
+            self.h.insert(key, key * 100)
+        self.h.update_priority(0, 10)
+        self.assertEqual(self.h.top, (1, 100))
+        self.assertEqual(self.h.find(10), 0)
+        self.assertIsNone(self.h.find(0))
+        self.h.update_priority(4, -1)
+        self.assertEqual(self.h.top, (-1, 400))
+        with self.assertRaises(KeyError):
+            self.h.update_priority(0, 1)
+        with self.assertRaises(ValueError):
+            self.h.update_priority(1, 2)
+
+    def test_decrease_key(self):
+        self.h.insert(3, 300)
+        self.h.insert(5, 500)
+        self.h.decrease_key(5, 1)
+        self.assertEqual(self.h.top, (1, 500))
+        with self.assertRaises(ValueError):
+            self.h.decrease_key(3, 4)
+
+        self.h = Heap(priority_order="max")
+        self.h.insert(3, 300)
+        self.h.insert(5, 500)
+        self.h.decrease_key(3, 7)
+        self.assertEqual(self.h.top, (7, 300))
+
+    @given(lists(tuples(integers(0, 2), integers(0, 30), integers(0, 30))))
+    def test_consistent_with_dict_model(self, operations):
+        heap = Heap()
+        model = {}
+        for operation, key, other in operations:
+            if operation == 0:
+                heap.insert(key, other)
+                model[key] = other
+            elif operation == 1:
+                self.assertEqual(heap.delete(key), model.pop(key, None))
+            elif key in model and other not in model:
+                heap.update_priority(key, other)
+                model[other] = model.pop(key)
+            self.assertEqual(heap.top, min(model.items()) if model else None)
+            for index, (key, _) in enumerate(heap):
+                self.assertEqual(heap._index[key], index)
+        self.assertEqual(len(heap), len(model))
+
+    @given(lists(tuples(integers(), integers())))
+    def test_from_iterable(self, items):
+        heap = Heap.from_iterable(items, priority_order="max")
+        model = dict(items)
+        self.assertEqual(len(heap), len(model))
+        drained = []
+        while not heap.isEmpty():
+            key, value = heap.top
+            self.assertEqual(heap.delete(key), value)
+            drained.append((key, value))
+        self.assertEqual(drained, sorted(model.items(), reverse=True))
+
+    def test_typecode(self):
+        heap = Heap.from_iterable(((0.5 * key, key) for key in range(10, 0, -1)), typecode="d")
+        self.assertEqual(heap.top, (0.5, 1))
+        heap.insert(0.25, "a")
+        self.assertEqual(heap.top, (0.25, "a"))
+        with self.assertRaises(ValueError):
+            Heap(typecode="?")
+
+    def test_lossy_typecode(self):
+        heap = Heap(typecode="f")
+        heap.insert(0.1, "a")
+        heap.insert(0.1, "b")
+        self.assertEqual(len(heap), 1)
+        self.assertIn(0.1, heap)
+        self.assertEqual(heap.find(0.1), "b")
+        heap.update_priority(0.1, 0.3)
+        self.assertEqual(heap.delete(0.3), "b")
+        self.assertTrue(heap.isEmpty())
+        heap = Heap.from_iterable([(2 ** 53, "a"), (2 ** 53 + 1, "b")], typecode="d")
+        self.assertEqual(len(heap), 1)
+        self.assertEqual(heap.find(2 ** 53 + 1), "b")
+
+    @given(sampled_from([2, 3, 4, 8]), lists(integers(0, 100)), lists(integers(0, 100)))
+    def test_arity(self, arity, initial, inserted):
+        heap = Heap.from_iterable(((key, None) for key in initial), arity=arity)
+        for key in inserted:
+            heap.insert(key)
+        drained = []
+        while not heap.isEmpty():
+            drained.append(heap.top[0])
+            heap.delete(heap.top[0])
+        self.assertEqual(drained, sorted(set(initial + inserted)))
+
+    def test_invalid_arity(self):
+        with self.assertRaises(ValueError):
+            Heap(arity=1)
+
+
+class TestPriorityQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = PriorityQueue()
+
+    def test_dequeue_from_empty_queue(self):
+        with self.assertRaises(IndexError):
+            self.queue.dequeue()
+
+    @given(lists(integers()))
+    def test_dequeue_in_order(self, keys):
+        queue = PriorityQueue()
+        for key in keys:
+            queue.enqueue(key, str(key))
+        self.assertEqual([queue.dequeue() for _ in range(len(queue))],
+                         [(key, str(key)) for key in sorted(set(keys))])
+
+    @given(lists(integers(max_value=10 ** 9 - 1)))
+    def test_pairing_heap_backend(self, keys):
+        queue = PriorityQueue.from_iterable(((key, str(key)) for key in keys), priority_order="max",
+                                            backend=PairingHeap)
+        self.assertIs(queue.backend, PairingHeap)
+        handle = queue.enqueue(10 ** 9, "top")
+        self.assertEqual(queue.head(), (10 ** 9, "top"))
+        self.assertEqual(queue.delete(handle), "top")
+        self.assertEqual([queue.dequeue() for _ in range(len(queue))],
+                         sorted(((key, str(key)) for key in keys), reverse=True))
+
+    def test_heap_interface(self):
+        self.assertEqual(self.queue.priority_order, "min")
+        self.queue.insert(3, "a")
+        self.assertEqual(self.queue.find(3), "a")
+        self.assertIn(3, self.queue)
+        self.assertIsNone(self.queue.find(4))
+        self.queue.insert(1, "b")
+        self.queue.update_priority(3, 0)
+        self.assertIsInstance(self.queue, Heap)
+        self.assertEqual(list(self.queue), [(0, "a"), (1, "b")])
+        self.assertEqual(self.queue[0], (0, "a"))
+        self.assertEqual(self.queue[:], [(0, "a"), (1, "b")])
+        self.assertEqual(str(self.queue), "Heap(0: a, 1: b)")
+
+    def test_no_key_lookup_with_pairing_heap(self):
+        queue = PriorityQueue("max", backend=PairingHeap)
+        self.assertEqual(queue.priority_order, "max")
+        queue.insert(3, "a")
+        with self.assertRaises(TypeError):
+            3 in queue
+        with self.assertRaises(TypeError):
+            queue.find(3)
+        with self.assertRaises(TypeError):
+            queue.update_priority(3, 4)
+        with self.assertRaises(TypeError):
+            list(queue)
+        with self.assertRaises(TypeError):
+            queue[0]
+
+    def test_decrease_key(self):
+        self.queue.enqueue(3, "a")
+        self.queue.enqueue(5, "b")
+        self.queue.decrease_key(5, 1)
+        self.assertEqual(self.queue.dequeue(), (1, "b"))
+
+
+class TestBlockingPriorityQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = BlockingPriorityQueue(maxsize=2)
+
+    def test_timeout(self):
+        with self.assertRaises(Empty):
+            self.queue.dequeue(timeout=0.01)
+        with self.assertRaises(Empty):
+            self.queue.dequeue(block=False)
+        self.queue.enqueue(2)
+        self.queue.enqueue(1)
+        with self.assertRaises(Full):
+            self.queue.enqueue(3, timeout=0.01)
+        with self.assertRaises(Full):
+            self.queue.enqueue(3, block=False)
+        self.assertEqual(self.queue.dequeue(), (1, None))
+
+    def test_invalid_maxsize(self):
+        with self.assertRaises(ValueError):
+            BlockingPriorityQueue(maxsize=0)
+
+    def test_producers_and_consumers(self):
+        consumed = []
+
+        def produce(start):
+            for key in range(start, 1000, 4):
+                self.queue.enqueue(key)
+
+        def consume():
+            for _ in range(500):
+                consumed.append(self.queue.dequeue(timeout=10)[0])
+
+        threads = [Thread(target=produce, args=(start,)) for start in range(4)]
+        threads += [Thread(target=consume) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(consumed), list(range(1000)))
+        self.assertTrue(self.queue.isEmpty())
+
+    def test_delete_makes_room(self):
+        self.queue.enqueue(1)
+        self.queue.enqueue(2)
+        producer = Thread(target=self.queue.enqueue, args=(3,))
+        producer.start()
+        self.queue.delete(1)
+        producer.join(10)
+        self.assertFalse(producer.is_alive())
+        self.assertEqual(self.queue.top, (2, None))
+        self.assertEqual(len(self.queue), 2)
+
+
+class TestAsyncPriorityQueue(unittest.TestCase):
+    def test_get_waits_for_put(self):
+        async def main():
+            queue = AsyncPriorityQueue()
+            consumer = asyncio.ensure_future(queue.get())
+            await asyncio.sleep(0)
+            self.assertFalse(consumer.done())
+            await queue.put(2, "b")
+            return await consumer
+
+        self.assertEqual(asyncio.run(main()), (2, "b"))
+
+    def test_put_waits_for_room(self):
+        async def main():
+            queue = AsyncPriorityQueue(maxsize=1)
+            await queue.put(3)
+            with self.assertRaises(asyncio.QueueFull):
+                queue.enqueue(1)
+            producer = asyncio.ensure_future(queue.put(1))
+            await asyncio.sleep(0)
+            self.assertFalse(producer.done())
+            self.assertEqual(await queue.get(), (3, None))
+            await producer
+            self.assertEqual(queue.dequeue(), (1, None))
+            with self.assertRaises(asyncio.QueueEmpty):
+                queue.dequeue()
+
+        asyncio.run(main())
+
+    def test_cancelled_getter(self):
+        async def main():
+            queue = AsyncPriorityQueue()
+            cancelled = asyncio.ensure_future(queue.get())
+            waiting = asyncio.ensure_future(queue.get())
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            await queue.put(1)
+            self.assertEqual(await asyncio.wait_for(waiting, 10), (1, None))
+
+        asyncio.run(main())
+
 
 if __name__ == "__main__":
     unittest.main()
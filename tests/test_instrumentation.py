@@ -0,0 +1,176 @@
+import unittest
+import asyncio
+from time import sleep
+
+from algorithms.cache import (ARC_Cache, Clock_Cache, LRU_Cache,
+                              Sharded_LRU_Cache, TwoQueue_Cache,
+                              WTinyLFU_Cache, cache_decorator)
+from algorithms.instrumentation import LatencyHistogram
+from algorithms.shared_cache import SharedMemory_Cache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_empty(self):
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.count, 0)
+        self.assertEqual(histogram.mean, 0.0)
+        self.assertEqual(histogram.percentile(0.5), 0.0)
+        self.assertEqual(histogram.buckets(), [])
+
+    def test_record(self):
+        histogram = LatencyHistogram()
+        for _ in range(99):
+            histogram.record(1e-6)
+        histogram.record(1.0)
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.max, 1.0)
+        self.assertAlmostEqual(histogram.mean, (99e-6 + 1.0) / 100)
+        self.assertLessEqual(histogram.percentile(0.5), 2e-6)
+        self.assertEqual(histogram.percentile(1), 1.0)
+        self.assertEqual(sum(count for _, count in histogram.buckets()), 100)
+
+    def test_invalid_fraction(self):
+        with self.assertRaises(ValueError):
+            LatencyHistogram().percentile(1.5)
+
+
+class TestInstrumentation(unittest.TestCase):
+    cache_class = LRU_Cache
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(self.cache_class(4).instrumentation)
+
+    def test_counters(self):
+        cache = self.cache_class(4)
+        instrumentation = cache.instrument()
+        for i in range(10):
+            cache[i] = i
+        cache[9] = 90
+        report = instrumentation.report()
+        self.assertEqual(report["insertions"], 10)
+        self.assertEqual(report["overwrites"], 1)
+        self.assertEqual(report["evictions"], 10 - len(cache))
+        self.assertEqual(report["size"], len(cache))
+
+    def test_hooks(self):
+        cache = self.cache_class(4)
+        evicted = {}
+        missed = []
+        cache.instrument(on_evict=evicted.__setitem__, on_miss=missed.append)
+        for i in range(10):
+            cache[i] = i * 10
+        with self.assertRaises(KeyError):
+            cache[100]
+        self.assertEqual(missed, [100])
+        self.assertEqual(len(evicted) + len(cache), 10)
+        for key, value in evicted.items():
+            self.assertEqual(value, key * 10)
+
+    def test_uninstrument(self):
+        cache = self.cache_class(2)
+        evicted = []
+        cache.instrument(on_evict=lambda key, value: evicted.append(key))
+        cache.uninstrument()
+        for i in range(5):
+            cache[i] = i
+        self.assertIsNone(cache.instrumentation)
+        self.assertEqual(evicted, [])
+
+
+class TestShardedInstrumentation(TestInstrumentation):
+    cache_class = Sharded_LRU_Cache
+
+
+class TestClockInstrumentation(TestInstrumentation):
+    cache_class = Clock_Cache
+
+
+class TestARCInstrumentation(TestInstrumentation):
+    cache_class = ARC_Cache
+
+
+class TestTwoQueueInstrumentation(TestInstrumentation):
+    cache_class = TwoQueue_Cache
+
+
+class TestWTinyLFUInstrumentation(TestInstrumentation):
+    cache_class = WTinyLFU_Cache
+
+
+class TestSharedMemoryInstrumentation(TestInstrumentation):
+    def cache_class(self, maxsize):
+        cache = SharedMemory_Cache(maxsize, slot_size=64, ways=maxsize)
+        self.addCleanup(cache.unlink)
+        self.addCleanup(cache.close)
+        return cache
+
+
+class TestLRUCacheInstrumentation(unittest.TestCase):
+    def test_expirations(self):
+        timer = FakeTimer()
+        cache = LRU_Cache(8, ttl=1, timer=timer)
+        instrumentation = cache.instrument()
+        cache[1] = 1
+        cache[2] = 2
+        cache[3] = 3
+        timer.now = 2
+        with self.assertRaises(KeyError):
+            cache[1]
+        self.assertEqual(instrumentation.report()["expirations"], 1)
+        # Inserting reaps the other expired entries.
+        cache[4] = 4
+        self.assertEqual(instrumentation.report()["expirations"], 3)
+
+    def test_size_samples(self):
+        timer = FakeTimer()
+        cache = LRU_Cache(8)
+        instrumentation = cache.instrument(timer=timer, sample_interval=1.0)
+        cache[1] = 1
+        cache[2] = 2
+        timer.now = 1.0
+        cache[3] = 3
+        self.assertEqual(instrumentation.size_samples, [(0.0, 1), (1.0, 3)])
+
+
+class TestDecoratorInstrumentation(unittest.TestCase):
+    def test_load_time(self):
+        @cache_decorator(8, instrument=True)
+        def slow(n):
+            sleep(0.01)
+            return n
+
+        slow(1)
+        slow(1)
+        slow(2)
+        load_time = slow.__cache__.instrumentation.load_time
+        self.assertEqual(load_time.count, 2)
+        self.assertGreaterEqual(load_time.mean, 0.01)
+
+    def test_load_time_coroutine_function(self):
+        @cache_decorator(8, instrument=True)
+        async def slow(n):
+            await asyncio.sleep(0.01)
+            return n
+
+        async def main():
+            await asyncio.gather(slow(1), slow(1), slow(2))
+
+        asyncio.run(main())
+        load_time = slow.__cache__.instrumentation.load_time
+        self.assertEqual(load_time.count, 2)
+        self.assertGreaterEqual(load_time.mean, 0.01)
+
+    def test_not_instrumented_by_default(self):
+        self.assertIsNone(cache_decorator(8)(abs).__cache__.instrumentation)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import unittest
+import gc
+import tracemalloc
+from time import sleep
+
+from algorithms.cache import LRU_Cache
+from algorithms.memory_pressure import (CacheRegistry, MemoryPressureMonitor,
+                                        process_memory, registry)
+
+
+class FakeMemory:
+    def __init__(self):
+        self.usage = 0
+
+    def __call__(self):
+        return self.usage
+
+
+class TestCacheRegistry(unittest.TestCase):
+    def test_auto_registration(self):
+        cache = LRU_Cache(8)
+        self.assertIn(cache, registry)
+        weight_bounded = LRU_Cache(None, maxweight=8)
+        self.assertNotIn(weight_bounded, registry)
+
+    def test_weak(self):
+        registry = CacheRegistry()
+        registry.register(LRU_Cache(8))
+        gc.collect()
+        self.assertEqual(len(registry), 0)
+
+
+class TestMemoryPressureMonitor(unittest.TestCase):
+    def setUp(self):
+        self.memory = FakeMemory()
+        self.registry = CacheRegistry()
+        self.small = LRU_Cache(10)
+        self.large = LRU_Cache(100)
+        for cache in (self.small, self.large):
+            self.registry.register(cache)
+            for key in range(cache.maxsize):
+                cache[key] = key
+        self.monitor = MemoryPressureMonitor(1000, 500, step=0.5, measure=self.memory, registry=self.registry)
+
+    def test_shrink_and_grow(self):
+        self.memory.usage = 2000
+        self.assertEqual(self.monitor.check(), "shrink")
+        self.assertEqual(self.large.maxsize, 50)
+        self.assertEqual(self.small.maxsize, 10)
+        # Surplus is discarded incrementally on insertion.
+        self.large[-1] = -1
+        self.assertLess(self.large.size, 100)
+        while self.large.size > 50:
+            self.large[-1] = -1
+        self.assertEqual(self.large.size, 50)
+
+        self.memory.usage = 700
+        self.assertIsNone(self.monitor.check())
+        self.memory.usage = 100
+        self.assertEqual(self.monitor.check(), "grow")
+        self.assertEqual(self.large.maxsize, 100)
+        self.assertIsNone(self.monitor.check())
+
+    def test_shrink_below_current_size(self):
+        cache = LRU_Cache(1000)
+        cache[1] = 1
+        registry = CacheRegistry()
+        registry.register(cache)
+        monitor = MemoryPressureMonitor(1000, measure=lambda: 2000, registry=registry)
+        monitor.check()
+        self.assertEqual(cache.maxsize, 1)
+        self.assertIsNone(monitor.check())
+
+    def test_trim_on_lookup(self):
+        self.large.resize(50)
+        for _ in range(10):
+            self.large[99]
+        self.assertEqual(self.large.size, 50)
+        self.assertEqual(self.large[99], 99)
+
+    def test_skip_cache_not_trimmed_yet(self):
+        self.memory.usage = 2000
+        for _ in range(10):
+            self.monitor.check()
+        # The large cache is shrunk once, then left alone until its surplus is trimmed.
+        self.assertEqual(self.large.maxsize, 50)
+        self.assertEqual(self.large.size, 100)
+        while self.large.size > self.large.maxsize:
+            self.large[99]
+        self.monitor.check()
+        self.assertEqual(self.large.maxsize, 25)
+
+    def test_coldest(self):
+        with self.assertRaises(KeyError):
+            self.small[-1]
+        self.large[0]
+        monitor = MemoryPressureMonitor(1000, strategy="coldest", measure=lambda: 2000, registry=self.registry)
+        monitor.check()
+        self.assertEqual(self.small.maxsize, 9)
+        self.assertEqual(self.large.maxsize, 100)
+
+    def test_thread(self):
+        self.memory.usage = 2000
+        monitor = MemoryPressureMonitor(1000, interval=0.001, measure=self.memory, registry=self.registry)
+        monitor.start()
+        with self.assertRaises(RuntimeError):
+            monitor.start()
+        while self.small.maxsize > 1 or self.large.maxsize > 1:
+            # Lookups trim the surplus, letting the monitor shrink further.
+            for cache in (self.small, self.large):
+                with self.assertRaises(KeyError):
+                    cache[-1]
+            sleep(0.001)
+        monitor.stop()
+
+    def test_invalid_setting(self):
+        with self.assertRaises(ValueError):
+            MemoryPressureMonitor(1000, 2000)
+        with self.assertRaises(ValueError):
+            MemoryPressureMonitor(1000, strategy="random")
+        with self.assertRaises(ValueError):
+            LRU_Cache(8).resize(0)
+
+
+class TestProcessMemory(unittest.TestCase):
+    def test_tracemalloc(self):
+        tracemalloc.start()
+        try:
+            self.assertEqual(process_memory(), tracemalloc.get_traced_memory()[0])
+        finally:
+            tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from itertools import chain
+
+from hypothesis import given
+from hypothesis.strategies import booleans, integers, lists, none, one_of
+
+from algorithms.merge import merge
+
+
+class TestMerge(unittest.TestCase):
+    def test_merge(self):
+        self.assertEqual(list(merge([1, 4, 7], [2, 5, 8], [3, 6, 9])), list(range(1, 10)))
+        self.assertEqual(list(merge()), [])
+        self.assertEqual(list(merge([], [1], [])), [1])
+
+    def test_unhashable_keys(self):
+        self.assertEqual(list(merge([[1], [3]], [[2]])), [[1], [2], [3]])
+        self.assertEqual(list(merge([[1], [3]], [[2]], block_size=2)), [[1], [2], [3]])
+
+    def test_lazy(self):
+        def source():
+            yield 1
+            raise AssertionError("Read ahead")
+
+        self.assertEqual(next(merge(source(), [2])), 1)
+
+    def test_invalid_block_size(self):
+        with self.assertRaises(ValueError):
+            merge([1], block_size=0)
+
+    @given(lists(lists(integers(0, 10))), booleans(), one_of(none(), integers(1, 4)))
+    def test_consistent_with_sorted(self, lists_of_keys, reverse, block_size):
+        # Tag items with their origin, to tell whether equal keys come out in input order.
+        inputs = [sorted(((key, source, position) for position, key in enumerate(keys)),
+                         key=lambda item: item[0], reverse=reverse)
+                  for source, keys in enumerate(lists_of_keys)]
+        merged = list(merge(*inputs, key=lambda item: item[0], reverse=reverse, block_size=block_size))
+        self.assertEqual(merged, sorted(chain(*inputs), key=lambda item: item[0], reverse=reverse))
+
+
+if __name__ == '__main__':
+    unittest.main()
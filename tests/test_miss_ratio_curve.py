@@ -0,0 +1,96 @@
+import unittest
+from random import Random
+
+from algorithms.cache import LRU_Cache
+from algorithms.miss_ratio_curve import MissRatioProfiler, round_up
+
+
+def simulate_miss_ratio(keys, size):
+    cache = LRU_Cache(size)
+    for key in keys:
+        try:
+            cache[key]
+        except KeyError:
+            cache[key] = key
+    hit, miss = cache.statistic()
+    return miss / (hit + miss)
+
+
+class TestMissRatioProfiler(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(MissRatioProfiler().curve([1, 10]), [(1, 1.0), (10, 1.0)])
+
+    def test_invalid_setting(self):
+        with self.assertRaises(ValueError):
+            MissRatioProfiler(rate=0)
+        with self.assertRaises(ValueError):
+            MissRatioProfiler(max_samples=0)
+
+    def test_round_up(self):
+        self.assertEqual(round_up(31), 31)
+        self.assertEqual(round_up(32), 32)
+        self.assertEqual(round_up(33), 34)
+        self.assertEqual(round_up(1000), 1024)
+
+    def test_loop(self):
+        profiler = MissRatioProfiler(rate=1)
+        for _ in range(10):
+            for key in range(20):
+                profiler.access(key)
+        self.assertEqual(profiler.miss_ratio(19), 1.0)
+        self.assertAlmostEqual(profiler.miss_ratio(20), 0.1)
+
+    def test_exact_without_sampling(self):
+        rng = Random(0)
+        keys = [int(rng.paretovariate(1)) for _ in range(5000)]
+        profiler = MissRatioProfiler(rate=1, max_samples=len(keys))
+        for key in keys:
+            profiler.access(key)
+        for size in (1, 2, 5, 10, 20):
+            self.assertAlmostEqual(profiler.miss_ratio(size), simulate_miss_ratio(keys, size))
+
+    def test_sampling(self):
+        rng = Random(0)
+        keys = [rng.randrange(10000) for _ in range(100000)]
+        profiler = MissRatioProfiler(rate=0.1, max_samples=256)
+        for key in keys:
+            profiler.access(key)
+        self.assertLessEqual(profiler.samples, 256)
+        self.assertLess(profiler.rate, 0.1)
+        for size in (1000, 5000):
+            self.assertAlmostEqual(profiler.miss_ratio(size), simulate_miss_ratio(keys, size), delta=0.1)
+
+    def test_curve_is_monotonic(self):
+        rng = Random(0)
+        profiler = MissRatioProfiler(rate=0.5)
+        for _ in range(10000):
+            profiler.access(int(rng.paretovariate(0.8)))
+        ratios = [ratio for _, ratio in profiler.curve()]
+        self.assertEqual(ratios, sorted(ratios, reverse=True))
+
+
+class TestLRUCacheProfile(unittest.TestCase):
+    def test_profile(self):
+        cache = LRU_Cache(4)
+        with self.assertRaises(ValueError):
+            cache.miss_ratio_curve()
+        cache.profile(rate=1)
+        for _ in range(3):
+            for key in range(8):
+                try:
+                    cache[key]
+                except KeyError:
+                    cache[key] = key
+        (_, small), (_, large) = cache.miss_ratio_curve([4, 8])
+        self.assertEqual(small, 1.0)
+        self.assertAlmostEqual(large, 8 / 24)
+        cache.get_many(range(8))
+        self.assertAlmostEqual(cache.profiler.miss_ratio(8), 8 / 32)
+        report = cache.instrument().report()
+        self.assertEqual(report["miss_ratio_curve"], cache.miss_ratio_curve())
+        cache.unprofile()
+        self.assertIsNone(cache.profiler)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+from hypothesis import given
+from hypothesis.strategies import integers, lists, tuples
+
+from algorithms.pairing_heap import PairingHeap
+
+
+class TestPairingHeap(unittest.TestCase):
+    def setUp(self):
+        self.h = PairingHeap()
+
+    def tearDown(self):
+        self.h.clear()
+
+    def test_insert(self):
+        self.h.insert(2, 200)
+        self.h.insert(1, 100)
+        self.h.insert(1, 101)
+        self.assertEqual(self.h.size, 3)
+        self.assertEqual(self.h.top[0], 1)
+
+    def test_pop_from_empty_heap(self):
+        with self.assertRaises(IndexError):
+            self.h.pop()
+        self.assertIsNone(self.h.top)
+
+    def test_decrease_key(self):
+        handles = [self.h.insert(key, key * 100) for key in range(5)]
+        self.h.pop()
+        self.h.decrease_key(handles[4], 0)
+        self.assertEqual(self.h.top, (0, 400))
+        with self.assertRaises(ValueError):
+            self.h.decrease_key(handles[2], 3)
+        with self.assertRaises(ValueError):
+            self.h.decrease_key(handles[0], -1)
+
+    def test_delete(self):
+        handles = [self.h.insert(key, key * 100) for key in range(5)]
+        self.assertEqual(self.h.delete(handles[2]), 200)
+        self.assertEqual(self.h.delete(handles[0]), 0)
+        self.assertEqual([self.h.pop() for _ in range(len(self.h))], [(1, 100), (3, 300), (4, 400)])
+        with self.assertRaises(ValueError):
+            self.h.delete(handles[2])
+
+    def test_meld(self):
+        other = PairingHeap()
+        handle = other.insert(3, 300)
+        self.h.insert(2, 200)
+        self.h.meld(other)
+        self.assertEqual(len(self.h), 2)
+        self.assertTrue(other.isEmpty())
+        self.h.decrease_key(handle, 1)
+        self.assertEqual(self.h.top, (1, 300))
+        with self.assertRaises(ValueError):
+            self.h.meld(PairingHeap(priority_order="max"))
+
+    def test_priority_order(self):
+        self.h = PairingHeap.from_iterable([(4, 400), (3, 300), (1, 100), (2, 200)], priority_order="max")
+        self.assertEqual([self.h.pop() for _ in range(len(self.h))], [(4, 400), (3, 300), (2, 200), (1, 100)])
+
+    @given(lists(tuples(integers(0, 3), integers(0, 30), integers(0, 30))))
+    def test_consistent_with_list_model(self, operations):
+        heap = PairingHeap()
+        # Model holds [key, value, handle] of live items.
+        model = []
+        for operation, key, other in operations:
+            if operation == 0:
+                model.append([key, other, heap.insert(key, other)])
+            elif operation == 1 and model:
+                key, _ = heap.pop()
+                self.assertEqual(key, min(item[0] for item in model))
+                model.remove(next(item for item in model if item[0] == key and item[2].prev is item[2]))
+            elif operation == 2 and model:
+                item = model.pop(key % len(model))
+                self.assertEqual(heap.delete(item[2]), item[1])
+            elif operation == 3 and model:
+                item = model[key % len(model)]
+                new_key = min(item[0], other)
+                heap.decrease_key(item[2], new_key)
+                item[0] = new_key
+            self.assertEqual(len(heap), len(model))
+            self.assertEqual(heap.top[0] if model else None, min(item[0] for item in model) if model else None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import unittest
+
+from hypothesis import given
+from hypothesis.strategies import integers, lists, tuples
+
+from algorithms.recency_tracker import (LinkedRecencyTracker, RecencyTracker,
+                                        SampledRecencyTracker,
+                                        SegmentedRecencyTracker)
+
+
+class TestRecencyTracker(unittest.TestCase):
+    tracker_class = RecencyTracker
+
+    def setUp(self):
+        self.tracker = self.tracker_class()
+
+    def setup_example(self):
+        self.tracker = self.tracker_class()
+
+    def tearDown(self):
+        del self.tracker
+
+    def test_pop_lru_from_empty_tracker(self):
+        with self.assertRaises(IndexError):
+            self.tracker.pop_lru()
+
+    def test_remove_absent_entry(self):
+        with self.assertRaises(ValueError):
+            self.tracker.remove(1)
+
+    # Hypothesis refuses to run one test function on several classes. Subclasses wrap these in their own tests.
+    def check_consistent_with_list_model(self, operations):
+        model = []
+        for operation, entry in operations:
+            if operation == 0:
+                self.tracker.update_mru(entry)
+                if entry in model:
+                    model.remove(entry)
+                model.append(entry)
+            elif operation == 1 and model:
+                self.assertEqual(self.tracker.get_lru(), model[0])
+                self.assertEqual(self.tracker.pop_lru(), model.pop(0))
+            elif operation == 2 and entry in model:
+                self.tracker.remove(entry)
+                model.remove(entry)
+            self.assertEqual(self.tracker.size, len(model))
+        self.assertEqual(list(self.tracker), model)
+
+    def check_update_mru_many(self, initial, batch):
+        for entry in initial:
+            self.tracker.update_mru(entry)
+        self.tracker.update_mru_many(batch)
+        reference = RecencyTracker()
+        for entry in initial + batch:
+            reference.update_mru(entry)
+        self.assertEqual(list(self.tracker), list(reference))
+
+    @given(lists(tuples(integers(0, 2), integers(0, 20))))
+    def test_consistent_with_list_model(self, operations):
+        self.check_consistent_with_list_model(operations)
+
+    @given(lists(integers(0, 20)), lists(integers(0, 20)))
+    def test_update_mru_many(self, initial, batch):
+        self.check_update_mru_many(initial, batch)
+
+
+class TestLinkedRecencyTracker(TestRecencyTracker):
+    tracker_class = LinkedRecencyTracker
+
+    @given(lists(tuples(integers(0, 2), integers(0, 20))))
+    def test_consistent_with_list_model(self, operations):
+        self.check_consistent_with_list_model(operations)
+
+    @given(lists(integers(0, 20)), lists(integers(0, 20)))
+    def test_update_mru_many(self, initial, batch):
+        self.check_update_mru_many(initial, batch)
+
+    def test_slot_reuse(self):
+        for entry in range(10):
+            self.tracker.update_mru(entry)
+        for entry in range(10):
+            self.tracker.remove(entry)
+        for entry in range(10, 20):
+            self.tracker.update_mru(entry)
+        self.assertEqual(len(self.tracker._entries), 11)
+        self.assertEqual(list(self.tracker), list(range(10, 20)))
+
+
+class TestSampledRecencyTracker(unittest.TestCase):
+    def setUp(self):
+        self.tracker = SampledRecencyTracker()
+
+    def test_pop_lru_from_empty_tracker(self):
+        with self.assertRaises(IndexError):
+            self.tracker.pop_lru()
+
+    def test_remove_absent_entry(self):
+        with self.assertRaises(ValueError):
+            self.tracker.remove(1)
+
+    def test_exact_when_sampling_everything(self):
+        tracker = SampledRecencyTracker(samples=100)
+        for entry in range(10):
+            tracker.update_mru(entry)
+        tracker.update_mru(0)
+        tracker.update_mru(5)
+        # Updated entries share the clock of the last insertion, hence not ordered among themselves.
+        self.assertEqual(list(tracker)[:7], [1, 2, 3, 4, 6, 7, 8])
+        for expected in [1, 2, 3, 4, 6, 7, 8]:
+            self.assertEqual(tracker.pop_lru(), expected)
+
+    @given(lists(tuples(integers(0, 2), integers(0, 20))))
+    def test_consistent_with_set_model(self, operations):
+        tracker = SampledRecencyTracker(samples=3, pool_size=2)
+        model = set()
+        for operation, entry in operations:
+            if operation == 0:
+                tracker.update_mru(entry)
+                model.add(entry)
+            elif operation == 1 and model:
+                model.remove(tracker.pop_lru())
+            elif operation == 2 and entry in model:
+                tracker.remove(entry)
+                model.remove(entry)
+            self.assertEqual(set(tracker), model)
+
+    def test_approximates_lru(self):
+        for entry in range(1000):
+            self.tracker.update_mru(entry)
+        victims = [self.tracker.pop_lru() for _ in range(100)]
+        # Sampling 5 of 1000 picks the oldest fifth on average.
+        self.assertLess(sum(victims) / len(victims), 400)
+
+
+class TestSegmentedRecencyTracker(unittest.TestCase):
+    def setUp(self):
+        self.tracker = SegmentedRecencyTracker(2)
+
+    def test_probation_first(self):
+        for entry in range(4):
+            self.tracker.update_mru(entry)
+        self.tracker.update_mru(0)
+        self.assertEqual(list(self.tracker), [1, 2, 3, 0])
+        self.assertEqual(self.tracker.pop_lru(), 1)
+
+    def test_demotion(self):
+        for entry in range(4):
+            self.tracker.update_mru(entry)
+        for entry in range(3):
+            self.tracker.update_mru(entry)
+        # Protected segment overflowed, demoting its least recently used entry.
+        self.assertEqual(list(self.tracker), [3, 0, 1, 2])
+
+    def test_remove(self):
+        self.tracker.update_mru(1)
+        self.tracker.update_mru(2)
+        self.tracker.update_mru(2)
+        self.tracker.remove(1)
+        self.tracker.remove(2)
+        self.assertEqual(len(self.tracker), 0)
+        with self.assertRaises(ValueError):
+            self.tracker.remove(3)
+        with self.assertRaises(IndexError):
+            self.tracker.pop_lru()
+
+
+if __name__ == '__main__':
+    unittest.main()
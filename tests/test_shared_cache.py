@@ -0,0 +1,132 @@
+import multiprocessing
+import unittest
+from multiprocessing.shared_memory import SharedMemory
+
+from algorithms.cache import cache_decorator
+from algorithms.shared_cache import SharedMemory_Cache
+
+
+def fill(cache, keys):
+    for key in keys:
+        cache[key] = key * 100
+
+
+class TestSharedMemoryCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = SharedMemory_Cache(maxsize=16, slot_size=64, ways=4)
+
+    def tearDown(self):
+        self.cache.close()
+        self.cache.unlink()
+        del self.cache
+
+    def test(self):
+        self.cache[1] = 100
+        self.assertEqual(self.cache[1], 100)
+        self.cache[1] = 200
+        self.assertEqual(self.cache[1], 200)
+        self.assertEqual(self.cache.size, 1)
+
+    def test_delete(self):
+        self.cache["a"] = [1, 2]
+        del self.cache["a"]
+        with self.assertRaises(KeyError):
+            self.cache["a"]
+        with self.assertRaises(KeyError):
+            del self.cache["a"]
+        self.assertEqual(self.cache.size, 0)
+
+    def test_maxsize(self):
+        fill(self.cache, range(100))
+        self.assertLessEqual(self.cache.size, 16)
+        for _ in range(self.cache.size):
+            self.cache.discard_lru()
+        self.assertEqual(self.cache.size, 0)
+        with self.assertRaises(IndexError):
+            self.cache.discard_lru()
+
+    def test_overwrite_is_referenced(self):
+        cache = SharedMemory_Cache(maxsize=4, slot_size=64, ways=4)
+        try:
+            fill(cache, range(4))
+            cache[0] = 0
+            cache[4] = 400
+            self.assertEqual(cache[0], 0)
+            with self.assertRaises(KeyError):
+                cache[1]
+        finally:
+            cache.close()
+            cache.unlink()
+
+    def test_maxsize_not_multiple_of_ways(self):
+        cache = SharedMemory_Cache(maxsize=10, slot_size=64, ways=8)
+        try:
+            fill(cache, range(100))
+            self.assertEqual(cache.size, 10)
+            self.assertEqual(cache.maxsize, 10)
+        finally:
+            cache.close()
+            cache.unlink()
+
+    def test_unlinked_once_collected(self):
+        cache = SharedMemory_Cache(maxsize=4, slot_size=64)
+        name = cache.name
+        del cache
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(name=name)
+
+    def test_statistic(self):
+        self.cache[1] = 100
+        self.cache[1]
+        with self.assertRaises(KeyError):
+            self.cache[2]
+        self.assertEqual(self.cache.statistic(), (1, 1))
+        self.cache.clear()
+        self.assertEqual(self.cache.statistic(), (0, 0))
+
+    def test_oversized_entry(self):
+        with self.assertRaises(ValueError):
+            self.cache[1] = "x" * 100
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "Requires fork start method")
+    def test_shared_across_processes(self):
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=fill, args=(self.cache, [index])) for index in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual([self.cache[index] for index in range(4)], [0, 100, 200, 300])
+
+
+class TestSharedBackendDecorator(unittest.TestCase):
+    def test_wrapping_is_functional(self):
+        wrapped_function = cache_decorator(8, backend="shared")(abs)
+        try:
+            self.assertEqual(wrapped_function(-2), 2)
+            self.assertEqual(wrapped_function(-2), 2)
+            self.assertEqual(wrapped_function.__cache__.statistic(), (1, 1))
+        finally:
+            wrapped_function.__cache__.close()
+            wrapped_function.__cache__.unlink()
+
+    def test_unstorable_result(self):
+        wrapped_function = cache_decorator(8, backend="shared")(lambda n: "x" * n)
+        try:
+            self.assertEqual(wrapped_function(5000), "x" * 5000)
+            # Neither cached, nor left pending for the next call to wait on.
+            self.assertEqual(wrapped_function(5000), "x" * 5000)
+            self.assertEqual(wrapped_function.__cache__.size, 0)
+        finally:
+            wrapped_function.__cache__.close()
+            wrapped_function.__cache__.unlink()
+
+    def test_invalid_setting(self):
+        with self.assertRaises(ValueError):
+            cache_decorator(8, backend="remote")
+        with self.assertRaises(ValueError):
+            cache_decorator(8, ttl=1, backend="shared")
+
+
+if __name__ == '__main__':
+    unittest.main()
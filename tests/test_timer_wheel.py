@@ -0,0 +1,80 @@
+import unittest
+
+from hypothesis import given
+from hypothesis.strategies import integers, lists, one_of, tuples
+
+from algorithms.timer_wheel import TimerWheel
+
+
+class TestTimerWheel(unittest.TestCase):
+    def setUp(self):
+        self.wheel = TimerWheel(resolution=1, levels=2)
+
+    def setup_example(self):
+        self.wheel = TimerWheel(resolution=1, levels=2)
+
+    def tearDown(self):
+        del self.wheel
+
+    def test_advance(self):
+        self.wheel.schedule("a", 3)
+        self.wheel.schedule("b", 100)
+        self.assertEqual(self.wheel.advance(2), [])
+        self.assertEqual(self.wheel.advance(3), ["a"])
+        self.assertEqual(self.wheel.advance(99), [])
+        self.assertEqual(self.wheel.advance(100), ["b"])
+        self.assertEqual(self.wheel.size, 0)
+
+    def test_fractional_deadline(self):
+        self.wheel.schedule("a", 2.5)
+        self.assertEqual(self.wheel.advance(2.9), [])
+        self.assertEqual(self.wheel.advance(3), ["a"])
+
+    def test_reschedule(self):
+        self.wheel.schedule("a", 3)
+        self.wheel.schedule("a", 10)
+        self.assertEqual(len(self.wheel), 1)
+        self.assertEqual(self.wheel.advance(5), [])
+        self.assertEqual(self.wheel.advance(10), ["a"])
+
+    def test_cancel(self):
+        self.wheel.schedule("a", 3)
+        self.wheel.cancel("a")
+        self.assertNotIn("a", self.wheel)
+        self.assertEqual(self.wheel.advance(5), [])
+        with self.assertRaises(KeyError):
+            self.wheel.cancel("a")
+
+    def test_beyond_span(self):
+        self.wheel.schedule("a", 64 * 64 * 3)
+        self.assertEqual(self.wheel.advance(64 * 64 * 3 - 1), [])
+        self.assertEqual(self.wheel.advance(64 * 64 * 3), ["a"])
+
+    def test_idle_ticks_skipped(self):
+        wheel = TimerWheel(resolution=1, levels=4)
+        wheel.schedule("a", 7 * 24 * 3600)
+        wheel.schedule("b", 7 * 24 * 3600 + 5)
+        self.assertEqual(wheel.advance(7 * 24 * 3600 - 1), [])
+        self.assertEqual(wheel.advance(7 * 24 * 3600), ["a"])
+        self.assertEqual(wheel.advance(8 * 24 * 3600), ["b"])
+
+    @given(lists(one_of(tuples(integers(0, 9), integers(-5, 10000)), integers(1, 5000))))
+    def test_consistent_with_dict_model(self, operations):
+        model = {}
+        now = 0
+        for operation in operations:
+            if isinstance(operation, tuple):
+                entry, delay = operation
+                self.wheel.schedule(entry, now + delay)
+                model[entry] = now + delay
+            else:
+                now += operation
+                expired = sorted(entry for entry, deadline in model.items() if deadline <= now)
+                self.assertEqual(sorted(self.wheel.advance(now)), expired)
+                for entry in expired:
+                    del model[entry]
+            self.assertEqual(self.wheel.size, len(model))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from heapq import nlargest, nsmallest
+
+from hypothesis import given
+from hypothesis.strategies import integers, lists
+
+from algorithms.top_k import TopK
+
+
+class TestTopK(unittest.TestCase):
+    def setUp(self):
+        self.top = TopK(3)
+
+    def tearDown(self):
+        self.top.clear()
+
+    def test_add(self):
+        for item in [5, 1, 4, 2, 3]:
+            self.top.add(item)
+        self.assertEqual(self.top.result(), [5, 4, 3])
+        self.assertEqual(self.top.threshold, 3)
+        self.assertEqual(len(self.top), 3)
+
+    def test_threshold_until_full(self):
+        self.top.add(1)
+        self.assertIsNone(self.top.threshold)
+
+    def test_invalid_k(self):
+        with self.assertRaises(ValueError):
+            TopK(0)
+
+    def test_key(self):
+        top = TopK(2, key=len, priority_order="min")
+        top.update(["ccc", "a", "dddd", "bb"])
+        self.assertEqual(top.result(), ["a", "bb"])
+
+    @given(lists(integers()), integers(1, 10))
+    def test_update_consistent_with_heapq(self, items, k):
+        largest = TopK(k)
+        largest.update(items)
+        self.assertEqual(largest.result(), nlargest(k, items))
+        smallest = TopK(k, key=abs, priority_order="min")
+        smallest.update(items)
+        self.assertEqual([abs(item) for item in smallest], [abs(item) for item in nsmallest(k, items, key=abs)])
+
+    @given(lists(lists(integers())), integers(1, 10))
+    def test_merge(self, parts, k):
+        merged = TopK(k)
+        for part in parts:
+            top = TopK(k)
+            top.update(part)
+            merged.merge(top)
+        self.assertEqual(merged.result(), nlargest(k, [item for part in parts for item in part]))
+
+    def test_merge_different_priority_orders(self):
+        with self.assertRaises(ValueError):
+            self.top.merge(TopK(3, priority_order="min"))
+
+
+if __name__ == '__main__':
+    unittest.main()
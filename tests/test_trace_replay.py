@@ -0,0 +1,52 @@
+import unittest
+import os
+import tempfile
+from collections import Counter
+
+from algorithms.cache import LRU_Cache
+from benchmarks.trace_replay import (NullCache, loop_trace, measure,
+                                     read_trace, scan_mixed_trace, scan_trace,
+                                     write_binary_trace, zipf_trace)
+
+
+class TestTraceReplay(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_text_trace(self):
+        path = os.path.join(self.directory.name, "trace.txt")
+        with open(path, "w") as file:
+            file.write("a\nb\n\n a \n")
+        self.assertEqual(list(read_trace(path)), ["a", "b", "a"])
+
+    def test_binary_trace(self):
+        path = os.path.join(self.directory.name, "trace.bin")
+        keys = list(zipf_trace(20000, 100))
+        write_binary_trace(path, keys)
+        self.assertEqual(list(read_trace(path)), keys)
+
+    def test_generators(self):
+        self.assertEqual(list(loop_trace(5, 2)), [0, 1, 0, 1, 0])
+        self.assertEqual(list(scan_trace(3, 10)), [10, 11, 12])
+        self.assertEqual(len(list(scan_mixed_trace(1000, 100, 50))), 1000)
+        frequency = Counter(zipf_trace(10000, 100))
+        self.assertGreater(frequency[0], frequency[99])
+
+    def test_measure(self):
+        result = measure(lambda: loop_trace(1000, 10), LRU_Cache, 10)
+        self.assertEqual(result["hit_ratio"], 0.99)
+        self.assertGreater(result["peak_memory"], 0)
+        # LRU_Cache thrashes on a loop larger than itself.
+        self.assertEqual(measure(lambda: loop_trace(1000, 11), LRU_Cache, 10)["hit_ratio"], 0)
+
+    def test_trace_memory_not_counted(self):
+        # Weights of a large Zipf universe dwarf a cache of nothing.
+        result = measure(lambda: zipf_trace(20000, 100000), NullCache, 10)
+        self.assertLess(result["peak_memory"], 64 * 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()